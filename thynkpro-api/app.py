@@ -3,20 +3,72 @@ from config.ai_config import model
 from controller.patient_controller import patient_bp
 from controller.summary_controller import summary_bp
 from controller.note_controller import note_bp
+from controller.metrics_controller import metrics_bp
 from config.db_config import init_db
+from config.upload_config import init_uploads
+from config.json_provider import init_json
+from config.instrumentation import init_instrumentation
+from config.http_caching import init_compression
+from config.sql_profiler import init_sql_profiler
+from config.schema_check import check_schema
 from model import init_models
+from commands import init_commands
 from flask_cors import CORS
 
-app = Flask(__name__)
-CORS(app)
 
-init_db(app)
+def create_app(config=None):
+    """
+    Build and configure the Flask app.
 
-init_models(app)
+    Nothing here connects to the database or loads the model SDK; the
+    connection pool opens on the first query and the model backend on the
+    first model call. The schema check is left to the server entry points
+    (serve.py and python app.py), so flask CLI commands such as
+    'flask db upgrade' never run it.
 
-app.register_blueprint(patient_bp)
-app.register_blueprint(summary_bp)
-app.register_blueprint(note_bp)
+    Args:
+        config (dict or object): Settings applied over the environment
+            defaults, e.g. {'SQLALCHEMY_DATABASE_URI': 'sqlite:///local.db'}
+
+    Returns:
+        Flask: The configured app
+    """
+    app = Flask(__name__)
+
+    init_uploads(app)
+
+    # Applied before the extensions read their settings
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    CORS(app)
+
+    init_db(app)
+
+    init_json(app)
+
+    init_instrumentation(app, model)
+
+    init_compression(app)
+
+    init_sql_profiler(app)
+
+    init_models(app)
+
+    init_commands(app)
+
+    app.register_blueprint(patient_bp)
+    app.register_blueprint(summary_bp)
+    app.register_blueprint(note_bp)
+    app.register_blueprint(metrics_bp)
+
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    check_schema(app)
+    app.run(debug=True)
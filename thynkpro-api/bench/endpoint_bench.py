@@ -0,0 +1,336 @@
+"""
+End-to-end endpoint load benchmark.
+
+Starts the API in-process on a local database with the stub model, seeds
+patients, then drives a weighted mix of requests at each concurrency level
+and reports p50/p95/p99 latency and requests per second per operation.
+Results are written as JSON so runs can be compared across revisions.
+
+Usage (from thynkpro-api/):
+    python bench/endpoint_bench.py --concurrency 1,8,32 --duration 10
+    python bench/endpoint_bench.py --llm-latency-ms 800 --mix list=5,detail=3,summary=1
+    python bench/endpoint_bench.py --compare bench/results/<older-revision>.json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(API_ROOT, 'bench', 'results')
+
+DEFAULT_MIX = 'list=30,detail=30,update=10,note_crud=15,extraction=5,summary=10'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run each concurrency level')
+    parser.add_argument('--warmup', type=float, default=1, help='Seconds of unrecorded traffic before each level')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Operation weights, e.g. list=5,detail=3')
+    parser.add_argument('--llm-latency-ms', type=float, default=200, help='Simulated model latency')
+    parser.add_argument('--database-url', default=None, help='Defaults to a fresh SQLite file')
+    parser.add_argument('--seed-patients', type=int, default=200, help='Patients created before the run')
+    parser.add_argument('--notes-per-patient', type=int, default=5)
+    parser.add_argument('--dedup', action='store_true',
+                        help='Keep patient dedup on; every stub extraction then merges into one record')
+    parser.add_argument('--output', default=None, help='Result file, defaults to bench/results/<revision>.json')
+    parser.add_argument('--compare', default=None, help='Earlier result file to diff against')
+    return parser.parse_args()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=API_ROOT, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def start_app(args):
+    """Configure the environment, import the app and serve it on a free local port"""
+    database_url = args.database_url
+    if not database_url:
+        database_path = os.path.join(tempfile.mkdtemp(prefix='thynkpro-bench-'), 'bench.db')
+        database_url = f'sqlite:///{database_path}?timeout=30'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['AI_BACKEND'] = 'stub'
+    os.environ['LLM_STUB_LATENCY_MS'] = str(args.llm_latency_ms)
+    os.environ.setdefault('LLM_MAX_CONCURRENCY', '256')
+    # The bench creates its tables after import, skip the startup drift warning
+    os.environ['SCHEMA_CHECK_ON_STARTUP'] = 'false'
+    # The stub returns the same patient for every image, so with dedup on each
+    # extraction after the first would just append a note to one record
+    os.environ['PATIENT_DEDUP_ENABLED'] = 'true' if args.dedup else 'false'
+
+    sys.path.insert(0, API_ROOT)
+    from werkzeug.serving import make_server
+    from app import app
+    from config.db_config import db
+
+    with app.app_context():
+        db.create_all()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return app, server, f'http://127.0.0.1:{server.server_port}'
+
+
+def seed(app, patients, notes_per_patient):
+    from config.db_config import db
+    from model.patient import Patient, Medicine, Note
+    from service.search_index import index_patient
+
+    ids = []
+    with app.app_context():
+        for i in range(patients):
+            patient = Patient(
+                id=uuid.uuid4(),
+                patient_name=f'Bench Patient {i}',
+                patient_age=20 + i % 60,
+                patient_gender=('Male', 'Female', 'Other')[i % 3],
+                diagnosis=random.choice(['Hypertension', 'Type 2 diabetes', 'Asthma', 'Migraine']),
+                doctor_advice='Follow up in two weeks',
+                doctor_name='Dr. Bench',
+                hospital_name='Bench Hospital'
+            )
+            patient.medicines.append(Medicine(medicine_name='Metformin', dosage='500 mg', frequency='Twice a day'))
+            for n in range(notes_per_patient):
+                patient.notes.append(Note(content=f'Visit note {n} for patient {i}'))
+            db.session.add(patient)
+            ids.append(patient.id)
+        db.session.flush()
+        for patient_id in ids:
+            index_patient(patient_id)
+        db.session.commit()
+    return [str(patient_id) for patient_id in ids]
+
+
+def scan_image():
+    """
+    A unique page-sized scan, alternating PNG and JPEG, so every upload goes
+    through the real preprocessing path and misses the extraction cache
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', (1240, 1754), 'white')
+    draw = ImageDraw.Draw(image)
+    for line in range(40):
+        top = 80 + line * 40
+        draw.text((80, top), f'{uuid.uuid4().hex} {random.randint(1, 999)} mg', fill='black')
+        draw.line((80, top + 28, random.randint(400, 1160), top + 28), fill='gray')
+    buffer = io.BytesIO()
+    if random.random() < 0.5:
+        image.save(buffer, format='PNG')
+        return 'scan.png', buffer.getvalue(), 'image/png'
+    image.save(buffer, format='JPEG', quality=85)
+    return 'scan.jpg', buffer.getvalue(), 'image/jpeg'
+
+
+class Client:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, path, body=None, headers=None):
+        data = None
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif body is not None:
+            data = body
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=120) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def upload(self, path, field, filename, content, mime_type):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: {mime_type}\r\n\r\n'
+        ).encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        return self.request('POST', path, body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+
+def build_operations(client, patient_ids):
+    """Each operation performs one logical user action and returns its HTTP status"""
+
+    def list_patients():
+        return client.request('GET', '/patient?limit=50')[0]
+
+    def detail():
+        return client.request('GET', f'/patient/{random.choice(patient_ids)}')[0]
+
+    def update():
+        patient_id = random.choice(patient_ids)
+        return client.request('PUT', f'/patient/{patient_id}', {'doctor_advice': f'Review {random.randint(1, 9)} weeks'})[0]
+
+    def note_crud():
+        patient_id = random.choice(patient_ids)
+        status, body = client.request('POST', f'/patients/{patient_id}/notes', {'content': 'Benchmark note'})
+        if status != 201:
+            return status
+        note_id = json.loads(body)['id']
+        status = client.request('PUT', f'/notes/{note_id}', {'content': 'Benchmark note, edited'})[0]
+        if status != 200:
+            return status
+        return client.request('DELETE', f'/notes/{note_id}')[0]
+
+    def extraction():
+        filename, content, mime_type = scan_image()
+        return client.upload('/patient/extract_text', 'image', filename, content, mime_type)[0]
+
+    def summary():
+        return client.request('POST', f'/summary/{random.choice(patient_ids)}?force=true')[0]
+
+    return {
+        'list': list_patients,
+        'detail': detail,
+        'update': update,
+        'note_crud': note_crud,
+        'extraction': extraction,
+        'summary': summary
+    }
+
+
+def parse_mix(mix, operations):
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in operations:
+            raise SystemExit(f'Unknown operation in --mix: {name}')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None
+    }
+
+
+def run_level(operations, weights, concurrency, duration, warmup):
+    names = list(weights)
+    weight_values = [weights[name] for name in names]
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    record_from = time.monotonic() + warmup
+    stop_at = record_from + duration
+
+    def worker():
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                return
+            name = random.choices(names, weights=weight_values)[0]
+            started = time.monotonic()
+            try:
+                ok = operations[name]() < 400
+            except Exception:
+                ok = False
+            finished = time.monotonic()
+            if started >= record_from and finished <= stop_at:
+                with lock:
+                    samples[name].append((finished - started, ok))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+
+    result = {name: summarize(samples[name], duration) for name in names if samples[name]}
+    result['all'] = summarize([sample for name in names for sample in samples[name]], duration)
+    return result
+
+
+def print_report(results, baseline=None):
+    header = f"{'conc':>5} {'operation':<11} {'reqs':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for level, operations in results.items():
+        for name, stats in operations.items():
+            line = (f"{level:>5} {name:<11} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>9} "
+                    f"{stats['p50_ms']!s:>9} {stats['p95_ms']!s:>9} {stats['p99_ms']!s:>9}")
+            previous = (baseline or {}).get(level, {}).get(name)
+            if previous and previous.get('p95_ms') and stats['p95_ms']:
+                change = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+                rps_change = (stats['rps'] - previous['rps']) / previous['rps'] * 100 if previous['rps'] else 0
+                line += f"   p95 {change:+.1f}%  rps {rps_change:+.1f}%"
+            print(line)
+
+
+def main():
+    args = parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    app, server, base_url = start_app(args)
+    patient_ids = seed(app, args.seed_patients, args.notes_per_patient)
+    operations = build_operations(Client(base_url), patient_ids)
+    weights = parse_mix(args.mix, operations)
+
+    results = {}
+    try:
+        for level in levels:
+            print(f'Running concurrency {level} for {args.duration}s ...', file=sys.stderr)
+            results[str(level)] = run_level(operations, weights, level, args.duration, args.warmup)
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_report(results, baseline)
+
+    revision = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, f'{revision}.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'timestamp': datetime.utcnow().isoformat(),
+            'config': {
+                'concurrency': levels,
+                'duration': args.duration,
+                'mix': weights,
+                'llm_latency_ms': args.llm_latency_ms,
+                'database': 'sqlite' if not args.database_url else args.database_url.split(':', 1)[0],
+                'seed_patients': args.seed_patients
+            },
+            'results': results
+        }, f, indent=2)
+    print(f'\nSaved results to {output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
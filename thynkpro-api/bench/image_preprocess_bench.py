@@ -0,0 +1,120 @@
+"""
+Offline benchmark for the image pre-processing stage.
+
+Runs preprocess_image over sample images and reports bytes before and
+after, savings and time per image for each setting. Without --images it
+generates synthetic prescription-like photos (large, noisy, some with an
+EXIF rotation), so it needs no network, model or database.
+
+Usage (from thynkpro-api/):
+    python bench/image_preprocess_bench.py
+    python bench/image_preprocess_bench.py --images ~/samples --max-dimension 1600,2048 --quality 75,85
+    python bench/image_preprocess_bench.py --grayscale --format WEBP
+"""
+import argparse
+import io
+import mimetypes
+import os
+import random
+import statistics
+import sys
+import time
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_ROOT)
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from service.image_preprocessing import preprocess_image  # noqa: E402
+
+EXIF_ORIENTATION = 0x0112
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=None, help='Directory of sample images, defaults to synthetic ones')
+    parser.add_argument('--samples', type=int, default=6, help='Synthetic images to generate')
+    parser.add_argument('--max-dimension', default='1600,2048', help='Comma separated values to compare')
+    parser.add_argument('--quality', default='85', help='Comma separated values to compare')
+    parser.add_argument('--format', default='JPEG', help='JPEG or WEBP')
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per image')
+    return parser.parse_args()
+
+
+def synthetic_image(seed, size=(4032, 3024)):
+    """A phone-photo sized page of text-like strokes over sensor noise, as high quality JPEG"""
+    rng = random.Random(seed)
+    image = Image.effect_noise(size, 24).convert('RGB')
+    image = Image.blend(image, Image.new('RGB', size, (236, 232, 220)), 0.8)
+    draw = ImageDraw.Draw(image)
+    for line in range(60):
+        y = 150 + line * 45
+        x = 200
+        while x < size[0] - 300:
+            width = rng.randint(20, 140)
+            draw.rectangle([x, y, x + width, y + rng.randint(12, 22)], fill=(40, 40, 60))
+            x += width + rng.randint(15, 40)
+    image = image.filter(ImageFilter.GaussianBlur(1))
+
+    exif = Image.Exif()
+    # Every other sample is stored sideways, as phones do, and needs rotating
+    if seed % 2:
+        exif[EXIF_ORIENTATION] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=95, exif=exif)
+    return f'synthetic-{seed}.jpg', 'image/jpeg', buffer.getvalue()
+
+
+def load_images(args):
+    if not args.images:
+        return [synthetic_image(seed) for seed in range(args.samples)]
+    images = []
+    for name in sorted(os.listdir(args.images)):
+        mime_type = mimetypes.guess_type(name)[0]
+        if not mime_type or not mime_type.startswith('image/'):
+            continue
+        with open(os.path.join(args.images, name), 'rb') as image_file:
+            images.append((name, mime_type, image_file.read()))
+    return images
+
+
+def run(images, max_dimension, quality, args):
+    original = output = 0
+    timings = []
+    for _, mime_type, data in images:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            _, _, stats = preprocess_image(data, mime_type, max_dimension=max_dimension, grayscale=args.grayscale,
+                                           output_format=args.format, quality=quality)
+            timings.append((time.perf_counter() - started) * 1000)
+        original += stats['original_bytes']
+        output += stats['output_bytes']
+    return {
+        'max_dimension': max_dimension,
+        'quality': quality,
+        'input_kb': original / 1024,
+        'output_kb': output / 1024,
+        'saved_pct': 100 * (original - output) / original if original else 0,
+        'ms_p50': statistics.median(timings),
+        'ms_max': max(timings)
+    }
+
+
+def main():
+    args = parse_args()
+    images = load_images(args)
+    if not images:
+        sys.exit('No images found')
+    print(f"{len(images)} images, {sum(len(data) for _, _, data in images) / 1024 / 1024:.1f} MB total, "
+          f"format={args.format.upper()} grayscale={args.grayscale}")
+    print(f"{'max_dim':>8} {'quality':>8} {'in KB':>10} {'out KB':>10} {'saved':>7} {'p50 ms':>8} {'max ms':>8}")
+    for max_dimension in [int(value) for value in args.max_dimension.split(',')]:
+        for quality in [int(value) for value in args.quality.split(',')]:
+            row = run(images, max_dimension, quality, args)
+            print(f"{row['max_dimension']:>8} {row['quality']:>8} {row['input_kb']:>10.0f} {row['output_kb']:>10.0f} "
+                  f"{row['saved_pct']:>6.1f}% {row['ms_p50']:>8.1f} {row['ms_max']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
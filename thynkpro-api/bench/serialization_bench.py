@@ -0,0 +1,146 @@
+"""
+Micro-benchmark of the response serialization paths.
+
+Compares, for a patient's note history and for a page of the patient list:
+  orm+default   ORM instances, to_dict() and Flask's default JSON provider
+  orm+orjson    ORM instances, to_dict() and the orjson provider
+  rows+orjson   plain column rows, model.serializers.rows_to_dicts and orjson
+
+Each path runs the query and the encoding (what a request pays after
+routing) against a fresh SQLite database with the stub model. Prints the
+median and p95 time per call.
+
+Usage (from thynkpro-api/):
+    python bench/serialization_bench.py
+    python bench/serialization_bench.py --notes 50,500,5000 --repeat 50
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', default='50,500,5000', help='Comma separated note counts for one patient')
+    parser.add_argument('--patients', type=int, default=200, help='Rows in the patient list page')
+    parser.add_argument('--repeat', type=int, default=30, help='Timed calls per path')
+    return parser.parse_args()
+
+
+def load_app():
+    database = os.path.join(tempfile.mkdtemp(prefix='serialization-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ['AI_BACKEND'] = 'stub'
+    os.environ['SCHEMA_CHECK_ON_STARTUP'] = 'false'
+    sys.path.insert(0, API_ROOT)
+    logging.disable(logging.WARNING)
+    from app import app
+    return app
+
+
+def seed_patients(db, Patient, patients):
+    started = datetime.utcnow() - timedelta(days=1)
+    target = None
+    for index in range(patients):
+        patient = Patient(id=uuid.uuid4(), patient_name=f'Patient {index}', patient_age=20 + index % 60,
+                          patient_gender='Female', diagnosis='Type 2 diabetes mellitus with neuropathy',
+                          created_at=started + timedelta(seconds=index))
+        db.session.add(patient)
+        target = target or patient
+    db.session.commit()
+    return target.id
+
+
+def measure(function, repeat):
+    function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    args = parse_args()
+    app = load_app()
+    from flask.json.provider import DefaultJSONProvider
+    from config.db_config import db
+    from config.json_provider import OrjsonProvider, orjson
+    from model.patient import Patient, Note
+    from model.serializers import columns, rows_to_dicts, NOTE_FIELDS
+    from service.patient_service import PATIENT_LIST_FIELDS
+
+    if orjson is None:
+        sys.exit('orjson is not installed')
+    providers = {'default': DefaultJSONProvider(app), 'orjson': OrjsonProvider(app)}
+
+    def use(provider):
+        # rows_to_dicts checks the active provider for native UUID/datetime support
+        app.json = providers[provider]
+
+    def orm_notes(provider, patient_id):
+        use(provider)
+        notes = db.session.query(Note).filter(Note.patient_id == patient_id).order_by(Note.created_at).all()
+        data = app.json.dumps([note.to_dict() for note in notes])
+        db.session.expunge_all()
+        return data
+
+    def row_notes(provider, patient_id):
+        use(provider)
+        rows = db.session.query(*columns(Note, NOTE_FIELDS)).filter(Note.patient_id == patient_id) \
+            .order_by(Note.created_at).all()
+        return app.json.dumps(rows_to_dicts(rows, NOTE_FIELDS))
+
+    def orm_patients(provider, limit):
+        use(provider)
+        patients = db.session.query(Patient).order_by(Patient.created_at.desc()).limit(limit).all()
+        data = app.json.dumps([patient.to_dict(include=()) for patient in patients])
+        db.session.expunge_all()
+        return data
+
+    def row_patients(provider, limit):
+        use(provider)
+        rows = db.session.query(*columns(Patient, PATIENT_LIST_FIELDS)) \
+            .order_by(Patient.created_at.desc()).limit(limit).all()
+        return app.json.dumps(rows_to_dicts(rows, PATIENT_LIST_FIELDS))
+
+    print(f"{'case':<22} {'path':<12} {'p50 ms':>9} {'p95 ms':>9}")
+    with app.app_context():
+        db.create_all()
+        note_counts = [int(value) for value in args.notes.split(',')]
+        seeded = 0
+        patient_id = seed_patients(db, Patient, args.patients)
+        # Notes are added to the first patient incrementally, one case per count
+        for count in note_counts:
+            for _ in range(seeded, count):
+                db.session.add(Note(id=uuid.uuid4(), patient_id=patient_id,
+                                    content='Follow-up visit, sugar levels stable, continue current dose. ' * 3))
+            db.session.commit()
+            seeded = count
+            case = f'{count} notes'
+            for name, function in (('orm+default', lambda: orm_notes('default', patient_id)),
+                                   ('orm+orjson', lambda: orm_notes('orjson', patient_id)),
+                                   ('rows+orjson', lambda: row_notes('orjson', patient_id))):
+                p50, p95 = measure(function, args.repeat)
+                print(f"{case:<22} {name:<12} {p50:>9.2f} {p95:>9.2f}")
+
+        case = f'{args.patients} patient list'
+        for name, function in (('orm+default', lambda: orm_patients('default', args.patients)),
+                               ('orm+orjson', lambda: orm_patients('orjson', args.patients)),
+                               ('rows+orjson', lambda: row_patients('orjson', args.patients))):
+            p50, p95 = measure(function, args.repeat)
+            print(f"{case:<22} {name:<12} {p50:>9.2f} {p95:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Startup time benchmark.
+
+Each measurement runs in a fresh interpreter, the way a new worker or a
+one-off CLI job starts:
+  import app        importing app.py, which builds the module level app
+  create_app        one more create_app() call in an already imported process
+  model backend     loading the model SDK on the first model call (skipped
+                    when google.generativeai is not installed)
+
+Also prints the slowest imports from python -X importtime, to show what
+startup still pays for.
+
+Usage (from thynkpro-api/):
+    python bench/startup_bench.py
+    python bench/startup_bench.py --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = '''
+import json, logging, time
+logging.disable(logging.WARNING)
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+backend = None
+if {load_backend}:
+    from config.ai_config import backend as lazy_backend
+    lazy_backend.get()
+    backend = time.perf_counter() - created
+print(json.dumps({{'import_app': imported - started, 'create_app': created - imported, 'backend': backend}}))
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list')
+    return parser.parse_args()
+
+
+def bench_env():
+    env = dict(os.environ)
+    database = os.path.join(tempfile.mkdtemp(prefix='startup-bench-'), 'bench.db')
+    env.update({
+        'DATABASE_URL': f'sqlite:///{database}',
+        'SCHEMA_CHECK_ON_STARTUP': 'false',
+        'AI_BACKEND': 'gemini',
+        # Never used for a request; genai only needs a value to configure itself
+        'GOOGLE_API_KEY': env.get('GOOGLE_API_KEY') or 'startup-bench',
+        'PYTHONWARNINGS': 'ignore'
+    })
+    return env
+
+
+def genai_installed(env):
+    probe = subprocess.run([sys.executable, '-c', 'import importlib.util, sys; '
+                            'sys.exit(importlib.util.find_spec("google.generativeai") is None)'],
+                           cwd=API_ROOT, env=env)
+    return probe.returncode == 0
+
+
+def measure(env, load_backend):
+    output = subprocess.check_output([sys.executable, '-c', MEASURE.format(load_backend=load_backend)],
+                                     cwd=API_ROOT, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=API_ROOT, env=env, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # importtime indents each nesting level by two spaces
+        depth = len(name) - len(name.lstrip())
+        imports.append((int(cumulative), depth, name.strip()))
+    # importtime lists a module after its imports, so app's own imports are the
+    # entries one level deeper that come right before it
+    position = next(index for index, (_, _, name) in enumerate(imports) if name == 'app')
+    app_depth = imports[position][1]
+    direct = []
+    for cumulative, depth, name in reversed(imports[:position]):
+        if depth <= app_depth:
+            break
+        if depth == app_depth + 2:
+            direct.append((cumulative, name))
+    return sorted(direct, reverse=True)[:top]
+
+
+def main():
+    args = parse_args()
+    env = bench_env()
+    load_backend = genai_installed(env)
+    runs = [measure(env, load_backend) for _ in range(args.runs)]
+
+    print(f"{'step':<16} {'p50 ms':>9} {'max ms':>9}")
+    for key, label in (('import_app', 'import app'), ('create_app', 'create_app'), ('backend', 'model backend')):
+        values = [run[key] * 1000 for run in runs if run[key] is not None]
+        if values:
+            print(f"{label:<16} {statistics.median(values):>9.1f} {max(values):>9.1f}")
+    if not load_backend:
+        print("model backend    skipped, google.generativeai is not installed")
+
+    print("\nSlowest imports made by app.py (cumulative)")
+    for cumulative, name in slowest_imports(env, args.top):
+        print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+from commands.search_commands import search_cli
+from commands.transfer_commands import patients_cli
+from commands.dedup_commands import dedup_cli
+from commands.summary_commands import summaries_cli
+
+def init_commands(app):
+    """Register the Flask CLI command groups"""
+    app.cli.add_command(search_cli)
+    app.cli.add_command(patients_cli)
+    app.cli.add_command(dedup_cli)
+    app.cli.add_command(summaries_cli)
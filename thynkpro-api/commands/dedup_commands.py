@@ -0,0 +1,12 @@
+import click
+from flask.cli import AppGroup
+from service.patient_dedup_service import rebuild_blocking_keys
+
+dedup_cli = AppGroup('dedup', help='Maintain the duplicate-patient blocking index.')
+
+@dedup_cli.command('rebuild')
+@click.option('--batch-size', default=500, show_default=True, help='Patients processed per commit.')
+def rebuild(batch_size):
+    """Build blocking keys for every existing patient."""
+    indexed = rebuild_blocking_keys(batch_size)
+    click.echo(f"Indexed {indexed} patients")
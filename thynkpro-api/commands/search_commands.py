@@ -0,0 +1,12 @@
+import click
+from flask.cli import AppGroup
+from service.search_index import rebuild_index
+
+search_cli = AppGroup('search', help='Maintain the patient full-text search index.')
+
+@search_cli.command('rebuild')
+@click.option('--batch-size', default=500, show_default=True, help='Patients indexed per commit.')
+def rebuild(batch_size):
+    """Build search documents for every existing patient."""
+    indexed = rebuild_index(batch_size)
+    click.echo(f"Indexed {indexed} patients")
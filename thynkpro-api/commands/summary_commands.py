@@ -0,0 +1,37 @@
+import json
+import click
+from flask.cli import AppGroup
+from service.summary_regeneration_service import (
+    regenerate_summaries, SUMMARY_REGENERATION_CONCURRENCY, SUMMARY_REGENERATION_RATE_PER_SECOND,
+    SUMMARY_REGENERATION_BATCH_SIZE, SUMMARY_REGENERATION_CHECKPOINT
+)
+
+summaries_cli = AppGroup('summaries', help='Bulk maintenance of AI patient summaries.')
+
+def _echo_progress(report):
+    click.echo(
+        f"{report['processed']} patients: {report['regenerated']} regenerated, {report['unchanged']} unchanged, "
+        f"{report['failed']} failed, {report['patients_per_second']}/s, {report['elapsed_seconds']}s elapsed",
+        err=True
+    )
+
+@summaries_cli.command('regenerate')
+@click.option('--concurrency', default=SUMMARY_REGENERATION_CONCURRENCY, show_default=True,
+              help='Model calls in flight at once.')
+@click.option('--rate', default=SUMMARY_REGENERATION_RATE_PER_SECOND, show_default=True,
+              help='Model calls started per second, 0 for no limit.')
+@click.option('--batch-size', default=SUMMARY_REGENERATION_BATCH_SIZE, show_default=True,
+              help='Patients committed and checkpointed together.')
+@click.option('--checkpoint', default=SUMMARY_REGENERATION_CHECKPOINT, show_default=True,
+              help='Progress file used to resume an interrupted run.')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint and start from the first patient.')
+@click.option('--only-changed', is_flag=True, help='Skip patients whose summary inputs are unchanged.')
+def regenerate(concurrency, rate, batch_size, checkpoint, restart, only_changed):
+    """Regenerate every patient's summary, resuming from the checkpoint if there is one."""
+    report = regenerate_summaries(
+        force=not only_changed, concurrency=concurrency, rate_per_second=rate, batch_size=batch_size,
+        checkpoint_path=checkpoint, resume=not restart, progress=_echo_progress
+    )
+    click.echo(json.dumps(report, indent=2))
+    if report['failed']:
+        raise SystemExit(1)
@@ -0,0 +1,26 @@
+import json
+import click
+from flask.cli import AppGroup
+from service.patient_transfer_service import iter_patient_ndjson, import_patients, TRANSFER_BATCH_SIZE
+
+patients_cli = AppGroup('patients', help='Export and bulk import patients as NDJSON.')
+
+@patients_cli.command('export')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='File to write, defaults to stdout.')
+@click.option('--batch-size', default=TRANSFER_BATCH_SIZE, show_default=True, help='Patients fetched per round trip.')
+def export_command(output, batch_size):
+    """Write every patient with medicines, notes and summaries, one JSON record per line."""
+    for line in iter_patient_ndjson(batch_size):
+        output.write(line)
+
+@patients_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', default=TRANSFER_BATCH_SIZE, show_default=True, help='Records inserted per commit.')
+@click.option('--no-index', is_flag=True, help='Skip search documents; run "flask search rebuild" afterwards.')
+def import_command(source, batch_size, no_index):
+    """Bulk insert patients from an NDJSON file ("-" for stdin), e.g. one written by export."""
+    report = import_patients(source, batch_size, update_index=not no_index)
+    click.echo(json.dumps(report, indent=2))
+    if report['failed']:
+        raise SystemExit(1)
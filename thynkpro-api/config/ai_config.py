@@ -1,15 +1,81 @@
 import os
-import google.generativeai as genai
+import threading
 from dotenv import load_dotenv
+from config.llm_client import LLMClient
 
 load_dotenv()
 
 api_key = os.getenv("GOOGLE_API_KEY")
 model_name = os.getenv("GOOGLE_MODEL")
+# "grpc" (SDK default) or "rest"; serve.py uses rest, which gevent can make cooperative
+api_transport = os.getenv("GOOGLE_API_TRANSPORT") or None
 
-if not api_key:
-    raise ValueError("No GOOGLE_API_KEY found in environment variables.")
+# "gemini" (default) talks to Google, "stub" uses a deterministic local model
+ai_backend = os.getenv("AI_BACKEND", "gemini").lower()
 
-# Configure Gemini
-genai.configure(api_key=api_key)
-model = genai.GenerativeModel(model_name)
+# Client-side limits applied to every model call, see config/llm_client.py
+llm_config = {
+    'max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+    'rate_per_second': float(os.getenv('LLM_RATE_PER_SECOND', '0')),
+    'burst': int(os.getenv('LLM_BURST', '0')) or None,
+    'timeout': float(os.getenv('LLM_TIMEOUT_SECONDS', '60')),
+    'max_retries': int(os.getenv('LLM_MAX_RETRIES', '3')),
+    'retry_base': float(os.getenv('LLM_RETRY_BASE_SECONDS', '0.5')),
+    'retry_max': float(os.getenv('LLM_RETRY_MAX_SECONDS', '8')),
+    'queue_timeout': float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '30'))
+}
+
+
+def create_backend():
+    """
+    Build the model backend selected by AI_BACKEND.
+
+    Raises:
+        ValueError: If the Gemini backend is selected without a GOOGLE_API_KEY
+    """
+    if ai_backend == "stub":
+        from config.stub_model import StubModel
+        return StubModel(latency=float(os.getenv('LLM_STUB_LATENCY_MS', '0')) / 1000)
+
+    if not api_key:
+        raise ValueError("No GOOGLE_API_KEY found in environment variables.")
+
+    # google.generativeai is slow to import, so it is only loaded for the first model call
+    import google.generativeai as genai
+
+    # Configure Gemini
+    genai.configure(api_key=api_key, transport=api_transport)
+    return genai.GenerativeModel(model_name)
+
+
+class LazyBackend:
+    """
+    Backend that is created on its first generate_content call.
+
+    Lets the app, migrations and CLI commands start without importing the
+    Gemini SDK or having an API key; only code that calls the model needs them.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._backend is not None
+
+    def get(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._factory()
+        return self._backend
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        return self.get().generate_content(prompt, stream=stream, **kwargs)
+
+
+backend = LazyBackend(create_backend)
+# The stub does not accept genai's request_options
+model = LLMClient(backend, pass_timeout=ai_backend != "stub", **llm_config)
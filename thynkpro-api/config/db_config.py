@@ -1,5 +1,9 @@
 import os
+import threading
+from flask import current_app
+from flask.globals import app_ctx
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import scoped_session, sessionmaker
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,20 +16,105 @@ DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT')
 DB_NAME = os.getenv('DB_NAME')
 
-# SQLAlchemy database URI
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# SQLAlchemy database URI, DATABASE_URL overrides the individual settings
+# (e.g. a local SQLite file for benchmarks)
+DATABASE_URL = os.getenv('DATABASE_URL') or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Optional read replica used by read-only service functions
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+# Server-side statement timeout in milliseconds (Postgres only), 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
+def engine_options(url):
+    """Pool and connection options for an engine, limited to what the dialect supports"""
+    options = {
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'pool_recycle': DB_POOL_RECYCLE
+    }
+    if url.startswith('sqlite'):
+        return options
+    options.update({
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT
+    })
+    if url.startswith('postgresql') and DB_STATEMENT_TIMEOUT_MS:
+        options['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
+    return options
 
 # SQLAlchemy configuration
 db_config = {
     'SQLALCHEMY_DATABASE_URI': DATABASE_URL,
+    'SQLALCHEMY_ENGINE_OPTIONS': engine_options(DATABASE_URL),
     'SQLALCHEMY_TRACK_MODIFICATIONS': False,
     'SQLALCHEMY_ECHO': os.getenv('SQLALCHEMY_ECHO', 'False').lower() == 'true'
 }
 
+if DATABASE_REPLICA_URL:
+    db_config['SQLALCHEMY_BINDS'] = {
+        'replica': {'url': DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)}
+    }
+
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+_replica_session_lock = threading.Lock()
+
 def init_db(app):
-    """Initialize the database with the Flask app"""
-    app.config.update(db_config)
+    """
+    Initialize the database with the Flask app.
+
+    Settings already in app.config (e.g. passed to create_app) take
+    precedence over the environment; pool options follow the effective URI.
+    """
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', DATABASE_URL)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    for key, value in db_config.items():
+        app.config.setdefault(key, value)
     db.init_app(app)
+
+    @app.teardown_appcontext
+    def remove_read_session(exc):
+        session = app.extensions.get('replica_session')
+        if session is not None:
+            session.remove()
+
+def release_connection():
+    """
+    End db.session's transaction so its pooled connection goes back to the
+    pool before a slow call such as the model. Loaded objects stay usable
+    and reload on their next attribute access.
+    """
+    db.session.commit()
+
+def read_session():
+    """
+    Session for read-only queries.
+
+    Bound to the replica when DATABASE_REPLICA_URL is set, otherwise this is
+    db.session. Reads that must see the caller's own writes (e.g. the
+    response to an update) should keep using db.session.
+    """
+    app = current_app._get_current_object()
+    if 'replica' not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return db.session
+
+    session = app.extensions.get('replica_session')
+    if session is None:
+        with _replica_session_lock:
+            session = app.extensions.get('replica_session')
+            if session is None:
+                # Scoped to the app context, the same way Flask-SQLAlchemy scopes db.session
+                session = scoped_session(
+                    sessionmaker(bind=db.engines['replica']),
+                    scopefunc=lambda: id(app_ctx._get_current_object())
+                )
+                app.extensions['replica_session'] = session
+    return session
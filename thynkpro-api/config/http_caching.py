@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import os
+from flask import request, make_response
+from config.instrumentation import timed_phase
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is used without it
+    brotli = None
+
+# Compress JSON responses at least this large when the client accepts it
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+
+COMPRESSIBLE_MIME_TYPES = ('application/json',)
+
+
+def make_etag(*parts):
+    """Strong ETag value from the parts that determine a representation"""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def _etag_variants(etag):
+    # A compressed body is a different representation and carries a suffixed ETag
+    return (etag, f'{etag}-gzip', f'{etag}-br')
+
+
+def not_modified(etag, last_modified=None):
+    """
+    A 304 response when the request's validators match, otherwise None.
+
+    Checked before the body is built, so an unchanged resource costs only
+    the version query. When the request has If-None-Match the ETag alone
+    decides and If-Modified-Since is ignored (RFC 9110). If-Modified-Since
+    only has one-second resolution, so a resource changed during the same
+    second as the date could have changed after the client's copy and is
+    always sent in full.
+    """
+    if request.if_none_match:
+        matched = next((variant for variant in _etag_variants(etag) if request.if_none_match.contains(variant)), None)
+        if matched is None:
+            return None
+        return _not_modified_response(matched, last_modified)
+    if last_modified is not None and request.if_modified_since is not None \
+            and last_modified.replace(microsecond=0) < request.if_modified_since.replace(tzinfo=None):
+        return _not_modified_response(etag, last_modified)
+    return None
+
+
+def _not_modified_response(etag, last_modified):
+    response = make_response('', 304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def add_validators(response, etag, last_modified=None):
+    """Set ETag/Last-Modified and ask clients to revalidate on every use"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+
+def init_compression(app):
+    """Compress large JSON responses with brotli or gzip, per Accept-Encoding"""
+
+    @app.after_request
+    def compress_response(response):
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIME_TYPES or 'Content-Encoding' in response.headers:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _choose_encoding()
+        if encoding is None or (response.content_length or 0) < COMPRESS_MIN_BYTES:
+            return response
+
+        with timed_phase('compress'):
+            response.set_data(_compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
@@ -0,0 +1,175 @@
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config.metrics import registry, Counter, Gauge, Histogram
+
+# Phases reported in the Server-Timing header, in order
+TIMING_PHASES = ('db', 'llm', 'serialize', 'compress', 'preprocess')
+
+http_requests = registry.register(Counter(
+    'http_requests_total', 'HTTP requests handled', ('method', 'route', 'status')))
+http_request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route')))
+http_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled'))
+db_queries = registry.register(Counter(
+    'db_queries_total', 'SQL statements executed'))
+db_query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'SQL statement latency',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)))
+llm_calls = registry.register(Counter(
+    'llm_calls_total', 'Model calls by outcome', ('outcome',)))
+llm_call_duration = registry.register(Histogram(
+    'llm_call_duration_seconds', 'Model call latency including retries'))
+llm_client_stats = registry.register(Gauge(
+    'llm_client', 'Model client counters since startup (retries, rate_limited, queue_timeouts, in_flight)', ('stat',)))
+
+
+def _timings():
+    """Per-request phase accumulator, or None outside a request"""
+    if not has_request_context():
+        return None
+    if 'timings' not in g:
+        g.timings = {phase: 0.0 for phase in TIMING_PHASES}
+        g.db_query_count = 0
+    return g.timings
+
+
+def record_phase(phase, seconds):
+    timings = _timings()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed_phase(phase):
+    """Add the time spent in the block to the current request's phase total"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+def timed_json_provider(provider_class):
+    """Subclass of a JSON provider that counts encoding time as serialization"""
+    # Set while response() runs, so the dumps() call inside it is not counted twice
+    encoding = threading.local()
+
+    class TimedJSONProvider(provider_class):
+
+        def dumps(self, obj, **kwargs):
+            if getattr(encoding, 'active', False):
+                return super().dumps(obj, **kwargs)
+            with timed_phase('serialize'):
+                return super().dumps(obj, **kwargs)
+
+        def response(self, *args, **kwargs):
+            # Also covers providers that build the body without calling dumps
+            encoding.active = True
+            try:
+                with timed_phase('serialize'):
+                    return super().response(*args, **kwargs)
+            finally:
+                encoding.active = False
+
+    TimedJSONProvider.__name__ = f'Timed{provider_class.__name__}'
+    return TimedJSONProvider
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    db_queries.inc()
+    db_query_duration.observe(elapsed)
+    if _timings() is not None:
+        record_phase('db', elapsed)
+        g.db_query_count += 1
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # after_cursor_execute does not fire for a statement that failed, so drop
+    # its start time here; errors raised later (e.g. while fetching) find
+    # another statement, or nothing, on top and leave the stack alone
+    pending = context.connection.info.get('query_started') if context.connection is not None else None
+    if pending and pending[-1][0] is context.execution_context:
+        pending.pop()
+
+
+def _on_llm_call(elapsed, failed):
+    llm_calls.inc(outcome='error' if failed else 'ok')
+    llm_call_duration.observe(elapsed)
+    record_phase('llm', elapsed)
+
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def _server_timing_header(timings, total):
+    parts = []
+    for phase in TIMING_PHASES:
+        description = f';desc="{g.db_query_count} queries"' if phase == 'db' else ''
+        parts.append(f'{phase};dur={timings[phase] * 1000:.2f}{description}')
+    other = max(total - sum(timings.values()), 0.0)
+    parts.append(f'app;dur={other * 1000:.2f}')
+    parts.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(parts)
+
+
+def init_instrumentation(app, model=None):
+    """
+    Time every request and expose the breakdown.
+
+    DB time comes from SQLAlchemy cursor events, model time from the LLM
+    client listener, serialization from timed_phase blocks and the app's
+    JSON provider (wrapped here, so install it before calling this).
+    Totals go out in the Server-Timing header and into the registry
+    rendered at /metrics.
+    """
+    app.json_provider_class = timed_json_provider(app.json_provider_class)
+    app.json = app.json_provider_class(app)
+
+    # Once per model, so apps built repeatedly by create_app do not count calls twice
+    if model is not None and hasattr(model, 'add_listener') and not getattr(model, '_instrumented', False):
+        model._instrumented = True
+        model.add_listener(_on_llm_call)
+
+        def collect_llm_stats():
+            for stat, value in model.stats().items():
+                if stat in ('retries', 'rate_limited', 'queue_timeouts', 'in_flight'):
+                    llm_client_stats.set(value, stat=stat)
+
+        registry.add_collector(collect_llm_stats)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        _timings()
+        http_in_flight.inc()
+
+    @app.after_request
+    def add_server_timing(response):
+        if 'request_started' not in g:
+            return response
+        total = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = _server_timing_header(g.timings, total)
+        route = _route_label()
+        http_requests.inc(method=request.method, route=route, status=response.status_code)
+        http_request_duration.observe(total, method=request.method, route=route)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if 'request_started' in g:
+            http_in_flight.dec()
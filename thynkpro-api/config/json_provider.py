@@ -0,0 +1,61 @@
+import os
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the default provider is used without it
+    orjson = None
+
+# JSON provider for responses: orjson (when installed) or default
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson').lower()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    UUIDs and datetimes are encoded natively (as str(uuid) and isoformat()),
+    so serializers can hand over raw column values. Other types fall back
+    to DefaultJSONProvider.default. Keys stay sorted, as with the default
+    provider, so responses are byte-for-byte comparable.
+    """
+
+    # Tells model.serializers it can skip converting UUIDs and datetimes
+    native_types = True
+
+    def _options(self, kwargs):
+        options = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options(kwargs))
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Builds the body from bytes directly instead of going through a str
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self.dumps_bytes(obj, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def json_provider_class():
+    """The configured provider class, falling back to Flask's default when orjson is missing"""
+    if JSON_PROVIDER == 'orjson' and orjson is not None:
+        return OrjsonProvider
+    return DefaultJSONProvider
+
+
+def init_json(app):
+    """Install the configured JSON provider on the app"""
+    app.json_provider_class = json_provider_class()
+    app.json = app.json_provider_class(app)
@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes (exposed as .code on google.api_core exceptions) worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMQueueTimeout(Exception):
+    """Raised when no concurrency slot or rate token frees up in time"""
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class LLMClient:
+    """
+    Wraps a model backend (genai.GenerativeModel or the local stub) with a
+    concurrency cap, an optional token-bucket rate limit, per-call timeouts,
+    jittered exponential retries on retryable errors, and call counters.
+
+    Exposes the same generate_content signature as the backend, so services
+    keep calling model.generate_content unchanged.
+    """
+
+    def __init__(self, backend, max_concurrency=8, rate_per_second=0, burst=None, timeout=60,
+                 max_retries=3, retry_base=0.5, retry_max=8, queue_timeout=30, pass_timeout=True):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.queue_timeout = queue_timeout
+        # genai accepts request_options={"timeout": ...}; the stub does not need it
+        self.pass_timeout = pass_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(rate_per_second, burst or max(int(rate_per_second), 1)) if rate_per_second > 0 else None
+        self._stats_lock = threading.Lock()
+        self._listeners = []
+        self._stats = {
+            'calls': 0,
+            'errors': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'queue_timeouts': 0,
+            'in_flight': 0,
+            'latency_seconds_total': 0.0,
+            'latency_seconds_max': 0.0
+        }
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def _observe(self, elapsed, failed=False):
+        with self._stats_lock:
+            self._stats['latency_seconds_total'] += elapsed
+            self._stats['latency_seconds_max'] = max(self._stats['latency_seconds_max'], elapsed)
+        for listener in self._listeners:
+            listener(elapsed, failed)
+
+    def add_listener(self, listener):
+        """Register listener(elapsed_seconds, failed) to be called after every model call"""
+        self._listeners.append(listener)
+
+    def stats(self):
+        """Snapshot of the counters since startup"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def is_retryable(error):
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        return getattr(error, 'code', None) in RETRYABLE_STATUS_CODES
+
+    def _backoff(self, attempt):
+        # Full jitter keeps a burst of 429s from retrying in lockstep
+        return random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count(queue_timeouts=1)
+            raise LLMQueueTimeout("Timed out waiting for a free model slot")
+        if self._bucket and not self._bucket.acquire(self.queue_timeout):
+            self._slots.release()
+            self._count(queue_timeouts=1)
+            raise LLMQueueTimeout("Timed out waiting for the model rate limit")
+        self._count(in_flight=1)
+
+    def _release(self):
+        self._count(in_flight=-1)
+        self._slots.release()
+
+    def _call_backend(self, prompt, stream, kwargs):
+        if self.pass_timeout and self.timeout:
+            kwargs.setdefault('request_options', {}).setdefault('timeout', self.timeout)
+        return self.backend.generate_content(prompt, stream=stream, **kwargs)
+
+    def _request(self, prompt, stream, kwargs):
+        # Called with a slot held; retries the initial request only
+        attempt = 0
+        while True:
+            self._count(calls=1)
+            try:
+                return self._call_backend(prompt, stream, dict(kwargs))
+            except Exception as e:
+                self._count(errors=1, rate_limited=1 if getattr(e, 'code', None) == 429 else 0)
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("Model call failed (%s), retry %d in %.2fs", e, attempt + 1, delay)
+                self._count(retries=1)
+                attempt += 1
+                time.sleep(delay)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        """
+        Call the backend with limiting and retries.
+
+        With stream=True a generator is returned and nothing happens until it
+        is first iterated: the concurrency slot is taken then and held until
+        the generator is exhausted or closed, so a stream that is never read
+        does not hold a slot. Only the initial request is retried.
+        """
+        if stream:
+            return self._stream(prompt, kwargs)
+        self._acquire()
+        started = time.monotonic()
+        try:
+            response = self._request(prompt, False, kwargs)
+        except Exception:
+            self._observe(time.monotonic() - started, failed=True)
+            raise
+        else:
+            self._observe(time.monotonic() - started)
+            return response
+        finally:
+            self._release()
+
+    def _stream(self, prompt, kwargs):
+        self._acquire()
+        started = time.monotonic()
+        failed = False
+        try:
+            response = self._request(prompt, True, kwargs)
+        except Exception:
+            self._observe(time.monotonic() - started, failed=True)
+            self._release()
+            raise
+        try:
+            for chunk in response:
+                yield chunk
+        except Exception:
+            failed = True
+            self._count(errors=1)
+            raise
+        finally:
+            self._observe(time.monotonic() - started, failed)
+            self._release()
@@ -0,0 +1,123 @@
+import threading
+from collections import defaultdict
+
+# Default latency buckets in seconds, from fast DB reads up to slow model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values)) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        self._values = defaultdict(float)
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._values[self._key(labels)] += amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self.label_names, key)} {value}' for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = {}
+        self._sums = defaultdict(float)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    def render(self):
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Minimal in-process metric registry rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """collector() is called before each render, to refresh gauges from other sources"""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
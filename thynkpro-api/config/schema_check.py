@@ -0,0 +1,49 @@
+import logging
+import os
+from config.db_config import db
+
+logger = logging.getLogger(__name__)
+
+# Compare the live schema with the models when the server starts (serve.py, python app.py) and log any drift
+SCHEMA_CHECK_ON_STARTUP = os.getenv('SCHEMA_CHECK_ON_STARTUP', 'True').lower() == 'true'
+
+
+def _describe(diff):
+    # compare_metadata yields tuples, or lists of tuples for column modifications
+    if isinstance(diff, list):
+        return '; '.join(_describe(item) for item in diff)
+    action, *args = diff
+    names = [arg if isinstance(arg, str) else getattr(arg, 'name', None) for arg in args]
+    return ' '.join([action] + [name for name in names if name])
+
+
+def schema_drift():
+    """
+    Differences between the connected database and the model metadata.
+
+    Returns:
+        list: Human readable descriptions, empty when the schema matches
+    """
+    # Imported here so startup only pays for alembic when the check is enabled
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    with db.engine.connect() as connection:
+        # Column types are skipped: the UUID/TSVECTOR variants differ per dialect
+        # and would report false drift on SQLite
+        context = MigrationContext.configure(connection, opts={'compare_type': False})
+        return [_describe(diff) for diff in compare_metadata(context, db.metadata)]
+
+
+def check_schema(app):
+    """Log a warning for each model/database mismatch, e.g. a missing index or unapplied migration"""
+    if not SCHEMA_CHECK_ON_STARTUP:
+        return
+    with app.app_context():
+        try:
+            drift = schema_drift()
+        except Exception as e:
+            logger.warning("Schema check skipped: %s", e)
+            return
+    if drift:
+        logger.warning("Schema differs from the models, run 'flask db upgrade': %s", ', '.join(drift))
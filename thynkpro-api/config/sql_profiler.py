@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('sql_profiler')
+
+# Opt-in per-request SQL profiling, off by default
+SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', 'False').lower() == 'true'
+# Fraction of requests profiled (0.0 - 1.0)
+SQL_PROFILER_SAMPLE_RATE = float(os.getenv('SQL_PROFILER_SAMPLE_RATE', '1.0'))
+# Statements slower than this are reported as slow
+SQL_PROFILER_SLOW_MS = float(os.getenv('SQL_PROFILER_SLOW_MS', '100'))
+# Same statement shape executed this many times in one request is flagged as N+1
+SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', '3'))
+# Number of slowest statements included in each report
+SQL_PROFILER_TOP = int(os.getenv('SQL_PROFILER_TOP', '5'))
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:[^()]|\([^()]*\))*\)', re.IGNORECASE)
+_POSTCOMPILE = re.compile(r'__\[POSTCOMPILE_\w+\]')
+
+
+def statement_shape(statement):
+    """Normalize a statement so executions differing only in values compare equal"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _POSTCOMPILE.sub('?', shape)
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+def _profile():
+    if not has_request_context():
+        return None
+    return g.get('sql_profile')
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile() is not None:
+        conn.info.setdefault('profiler_started', []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    started = conn.info.get('profiler_started')
+    if not started or started[-1][0] is not context:
+        return
+    _, query_started = started.pop()
+    if profile is not None:
+        profile.append((statement_shape(statement), (time.perf_counter() - query_started) * 1000))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement gets no after_cursor_execute, discard its start time
+    started = context.connection.info.get('profiler_started') if context.connection is not None else None
+    if started and started[-1][0] is context.execution_context:
+        started.pop()
+
+
+def build_report(queries):
+    """
+    Summarize (shape, duration_ms) pairs recorded for one request.
+
+    Returns:
+        dict: Query count, total DB time, slowest statements, slow statements
+            over the threshold and shapes repeated often enough to suggest N+1
+    """
+    shape_counts = Counter(shape for shape, _ in queries)
+    slowest = sorted(queries, key=lambda item: item[1], reverse=True)[:SQL_PROFILER_TOP]
+    return {
+        'query_count': len(queries),
+        'db_time_ms': round(sum(duration for _, duration in queries), 3),
+        'slowest': [{'statement': shape, 'duration_ms': round(duration, 3)} for shape, duration in slowest],
+        'slow_count': sum(1 for _, duration in queries if duration >= SQL_PROFILER_SLOW_MS),
+        'repeated': [
+            {'statement': shape, 'count': count}
+            for shape, count in shape_counts.most_common()
+            if count >= SQL_PROFILER_REPEAT_THRESHOLD
+        ]
+    }
+
+
+def init_sql_profiler(app):
+    """Profile a sample of requests and log one structured JSON report per request"""
+    if not SQL_PROFILER_ENABLED:
+        return
+
+    @app.before_request
+    def start_sql_profile():
+        if random.random() < SQL_PROFILER_SAMPLE_RATE:
+            g.sql_profile = []
+
+    @app.after_request
+    def log_sql_profile(response):
+        queries = g.pop('sql_profile', None)
+        if queries is None:
+            return response
+        report = build_report(queries)
+        report.update({
+            'event': 'sql_profile',
+            'method': request.method,
+            'route': request.url_rule.rule if request.url_rule else request.path,
+            'status': response.status_code,
+            'possible_n_plus_one': bool(report['repeated'])
+        })
+        level = logging.WARNING if report['repeated'] or report['slow_count'] else logging.INFO
+        logger.log(level, json.dumps(report))
+        return response
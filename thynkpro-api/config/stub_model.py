@@ -0,0 +1,65 @@
+import json
+import re
+import time
+
+# Canned extraction result returned for image prompts
+STUB_PATIENT = {
+    "patient_name": "Test Patient",
+    "patient_age": 42,
+    "patient_gender": "Male",
+    "diagnosis": "Acute bronchitis",
+    "doctor_advice": "Rest, fluids and review after five days",
+    "doctor_name": "Dr. Stub",
+    "hospital_name": "Local Test Hospital",
+    "medicines": [
+        {"medicine_name": "Amoxicillin", "dosage": "500 mg", "frequency": "Three times a day"},
+        {"medicine_name": "Paracetamol", "dosage": "650 mg", "frequency": "As needed"}
+    ]
+}
+
+STUB_SUMMARY = (
+    "The patient presents with the recorded diagnosis and is following the prescribed "
+    "treatment plan. Continue current medications and review at the next visit."
+)
+
+
+class StubResponse:
+    """Mimics the parts of a Gemini response object the services rely on"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """
+    Deterministic offline stand-in for genai.GenerativeModel.
+
+    Multimodal prompts (lists containing image parts) receive a JSON patient
+    record (fenced unless JSON response mode is requested), plain text prompts receive a fixed summary. With
+    stream=True the text is returned as word-sized chunks. latency (seconds)
+    simulates model response time; when streaming it is spread over the chunks.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        generation_config = kwargs.get('generation_config') or {}
+        if isinstance(prompt, list) and generation_config.get('response_mime_type') == 'application/json':
+            text = json.dumps(STUB_PATIENT)
+        elif isinstance(prompt, list):
+            text = "```json\n" + json.dumps(STUB_PATIENT) + "\n```"
+        else:
+            text = STUB_SUMMARY
+        if stream:
+            return self._stream(re.findall(r"\S+\s*", text))
+        if self.latency:
+            time.sleep(self.latency)
+        return StubResponse(text)
+
+    def _stream(self, chunks):
+        delay = self.latency / len(chunks) if chunks else 0
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield StubResponse(chunk)
@@ -0,0 +1,20 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Largest request body accepted, in megabytes; bigger uploads get a 413
+MAX_UPLOAD_MB = int(os.getenv('MAX_UPLOAD_MB', '50'))
+
+# Werkzeug already spools file parts over 500 KB to a temporary file,
+# so this bounds disk use per request rather than memory
+upload_config = {
+    'MAX_CONTENT_LENGTH': MAX_UPLOAD_MB * 1024 * 1024,
+    # Non-file form fields are held in memory
+    'MAX_FORM_MEMORY_SIZE': 1024 * 1024
+}
+
+def init_uploads(app):
+    """Apply the request size limits to the Flask app"""
+    app.config.update(upload_config)
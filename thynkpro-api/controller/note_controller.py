@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 import uuid
 from model.patient import Note, Patient
-from config.db_config import db
+from model.serializers import columns, rows_to_dicts, NOTE_FIELDS
+from config.db_config import db, read_session
+from service.search_index import index_patient
+from service.resource_versions import touch_patient
+from config.instrumentation import timed_phase
 
 note_bp = Blueprint('notes', __name__)
 
@@ -9,11 +13,16 @@ note_bp = Blueprint('notes', __name__)
 def get_patient_notes(patient_id):
     """Get all notes for a specific patient"""
     try:
-        patient = Patient.query.get(uuid.UUID(patient_id))
-        if not patient:
+        patient_uuid = uuid.UUID(patient_id)
+        session = read_session()
+        if not session.query(Patient.id).filter(Patient.id == patient_uuid).first():
             return jsonify({"error": "Patient not found"}), 404
         
-        notes = [note.to_dict() for note in patient.notes]
+        # Plain column rows, no Note instances are built
+        rows = session.query(*columns(Note, NOTE_FIELDS)).filter(Note.patient_id == patient_uuid) \
+            .order_by(Note.created_at).all()
+        with timed_phase('serialize'):
+            notes = rows_to_dicts(rows, NOTE_FIELDS)
         return jsonify(notes), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -33,6 +42,8 @@ def create_note(patient_id):
         )
         
         db.session.add(note)
+        touch_patient(note.patient_id)
+        index_patient(note.patient_id)
         db.session.commit()
         
         return jsonify(note.to_dict()), 201
@@ -44,7 +55,7 @@ def create_note(patient_id):
 def get_note(note_id):
     """Get a specific note by ID"""
     try:
-        note = Note.query.get(uuid.UUID(note_id))
+        note = read_session().get(Note, uuid.UUID(note_id))
         if not note:
             return jsonify({"error": "Note not found"}), 404
         
@@ -64,6 +75,8 @@ def update_note(note_id):
         if 'content' in data:
             note.content = data['content']
         
+        touch_patient(note.patient_id)
+        index_patient(note.patient_id)
         db.session.commit()
         return jsonify(note.to_dict()), 200
     except Exception as e:
@@ -79,6 +92,8 @@ def delete_note(note_id):
             return jsonify({"error": "Note not found"}), 404
         
         db.session.delete(note)
+        touch_patient(note.patient_id)
+        index_patient(note.patient_id)
         db.session.commit()
         
         return jsonify({"message": "Note deleted successfully"}), 200
@@ -1,18 +1,88 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from service.patient_service import extract_text_from_image, get_all_patients, delete_patient, update_patient, get_patient_by_id
+from service.extraction_job_service import submit_extraction_job, get_extraction_job
+from service.batch_extraction_service import extract_batch_uploads
+from service.search_service import search_patients
+from service.patient_transfer_service import iter_patient_ndjson, import_patients_upload
+from service.document_extraction_service import document_mime_type, extract_document
+from service.resource_versions import patient_version
+from config.http_caching import not_modified, add_validators
 from schema.json_schema import patient_json_schema
 
 patient_bp = Blueprint('patient', __name__, url_prefix='/patient')
 
+@patient_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    return jsonify({
+        "Message": f"Upload is larger than the {current_app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB limit",
+        "Data": {},
+        "success": "false"
+    }), 413
+
 @patient_bp.route('/extract_text', methods=['POST'])
 def extract_text():
     image_file = request.files['image']
-    result, status_code = extract_text_from_image(image_file, patient_json_schema)
+    # ?refresh=true skips the extraction cache and calls the model again
+    force_refresh = request.args.get('refresh', 'false').lower() == 'true'
+    # Multi-page PDFs and TIFFs are split and extracted page by page, in both modes
+    is_document = document_mime_type(image_file) is not None
+    # ?mode=async queues the extraction and returns a job id straight away
+    if request.args.get('mode') == 'async':
+        result, status_code = submit_extraction_job(
+            current_app._get_current_object(), image_file, patient_json_schema, force_refresh, is_document
+        )
+        return jsonify(result), status_code
+    if is_document:
+        result, status_code = extract_document(image_file, patient_json_schema, force_refresh)
+        return jsonify(result), status_code
+    result, status_code = extract_text_from_image(image_file, patient_json_schema, force_refresh)
+    return jsonify(result), status_code
+
+@patient_bp.route('/extract_jobs/<job_id>', methods=['GET'])
+def get_extract_job(job_id):
+    result, status_code = get_extraction_job(job_id)
+    return jsonify(result), status_code
+
+@patient_bp.route('/extract_batch', methods=['POST'])
+def extract_text_batch():
+    concurrency = request.args.get('concurrency', type=int)
+    force_refresh = request.args.get('refresh', 'false').lower() == 'true'
+    result, status_code = extract_batch_uploads(
+        request.files.getlist('images'), request.files.get('archive'), patient_json_schema, concurrency, force_refresh
+    )
     return jsonify(result), status_code
 
 @patient_bp.route('', methods=['GET'])
 def get_patients():
-    result, status_code = get_all_patients()
+    result, status_code = get_all_patients(request.args)
+    return jsonify(result), status_code
+
+@patient_bp.route('/search', methods=['GET'])
+def search():
+    result, status_code = search_patients(
+        request.args.get('q', ''),
+        request.args.get('limit', type=int),
+        request.args.get('offset', 0, type=int)
+    )
+    return jsonify(result), status_code
+
+@patient_bp.route('/export', methods=['GET'])
+def export_patients():
+    # Streams one JSON record per line (patient with medicines, notes and summaries)
+    lines = iter_patient_ndjson(request.args.get('batch_size', type=int))
+    return Response(
+        stream_with_context(lines),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=patients.ndjson'}
+    )
+
+@patient_bp.route('/import', methods=['POST'])
+def import_patients():
+    # Accepts an NDJSON upload under "file" or a raw NDJSON request body
+    upload = request.files.get('file')
+    lines = upload.stream if upload is not None else request.stream
+    result, status_code = import_patients_upload(lines, request.args.get('batch_size', type=int))
     return jsonify(result), status_code
 
 @patient_bp.route('/<patient_id>', methods=['DELETE'])
@@ -23,10 +93,19 @@ def remove_patient(patient_id):
 @patient_bp.route('/<patient_id>', methods=['PUT'])
 def update_patient_data(patient_id):
     data = request.get_json()
-    result, status_code = update_patient(patient_id, data)
+    result, status_code = update_patient(patient_id, data, request.args)
     return jsonify(result), status_code
 
 @patient_bp.route('/<patient_id>', methods=['GET'])
 def get_patient(patient_id):
-    result, status_code = get_patient_by_id(patient_id)
-    return jsonify(result), status_code
+    # Answer If-None-Match / If-Modified-Since before loading and serializing the patient
+    version = patient_version(patient_id, request.args)
+    if version:
+        unchanged = not_modified(*version)
+        if unchanged is not None:
+            return unchanged
+    result, status_code = get_patient_by_id(patient_id, request.args)
+    response = jsonify(result)
+    if version and status_code == 200:
+        add_validators(response, *version)
+    return response, status_code
@@ -1,10 +1,50 @@
-from flask import Blueprint, request, jsonify
-from service.summary_service import generate_patient_summary, get_patient_summaries, delete_summary
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from service.summary_service import generate_patient_summary, stream_patient_summary, get_patient_summaries, delete_summary
 from model.patient import Patient
+from service.summary_regeneration_service import start_regeneration_job, stop_regeneration_job, get_regeneration_job
+from service.resource_versions import summaries_version
+from config.http_caching import not_modified, add_validators
 import uuid
 
 summary_bp = Blueprint('summary', __name__, url_prefix='/summary')
 
+def _incremental_arg():
+    # ?incremental=false regenerates from the patient record alone, without notes
+    value = request.args.get('incremental')
+    return None if value is None else value.lower() == 'true'
+
+@summary_bp.route('/regenerate', methods=['POST'])
+def regenerate_summaries():
+    """Start a background run over every patient, see service/summary_regeneration_service.py"""
+    try:
+        body = request.get_json(silent=True) or {}
+        options = {
+            'force': bool(body.get('force', True)),
+            'resume': bool(body.get('resume', True))
+        }
+        for key, cast in (('concurrency', int), ('rate_per_second', float), ('batch_size', int)):
+            if body.get(key) is not None:
+                options[key] = cast(body[key])
+        if options.get('concurrency', 1) < 1 or options.get('batch_size', 1) < 1:
+            return jsonify({'error': 'concurrency and batch_size must be positive'}), 400
+        result, status_code = start_regeneration_job(current_app._get_current_object(), options)
+        return jsonify(result), status_code
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid option: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@summary_bp.route('/regenerate', methods=['GET'])
+def regeneration_status():
+    result, status_code = get_regeneration_job()
+    return jsonify(result), status_code
+
+@summary_bp.route('/regenerate', methods=['DELETE'])
+def stop_regeneration():
+    result, status_code = stop_regeneration_job()
+    return jsonify(result), status_code
+
 @summary_bp.route('/<patient_id>', methods=['POST'])
 def create_summary(patient_id):
     try:
@@ -12,13 +52,36 @@ def create_summary(patient_id):
             patient_uuid = uuid.UUID(patient_id)
         except ValueError:
             return jsonify({'error': 'Invalid patient ID format'}), 400
-        result, status_code = generate_patient_summary(patient_uuid)
+        # ?force=true regenerates even when the patient data is unchanged
+        force = request.args.get('force', 'false').lower() == 'true'
+        result, status_code = generate_patient_summary(patient_uuid, force=force, incremental=_incremental_arg())
         
         return jsonify(result), status_code
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@summary_bp.route('/<patient_id>/stream', methods=['POST'])
+def stream_summary(patient_id):
+    try:
+        try:
+            patient_uuid = uuid.UUID(patient_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid patient ID format'}), 400
+        force = request.args.get('force', 'false').lower() == 'true'
+        result, status_code = stream_patient_summary(patient_uuid, force=force, incremental=_incremental_arg())
+        if status_code != 200:
+            return jsonify(result), status_code
+
+        return Response(
+            stream_with_context(result),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @summary_bp.route('/<patient_id>', methods=['GET'])
 def get_summaries(patient_id):
     try:
@@ -27,8 +90,16 @@ def get_summaries(patient_id):
         except ValueError:
             return jsonify({'error': 'Invalid patient ID format'}), 400
             
+        version = summaries_version(patient_uuid)
+        unchanged = not_modified(*version)
+        if unchanged is not None:
+            return unchanged
+
         result, status_code = get_patient_summaries(patient_uuid)
-        return jsonify(result), status_code
+        response = jsonify(result)
+        if status_code == 200:
+            add_validators(response, *version)
+        return response, status_code
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
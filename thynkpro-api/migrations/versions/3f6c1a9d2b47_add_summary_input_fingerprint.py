@@ -0,0 +1,36 @@
+"""add summary input fingerprint
+
+Revision ID: 3f6c1a9d2b47
+Revises: 87d2104e17a9
+Create Date: 2026-10-18 09:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6c1a9d2b47'
+down_revision = '87d2104e17a9'
+branch_labels = None
+depends_on = None
+
+
+def _has_summaries_table():
+    # The initial revision never created "summaries", so databases built
+    # purely from migrations may not have it yet
+    return sa.inspect(op.get_bind()).has_table('summaries')
+
+
+def upgrade():
+    if not _has_summaries_table():
+        return
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('input_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    if not _has_summaries_table():
+        return
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.drop_column('input_fingerprint')
@@ -0,0 +1,82 @@
+"""add patient child indexes
+
+Revision ID: 5d2a9e61c3f8
+Revises: b81e4c07d95a
+Create Date: 2026-10-18 14:12:36.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a9e61c3f8'
+down_revision = 'b81e4c07d95a'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns). The composite indexes also serve plain patient_id
+# lookups through their leading column, so summaries and notes get no
+# separate single-column index.
+INDEXES = (
+    ('ix_medicines_patient_id', 'medicines', ['patient_id']),
+    ('ix_summaries_patient_id_created_at', 'summaries', ['patient_id', 'created_at']),
+    ('ix_notes_patient_id_created_at', 'notes', ['patient_id', 'created_at']),
+    ('ix_patients_created_at_id', 'patients', ['created_at', 'id']),
+)
+
+
+def _create_missing_tables(inspector):
+    # summaries and notes were created outside migrations on older databases
+    if not inspector.has_table('summaries'):
+        op.create_table('summaries',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('patient_id', sa.UUID(), nullable=True),
+        sa.Column('input_fingerprint', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('notes'):
+        op.create_table('notes',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('patient_id', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def _existing_indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    _create_missing_tables(sa.inspect(bind))
+    inspector = sa.inspect(bind)
+    pending = [
+        (name, table, columns) for name, table, columns in INDEXES
+        if name not in _existing_indexes(inspector, table)
+    ]
+    if bind.dialect.name == 'postgresql':
+        # CONCURRENTLY keeps the tables writable while large indexes build,
+        # and cannot run inside the migration transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in pending:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+    else:
+        for name, table, columns in pending:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    # summaries and notes are left in place, they may predate this revision
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in reversed(INDEXES):
+        if name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
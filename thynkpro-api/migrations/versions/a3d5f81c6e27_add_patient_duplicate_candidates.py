@@ -0,0 +1,34 @@
+"""add patient duplicate candidates
+
+Revision ID: a3d5f81c6e27
+Revises: e92b4d17a6c0
+Create Date: 2026-10-19 10:12:40.118326
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5f81c6e27'
+down_revision = 'e92b4d17a6c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patient_duplicate_candidates',
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('candidate_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['candidate_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id', 'candidate_id')
+    )
+    op.create_index('ix_patient_duplicate_candidates_candidate_id', 'patient_duplicate_candidates', ['candidate_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_patient_duplicate_candidates_candidate_id', table_name='patient_duplicate_candidates')
+    op.drop_table('patient_duplicate_candidates')
@@ -0,0 +1,35 @@
+"""add patient search documents
+
+Revision ID: b81e4c07d95a
+Revises: 3f6c1a9d2b47
+Create Date: 2026-10-18 10:41:07.559320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e4c07d95a'
+down_revision = '3f6c1a9d2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patient_search_documents',
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR().with_variant(sa.Text(), 'sqlite'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id')
+    )
+    op.create_index('ix_patient_search_documents_search_vector', 'patient_search_documents', ['search_vector'], unique=False, postgresql_using='gin')
+    # Existing rows are indexed with: flask search rebuild
+
+
+def downgrade():
+    op.drop_index('ix_patient_search_documents_search_vector', table_name='patient_search_documents', postgresql_using='gin')
+    op.drop_table('patient_search_documents')
@@ -0,0 +1,32 @@
+"""add patient blocking keys
+
+Revision ID: c47f0e2b9a13
+Revises: 5d2a9e61c3f8
+Create Date: 2026-10-18 16:05:52.918440
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47f0e2b9a13'
+down_revision = '5d2a9e61c3f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patient_blocking_keys',
+    sa.Column('key', sa.String(length=160), nullable=False),
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('key', 'patient_id')
+    )
+    op.create_index('ix_patient_blocking_keys_patient_id', 'patient_blocking_keys', ['patient_id'], unique=False)
+    # Keys for existing patients are built with: flask dedup rebuild
+
+
+def downgrade():
+    op.drop_index('ix_patient_blocking_keys_patient_id', table_name='patient_blocking_keys')
+    op.drop_table('patient_blocking_keys')
@@ -0,0 +1,27 @@
+"""add summary notes watermark
+
+Revision ID: e92b4d17a6c0
+Revises: c47f0e2b9a13
+Create Date: 2026-10-18 18:20:11.402687
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e92b4d17a6c0'
+down_revision = 'c47f0e2b9a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notes_through', sa.DateTime(), nullable=True))
+    # Existing summaries start without a watermark, so their notes are folded in on the next update
+
+
+def downgrade():
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.drop_column('notes_through')
@@ -0,0 +1,30 @@
+"""add summary notes watermark id and partial offset
+
+Revision ID: f5c8a2d93e14
+Revises: a3d5f81c6e27
+Create Date: 2026-10-19 11:05:36.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c8a2d93e14'
+down_revision = 'a3d5f81c6e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notes_through_id', postgresql.UUID(as_uuid=True), nullable=True))
+        batch_op.add_column(sa.Column('notes_partial_offset', sa.Integer(), nullable=True))
+    # Existing watermarks keep their created_at only; notes after it are folded in as before
+
+
+def downgrade():
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.drop_column('notes_partial_offset')
+        batch_op.drop_column('notes_through_id')
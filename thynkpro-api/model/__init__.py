@@ -3,6 +3,8 @@ from flask_migrate import Migrate
 
 def init_models(app):
     from .patient import Patient, Medicine
+    from .search import PatientSearchDocument
+    from .dedup import PatientBlockingKey, PatientDuplicateCandidate
 
     migrate = Migrate(app, db)
 
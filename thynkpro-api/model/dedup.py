@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import UUID
+from config.db_config import db
+
+class PatientBlockingKey(db.Model):
+    """
+    Blocking keys for duplicate-patient detection, see patient_dedup_service.
+
+    Each patient gets a handful of short keys built from the normalized or
+    phonetic name combined with an age band or the hospital. Candidates for
+    a new extraction are the patients sharing any of its keys, found through
+    the primary key index instead of a scan over all patients.
+    """
+    __tablename__ = 'patient_blocking_keys'
+
+    key = db.Column(db.String(160), primary_key=True)
+    patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id', ondelete='CASCADE'),
+                           primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<PatientBlockingKey {self.key}>"
+
+
+class PatientDuplicateCandidate(db.Model):
+    """
+    A new patient that resembles an existing one but was not merged into it,
+    because the match was weak or not corroborated by both age and hospital.
+    Kept for a person to review, see patient_dedup_service.save_extracted_patient.
+    """
+    __tablename__ = 'patient_duplicate_candidates'
+
+    patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id', ondelete='CASCADE'), primary_key=True)
+    candidate_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id', ondelete='CASCADE'),
+                             primary_key=True, index=True)
+    score = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PatientDuplicateCandidate {self.patient_id} ~ {self.candidate_id}>"
@@ -4,6 +4,9 @@ import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from config.db_config import db
 
+# Child collections Patient.to_dict can include
+PATIENT_RELATIONSHIPS = ('medicines', 'summaries', 'notes')
+
 class Medicine(db.Model):
     __tablename__ = 'medicines'
     
@@ -11,7 +14,7 @@ class Medicine(db.Model):
     medicine_name = db.Column(db.String(255), nullable=True)
     dosage = db.Column(db.String(100))
     frequency = db.Column(db.String(100))
-    patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id'))
+    patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id'), index=True)
     
     def __repr__(self):
         return f"<Medicine {self.medicine_name}>"
@@ -30,9 +33,21 @@ class Summary(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     summary = db.Column(db.Text, nullable=True)
     patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id'))
+    # Hash of the inputs the summary was generated from, see summary_service
+    input_fingerprint = db.Column(db.String(64), nullable=True)
+    # (created_at, id) of the newest note folded into the summary; later notes are still to be added
+    notes_through = db.Column(db.DateTime, nullable=True)
+    notes_through_id = db.Column(UUID(as_uuid=True), nullable=True)
+    # Characters already folded in of the next note, when it was too long for one update
+    notes_partial_offset = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Also serves plain patient_id lookups through its leading column
+    __table_args__ = (
+        db.Index('ix_summaries_patient_id_created_at', 'patient_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<Summary {self.id}>"
     
@@ -54,6 +69,11 @@ class Note(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Also serves plain patient_id lookups through its leading column
+    __table_args__ = (
+        db.Index('ix_notes_patient_id_created_at', 'patient_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<Note {self.id}>"
     
@@ -84,11 +104,25 @@ class Patient(db.Model):
     summaries = db.relationship('Summary', backref='patient', lazy=True, cascade="all, delete-orphan")
     notes = db.relationship('Note', backref='patient', lazy=True, cascade="all, delete-orphan")
     
+    # Matches the (created_at, id) keyset ordering of GET /patient
+    __table_args__ = (
+        db.Index('ix_patients_created_at_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Patient {self.patient_name}>"
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include=PATIENT_RELATIONSHIPS, collections=None):
+        """
+        Serialize the patient.
+
+        Args:
+            include (iterable): Relationships to serialize, any of PATIENT_RELATIONSHIPS
+            collections (dict): Optional pre-loaded rows per relationship name, used
+                instead of the lazy relationship (e.g. a capped page of notes)
+        """
+        collections = collections or {}
+        data = {
             'id': str(self.id),
             'patient_name': self.patient_name,
             'patient_age': self.patient_age,
@@ -97,18 +131,25 @@ class Patient(db.Model):
             'doctor_advice': self.doctor_advice,
             'doctor_name': self.doctor_name,
             'hospital_name': self.hospital_name,
-            'medicines': [
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+        if 'medicines' in include:
+            medicines = collections['medicines'] if 'medicines' in collections else self.medicines
+            data['medicines'] = [
                 {
                     'medicine_name': med.medicine_name,
                     'dosage': med.dosage,
                     'frequency': med.frequency
-                } for med in self.medicines
-            ],
-            'summaries': [summary.to_dict() for summary in self.summaries],
-            'notes': [note.to_dict() for note in self.notes],
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+                } for med in medicines
+            ]
+        if 'summaries' in include:
+            summaries = collections['summaries'] if 'summaries' in collections else self.summaries
+            data['summaries'] = [summary.to_dict() for summary in summaries]
+        if 'notes' in include:
+            notes = collections['notes'] if 'notes' in collections else self.notes
+            data['notes'] = [note.to_dict() for note in notes]
+        return data
     
     @classmethod
     def from_json(cls, data):
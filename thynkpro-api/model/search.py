@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from config.db_config import db
+
+class PatientSearchDocument(db.Model):
+    """
+    One searchable document per patient, built from the diagnosis, doctor
+    advice, notes and summaries. On Postgres search_vector holds the weighted
+    tsvector behind a GIN index; other databases leave it empty and search
+    the plain content column instead.
+    """
+    __tablename__ = 'patient_search_documents'
+
+    patient_id = db.Column(UUID(as_uuid=True), db.ForeignKey('patients.id', ondelete='CASCADE'), primary_key=True)
+    content = db.Column(db.Text, nullable=True)
+    search_vector = db.Column(TSVECTOR().with_variant(db.Text, 'sqlite'), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_patient_search_documents_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
+    def __repr__(self):
+        return f"<PatientSearchDocument {self.patient_id}>"
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+from flask import current_app, has_app_context
+
+# Output fields of Note.to_dict / Summary.to_dict, in the same shape
+NOTE_FIELDS = ('id', 'content', 'patient_id', 'created_at', 'updated_at')
+SUMMARY_FIELDS = ('id', 'summary', 'patient_id', 'created_at', 'updated_at')
+
+
+def columns(model, fields):
+    """Model columns for fields, to select plain rows instead of ORM instances"""
+    return [getattr(model, field) for field in fields]
+
+
+def native_json():
+    """True when the active JSON provider encodes UUIDs and datetimes itself"""
+    return has_app_context() and getattr(current_app.json, 'native_types', False)
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def rows_to_dicts(rows, fields):
+    """
+    Turn result rows into response dicts, matching the to_dict output.
+
+    Rows are zipped with fields positionally, so extra trailing columns
+    (e.g. one selected only for a cursor) are left out. With a native JSON
+    provider the values are passed through untouched; otherwise UUIDs and
+    datetimes are converted here.
+    """
+    if native_json():
+        return [dict(zip(fields, row)) for row in rows]
+    return [{field: _jsonable(value) for field, value in zip(fields, row)} for row in rows]
@@ -1,3 +1,6 @@
+# JSON Schema for extracted patient records. It is also passed to the model as
+# its response schema, so it sticks to the subset Gemini accepts (type,
+# properties, items, required, enum, nullable, description).
 patient_json_schema = {
     "type": "object",
     "properties": {
@@ -6,31 +9,39 @@ patient_json_schema = {
             "description": "The name of the patient"
             },
         "patient_age": {
-            "type": "number",
-            "description": "The age of the patient"
+            "type": "integer",
+            "description": "The age of the patient in years",
+            "nullable": True
             },
         "patient_gender": {
             "type": "string",
-            "description": "The gender of the patient (Male, Female, Other) if M is mentioned then it is Male, if F is mentioned then it is Female, if O is mentioned then it is Other"
+            "enum": ["Male", "Female", "Other"],
+            "description": "The gender of the patient (Male, Female, Other) if M is mentioned then it is Male, if F is mentioned then it is Female, if O is mentioned then it is Other",
+            "nullable": True
             },
         "diagnosis": {
             "type": "string",
             "description": "The diagnosis of the patient"
                       },
         "doctor_advice": {"type": "string"},
-        "doctor_name": {"type": "string"},
-        "hospital_name": {"type": "string"},
-        "medicines": [
-            {
-                "medicine_name": {
-                    "type": "string",
-                    "description": "The name of the medicine analysis that medicine if it is short form of medicine name then convert it to full form"
-                    },
-                "dosage": {"type": "string"},
-                "frequency": {"type": "string"}
+        "doctor_name": {"type": "string", "nullable": True},
+        "hospital_name": {"type": "string", "nullable": True},
+        "medicines": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "medicine_name": {
+                        "type": "string",
+                        "description": "The name of the medicine analysis that medicine if it is short form of medicine name then convert it to full form"
+                        },
+                    "dosage": {"type": "string"},
+                    "frequency": {"type": "string"}
+                },
+                "required": ["medicine_name"]
             }
-        ]
-        
+        }
+
     },
     "required": ["patient_name", "patient_age", "patient_gender", "diagnosis", "doctor_advice", "medicines"]
-}
\ No newline at end of file
+}
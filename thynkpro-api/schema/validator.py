@@ -0,0 +1,163 @@
+import re
+from schema.json_schema import patient_json_schema
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+# A whole number with an optional "Age:" label and a year unit; other units are rejected
+_YEARS = re.compile(r'(?:age\s*[:=]?\s*)?(-?\d+(?:\.\d+)?)\s*(?:years?(?:\s+old)?|yrs?\.?|y/?o|y)?', re.IGNORECASE)
+
+
+class _Invalid(Exception):
+    pass
+
+
+def _coerce_integer(value):
+    if isinstance(value, bool):
+        raise _Invalid
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        # "42", "42 years", "Age: 42 yrs"; "6 months" or "42 kg" are not years and fail
+        match = _YEARS.fullmatch(value.strip())
+        if match:
+            return int(float(match.group(1)))
+    raise _Invalid
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise _Invalid
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        # Only the number itself, a unit would change its meaning
+        match = _NUMBER.fullmatch(value.strip())
+        if match:
+            number = float(match.group())
+            return int(number) if number.is_integer() else number
+    raise _Invalid
+
+
+def _coerce_string(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise _Invalid
+
+
+def _coerce_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false', 'yes', 'no'):
+        return value.strip().lower() in ('true', 'yes')
+    raise _Invalid
+
+
+_SCALARS = {
+    'integer': _coerce_integer,
+    'number': _coerce_number,
+    'string': _coerce_string,
+    'boolean': _coerce_boolean
+}
+
+
+def _compile_enum(coerce, choices):
+    """Match enum values case-insensitively, or by a unique first letter (M -> Male)"""
+    lookup = {str(choice).lower(): choice for choice in choices}
+    initials = {}
+    for choice in choices:
+        initials.setdefault(str(choice)[:1].lower(), []).append(choice)
+
+    def coerce_enum(value):
+        value = coerce(value)
+        key = str(value).strip().lower().rstrip('.')
+        if key in lookup:
+            return lookup[key]
+        if len(key) == 1 and len(initials.get(key, [])) == 1:
+            return initials[key][0]
+        raise _Invalid
+    return coerce_enum
+
+
+def _compile(schema, path):
+    kind = schema.get('type')
+    if kind == 'object':
+        return _compile_object(schema, path)
+    if kind == 'array':
+        return _compile_array(schema, path)
+    coerce = _SCALARS.get(kind, lambda value: value)
+    if 'enum' in schema:
+        coerce = _compile_enum(coerce, schema['enum'])
+
+    def validate_scalar(value, errors, location):
+        if value is None:
+            return None
+        try:
+            return coerce(value)
+        except (_Invalid, ValueError, OverflowError):
+            errors.append(f"{location}: expected {kind}{' from ' + str(schema['enum']) if 'enum' in schema else ''}, got {value!r}")
+            return None
+    return validate_scalar
+
+
+def _compile_array(schema, path):
+    validate_item = _compile(schema.get('items', {}), path + '[]')
+
+    def validate_array(value, errors, location):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            # A single object where a list was expected
+            value = [value]
+        items = (validate_item(item, errors, f'{location}[{index}]') for index, item in enumerate(value))
+        return [item for item in items if item is not None]
+    return validate_array
+
+
+def _compile_object(schema, path):
+    fields = [(name, _compile(field, f'{path}.{name}')) for name, field in schema.get('properties', {}).items()]
+    required = tuple(schema.get('required', ()))
+
+    def validate_object(value, errors, location):
+        if not isinstance(value, dict):
+            errors.append(f"{location}: expected object, got {type(value).__name__}")
+            return None
+        result = {name: validate(value.get(name), errors, f'{location}.{name}' if location else name)
+                  for name, validate in fields}
+        for name in required:
+            if result.get(name) in (None, ''):
+                errors.append(f"{f'{location}.{name}' if location else name}: missing")
+        # Items missing every required field carry nothing useful (e.g. an empty medicine)
+        if location and required and all(result.get(name) in (None, '') for name in required):
+            return None
+        return result
+    return validate_object
+
+
+def compile_validator(schema):
+    """
+    Build a validator for a JSON Schema once, so each call is a single pass.
+
+    The returned function takes decoded JSON and returns (data, errors).
+    Values are coerced to the schema type where possible (age strings to
+    integers, single objects to one-item lists, enum values matched
+    case-insensitively or by initial, e.g. M -> Male). Unknown keys are
+    dropped, values that cannot be coerced become None and are listed in
+    errors instead of failing the whole record.
+
+    Raises:
+        ValueError: If the top-level value is not an object
+    """
+    validate = _compile(schema, '')
+
+    def validator(data):
+        errors = []
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+        return validate(data, errors, ''), errors
+    return validator
+
+
+validate_patient = compile_validator(patient_json_schema)
@@ -0,0 +1,85 @@
+"""
+Production server entry point.
+
+Serves the app with gevent: every request runs in a greenlet and blocking
+socket I/O (model calls, Postgres queries) yields to other requests
+instead of pinning an OS thread. One process can keep hundreds of model
+calls in flight with a few kilobytes of stack each.
+
+  - The standard library is monkey patched before anything else is imported.
+  - psycopg2 is made cooperative with psycogreen when it is installed.
+  - The Gemini client uses its REST transport (GOOGLE_API_TRANSPORT=rest),
+    since gRPC does not yield to gevent.
+  - Database work is bounded by the SQLAlchemy pool: at most DB_POOL_SIZE +
+    DB_MAX_OVERFLOW greenlets hold a connection, the rest wait up to
+    DB_POOL_TIMEOUT.
+  - Model calls are bounded by LLM_MAX_CONCURRENCY; raise it to the number
+    of in-flight model calls wanted (e.g. 256).
+
+Usage (from thynkpro-api/):
+    python serve.py
+    python serve.py --port 8000 --max-connections 2000
+
+With several processes, gunicorn's gevent worker does the patching:
+    gunicorn --worker-class gevent --worker-connections 1000 --workers 4 serve:app
+
+The POST /summary/regenerate job keeps its state in one process; with
+several workers run 'flask summaries regenerate' instead.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse
+import logging
+import os
+
+try:
+    from psycogreen.gevent import patch_psycopg
+except ImportError:  # psycogreen is optional, without it Postgres queries block the process
+    patch_psycopg = None
+
+if patch_psycopg is not None:
+    patch_psycopg()
+
+# Must be set before config.ai_config is imported
+os.environ.setdefault('GOOGLE_API_TRANSPORT', 'rest')
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from app import app
+from config.schema_check import check_schema
+
+logger = logging.getLogger(__name__)
+
+# Address the server listens on
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('SERVER_PORT', '5000'))
+# Connections handled at once; further connections wait in the listen backlog
+SERVER_MAX_CONNECTIONS = int(os.getenv('SERVER_MAX_CONNECTIONS', '1000'))
+
+# Runs when the server starts, including under gunicorn, never for flask CLI commands
+check_schema(app)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--max-connections', type=int, default=SERVER_MAX_CONNECTIONS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if patch_psycopg is None:
+        logger.warning("psycogreen is not installed, database queries will block other requests")
+    server = WSGIServer((args.host, args.port), app, spawn=Pool(args.max_connections))
+    logger.info("Serving on http://%s:%d with up to %d concurrent connections",
+                args.host, args.port, args.max_connections)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
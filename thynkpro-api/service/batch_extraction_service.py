@@ -0,0 +1,193 @@
+import json
+import mimetypes
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from config.db_config import db
+from service.patient_service import run_extraction_prompt, _format_response
+from service.search_index import index_patient
+from service.patient_dedup_service import save_extracted_patient
+
+# Default and upper bound for concurrent model calls within one batch
+EXTRACTION_BATCH_CONCURRENCY = int(os.getenv('EXTRACTION_BATCH_CONCURRENCY', '8'))
+EXTRACTION_BATCH_MAX_CONCURRENCY = int(os.getenv('EXTRACTION_BATCH_MAX_CONCURRENCY', '32'))
+# Largest number of images accepted in one request
+EXTRACTION_BATCH_MAX_ITEMS = int(os.getenv('EXTRACTION_BATCH_MAX_ITEMS', '500'))
+# Size limits per image and per batch (zip members uncompressed), checked
+# before any image is read
+EXTRACTION_BATCH_MAX_MEMBER_MB = int(os.getenv('EXTRACTION_BATCH_MAX_MEMBER_MB', '20'))
+EXTRACTION_BATCH_MAX_ARCHIVE_MB = int(os.getenv('EXTRACTION_BATCH_MAX_ARCHIVE_MB', '500'))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.heic', '.heif', '.gif', '.bmp', '.tif', '.tiff')
+
+class ArchiveTooLarge(Exception):
+    """Raised when a batch upload exceeds the item count or size limits"""
+
+
+def _upload_size(image_file):
+    """Size of a multipart file part, from its spooled stream, without reading it"""
+    stream = image_file.stream
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return size
+
+def _archive_images(archive):
+    """Directory entries of the image members of an open zip archive"""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not os.path.basename(info.filename).startswith('.')
+        and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+def _check_limits(sized_items):
+    """
+    Check the item count and sizes of (filename, size) pairs, where zip
+    member sizes come from the archive directory. zipfile never returns
+    more than the declared size, so a zip bomb is refused without being
+    decompressed.
+
+    Raises:
+        ArchiveTooLarge: If a limit is exceeded
+    """
+    if len(sized_items) > EXTRACTION_BATCH_MAX_ITEMS:
+        raise ArchiveTooLarge(f"Too many images in batch, maximum is {EXTRACTION_BATCH_MAX_ITEMS}")
+    member_limit = EXTRACTION_BATCH_MAX_MEMBER_MB * 1024 * 1024
+    total_limit = EXTRACTION_BATCH_MAX_ARCHIVE_MB * 1024 * 1024
+    total = 0
+    for name, size in sized_items:
+        if size > member_limit:
+            raise ArchiveTooLarge(f"{name} is larger than {EXTRACTION_BATCH_MAX_MEMBER_MB} MB uncompressed")
+        total += size
+        if total > total_limit:
+            raise ArchiveTooLarge(f"Batch is larger than {EXTRACTION_BATCH_MAX_ARCHIVE_MB} MB uncompressed")
+
+def collect_batch_items(image_files, archive_file=None):
+    """
+    Gather batch items from multipart image uploads and an optional zip archive
+
+    The item count and every size are checked from the upload streams and
+    the zip directory first; no image is read until the whole batch passes.
+
+    Args:
+        image_files (list): FileStorage objects posted under "images"
+        archive_file (FileStorage): Optional zip archive of images
+
+    Returns:
+        list: Items as (filename, mime_type, data) tuples
+
+    Raises:
+        ArchiveTooLarge: If the batch exceeds a limit
+        zipfile.BadZipFile: If the archive is not a zip file
+    """
+    uploads = [image_file for image_file in image_files if image_file.filename != '']
+    archive = None
+    if archive_file is not None and archive_file.filename != '':
+        archive = zipfile.ZipFile(archive_file.stream)
+    try:
+        members = _archive_images(archive) if archive is not None else []
+        _check_limits(
+            [(image_file.filename, _upload_size(image_file)) for image_file in uploads]
+            + [(info.filename, info.file_size) for info in members]
+        )
+
+        items = [(image_file.filename, image_file.content_type, image_file.read()) for image_file in uploads]
+        for info in members:
+            mime_type = mimetypes.guess_type(info.filename)[0] or 'application/octet-stream'
+            items.append((info.filename, mime_type, archive.read(info)))
+        return items
+    finally:
+        if archive is not None:
+            archive.close()
+
+def _extract_item(item, patient_json_schema, force_refresh):
+    filename, mime_type, data = item
+    try:
+        return run_extraction_prompt(data, mime_type, patient_json_schema, force_refresh), None
+    except json.JSONDecodeError:
+        return None, "Could not parse JSON from model response"
+    except Exception as e:
+        return None, f"Error processing image: {e}"
+
+def extract_batch(items, patient_json_schema, concurrency=None, force_refresh=False):
+    """
+    Extract many images concurrently and save all patients in one transaction
+
+    Args:
+        items (list): (filename, mime_type, data) tuples from collect_batch_items
+        patient_json_schema (dict): Schema passed to the extraction prompt
+        concurrency (int): Optional cap on parallel model calls for this batch
+        force_refresh (bool): Bypass the extraction cache
+
+    Returns:
+        tuple: Formatted response with a per-item report, and status code
+    """
+    if not items:
+        return _format_response("No images provided", success=False, status_code=400)
+    if len(items) > EXTRACTION_BATCH_MAX_ITEMS:
+        return _format_response(
+            f"Too many images in batch, maximum is {EXTRACTION_BATCH_MAX_ITEMS}",
+            success=False, status_code=400
+        )
+
+    workers = concurrency or EXTRACTION_BATCH_CONCURRENCY
+    workers = max(1, min(workers, EXTRACTION_BATCH_MAX_CONCURRENCY, len(items)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-extraction') as executor:
+        outcomes = list(executor.map(lambda item: _extract_item(item, patient_json_schema, force_refresh), items))
+
+    report = []
+    patients = []
+    # One transaction for the whole batch instead of one commit per image.
+    # Likely duplicates, including repeats within the batch, are merged.
+    # Each item is saved in a savepoint, so a record that fails to flush is
+    # rolled back alone and the rest of the batch is still committed.
+    for index, ((filename, _, _), (extracted_data, error)) in enumerate(zip(items, outcomes)):
+        entry = {'index': index, 'filename': filename, 'success': error is None}
+        if error is None:
+            try:
+                with db.session.begin_nested():
+                    patient, match = save_extracted_patient(extracted_data)
+                if match:
+                    key = 'merged_into' if match['status'] == 'merged' else 'possible_duplicate_of'
+                    entry[key] = {**match, 'patient_id': str(match['patient_id'])}
+                patients.append((entry, patient))
+            except Exception as e:
+                entry.update(success=False, error=f"Invalid patient data: {e}")
+        else:
+            entry['error'] = error
+        report.append(entry)
+
+    if patients:
+        try:
+            for patient_id in dict.fromkeys(patient.id for _, patient in patients):
+                index_patient(patient_id)
+            db.session.commit()
+            for entry, patient in patients:
+                entry['patient_id'] = str(patient.id)
+        except Exception as db_error:
+            db.session.rollback()
+            for entry, _ in patients:
+                entry.update(success=False, error=f"Error saving to database: {db_error}")
+
+    succeeded = sum(1 for entry in report if entry['success'])
+    data = {
+        'total': len(report),
+        'succeeded': succeeded,
+        'failed': len(report) - succeeded,
+        'items': report
+    }
+    if succeeded == 0:
+        return _format_response("No images could be extracted", data, success=False, status_code=500)
+    return _format_response("Batch processed", data)
+
+def extract_batch_uploads(image_files, archive_file, patient_json_schema, concurrency=None, force_refresh=False):
+    """Collect items from the multipart upload and run them through extract_batch"""
+    try:
+        items = collect_batch_items(image_files, archive_file)
+    except zipfile.BadZipFile:
+        return _format_response("Archive is not a valid zip file", success=False, status_code=400)
+    except ArchiveTooLarge as e:
+        return _format_response(str(e), success=False, status_code=413)
+    return extract_batch(items, patient_json_schema, concurrency, force_refresh)
@@ -0,0 +1,207 @@
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from config.db_config import db
+from service.patient_service import run_extraction_prompt, _format_response
+from service.search_index import index_patient
+from service.patient_dedup_service import save_extracted_patient
+
+try:
+    from PIL import Image, ImageSequence
+except ImportError:  # Pillow is optional, TIFFs are then sent to the model whole
+    Image = None
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pypdf is optional, PDFs are then sent to the model whole
+    PdfReader = None
+
+# Pages sent to the model at the same time for one document
+DOCUMENT_PAGE_CONCURRENCY = int(os.getenv('DOCUMENT_PAGE_CONCURRENCY', '4'))
+# Documents with more pages than this are rejected
+DOCUMENT_MAX_PAGES = int(os.getenv('DOCUMENT_MAX_PAGES', '30'))
+
+PDF_MIME_TYPE = 'application/pdf'
+TIFF_MIME_TYPE = 'image/tiff'
+DOCUMENT_EXTENSIONS = {'.pdf': PDF_MIME_TYPE, '.tif': TIFF_MIME_TYPE, '.tiff': TIFF_MIME_TYPE}
+
+# Fields taken from the first page that has them; the rest are collected from every page
+FIRST_VALUE_FIELDS = ('patient_name', 'patient_age', 'patient_gender', 'doctor_name', 'hospital_name')
+JOINED_FIELDS = ('diagnosis', 'doctor_advice')
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when a document has more pages than DOCUMENT_MAX_PAGES"""
+
+
+def document_mime_type(upload):
+    """The multi-page mime type of an upload (PDF or TIFF), or None for single images"""
+    if upload.content_type in (PDF_MIME_TYPE, TIFF_MIME_TYPE):
+        return upload.content_type
+    return DOCUMENT_EXTENSIONS.get(os.path.splitext(upload.filename or '')[1].lower())
+
+
+def _check_page_count(count):
+    if count > DOCUMENT_MAX_PAGES:
+        raise DocumentTooLarge(f"Document has {count} pages, maximum is {DOCUMENT_MAX_PAGES}")
+
+
+def _split_pdf(stream):
+    reader = PdfReader(stream)
+    _check_page_count(len(reader.pages))
+    pages = []
+    for page in reader.pages:
+        writer = PdfWriter()
+        writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        pages.append((PDF_MIME_TYPE, buffer.getvalue()))
+    return pages
+
+
+def _split_tiff(stream):
+    with Image.open(stream) as document:
+        _check_page_count(getattr(document, 'n_frames', 1))
+        pages = []
+        for frame in ImageSequence.Iterator(document):
+            buffer = io.BytesIO()
+            # Lossless, preprocess_image takes care of size before the model call
+            frame.convert('L' if frame.mode in ('1', 'L') else 'RGB').save(buffer, format='PNG')
+            pages.append(('image/png', buffer.getvalue()))
+    return pages
+
+
+def split_document(upload, mime_type):
+    """
+    Split an uploaded PDF or TIFF into single pages.
+
+    The upload is read from its stream, which Werkzeug spools to a temporary
+    file for large bodies, so only the split pages are held in memory. Without
+    pypdf (PDF) or Pillow (TIFF) the document is returned whole as one page;
+    the model also accepts multi-page PDFs directly.
+
+    Returns:
+        list: (mime_type, data) per page
+
+    Raises:
+        DocumentTooLarge: More pages than DOCUMENT_MAX_PAGES
+    """
+    if mime_type == PDF_MIME_TYPE and PdfReader is not None:
+        return _split_pdf(upload.stream)
+    if mime_type == TIFF_MIME_TYPE and Image is not None:
+        return _split_tiff(upload.stream)
+    return [(mime_type, upload.read())]
+
+
+def _normalize_name(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().casefold()
+
+
+def merge_page_results(results):
+    """
+    Merge per-page extraction results into one patient record.
+
+    Identity fields come from the first page that has a value. Distinct
+    diagnosis and advice texts are joined in page order. Medicines are
+    deduplicated by normalized name, later pages only filling in a missing
+    dosage or frequency.
+    """
+    merged = {}
+    for field in FIRST_VALUE_FIELDS:
+        merged[field] = next((page[field] for page in results if page.get(field) not in (None, '')), None)
+
+    for field in JOINED_FIELDS:
+        texts = []
+        for page in results:
+            text = page.get(field)
+            if isinstance(text, str) and text.strip() and text.strip() not in texts:
+                texts.append(text.strip())
+        merged[field] = '\n'.join(texts) or None
+
+    medicines = {}
+    for page in results:
+        for medicine in page.get('medicines') or []:
+            if not isinstance(medicine, dict):
+                continue
+            key = _normalize_name(medicine.get('medicine_name'))
+            if not key:
+                continue
+            if key not in medicines:
+                medicines[key] = dict(medicine)
+                continue
+            for detail in ('dosage', 'frequency'):
+                if not medicines[key].get(detail) and medicine.get(detail):
+                    medicines[key][detail] = medicine[detail]
+    merged['medicines'] = list(medicines.values())
+    return merged
+
+
+def _extract_page(page, patient_json_schema, force_refresh):
+    mime_type, data = page
+    try:
+        return run_extraction_prompt(data, mime_type, patient_json_schema, force_refresh), None
+    except json.JSONDecodeError:
+        return None, "Could not parse JSON from model response"
+    except Exception as e:
+        return None, f"Error processing page: {e}"
+
+
+def extract_document(upload, patient_json_schema, force_refresh=False):
+    """
+    Extract a multi-page PDF or TIFF into a single patient.
+
+    Pages are sent to the model concurrently (up to DOCUMENT_PAGE_CONCURRENCY),
+    merged with merge_page_results and saved as one Patient. Pages that fail
+    are reported; the patient is saved as long as one page succeeded.
+
+    Args:
+        upload (FileStorage): The uploaded document
+        patient_json_schema (dict): Schema passed to the extraction prompt
+        force_refresh (bool): Bypass the extraction cache
+
+    Returns:
+        tuple: Formatted response and status code
+    """
+    mime_type = document_mime_type(upload)
+    try:
+        pages = split_document(upload, mime_type)
+    except DocumentTooLarge as e:
+        return _format_response(str(e), success=False, status_code=413)
+    except Exception as e:
+        return _format_response(f"Could not read document: {e}", success=False, status_code=400)
+    if not pages:
+        return _format_response("Document has no pages", success=False, status_code=400)
+
+    workers = max(1, min(DOCUMENT_PAGE_CONCURRENCY, len(pages)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='document-extraction') as executor:
+        outcomes = list(executor.map(lambda page: _extract_page(page, patient_json_schema, force_refresh), pages))
+
+    results = [data for data, error in outcomes if error is None and isinstance(data, dict)]
+    page_report = {
+        'total': len(pages),
+        'succeeded': len(results),
+        'failed': len(pages) - len(results),
+        'errors': [{'page': index + 1, 'error': error} for index, (_, error) in enumerate(outcomes) if error]
+    }
+    if not results:
+        return _format_response("No pages could be extracted", {'pages': page_report}, success=False, status_code=500)
+
+    extracted_data = merge_page_results(results)
+    try:
+        patient, match = save_extracted_patient(extracted_data)
+        index_patient(patient.id)
+        db.session.commit()
+    except Exception as db_error:
+        db.session.rollback()
+        return _format_response(f"Error saving to database: {db_error}", success=False, status_code=500)
+
+    extracted_data['id'] = patient.id
+    extracted_data['pages'] = page_report
+    if match and match['status'] == 'merged':
+        extracted_data['merged_into'] = match
+        return _format_response("Patient Data Merged With Existing Patient", extracted_data)
+    if match:
+        extracted_data['possible_duplicate_of'] = match
+    return _format_response("Patient Data Extracted and Saved Successfully", extracted_data)
@@ -0,0 +1,74 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Maximum number of cached extractions and how long each stays valid, in seconds
+EXTRACTION_CACHE_SIZE = int(os.getenv('EXTRACTION_CACHE_SIZE', '512'))
+EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', '86400'))
+
+class ExtractionCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL for parsed extraction results.
+
+    Entries are dicts holding the parsed model JSON under "data" and, once the
+    result has been saved, the id of the patient created from it under
+    "patient_id". Values are copied on the way in and out so callers can
+    mutate what they get back.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry)
+
+    def set(self, key, data):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, {'data': copy.deepcopy(data), 'patient_id': None})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def link_patient(self, key, patient_id):
+        """Remember which patient was created from a cached extraction"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                item[1]['patient_id'] = patient_id
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def make_cache_key(image_data, prompt, patient_json_schema):
+    """Content address for an extraction: image bytes, prompt text and schema"""
+    digest = hashlib.sha256()
+    digest.update(image_data)
+    digest.update(b'\0')
+    digest.update(prompt.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(patient_json_schema, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_SIZE, EXTRACTION_CACHE_TTL)
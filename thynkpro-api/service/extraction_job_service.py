@@ -0,0 +1,156 @@
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from werkzeug.datastructures import FileStorage
+from service.patient_service import process_image_data, _format_response
+from service.document_extraction_service import extract_document
+
+# Number of extractions allowed to call the model at the same time
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '4'))
+# Jobs allowed to wait for a worker before new uploads are rejected
+EXTRACTION_QUEUE_SIZE = int(os.getenv('EXTRACTION_QUEUE_SIZE', '100'))
+# Finished jobs kept in memory for status polling
+EXTRACTION_JOB_RETENTION = int(os.getenv('EXTRACTION_JOB_RETENTION', '1000'))
+# Queued uploads wait on disk here, not in memory (defaults to the system temp dir)
+EXTRACTION_SPOOL_DIR = os.getenv('EXTRACTION_SPOOL_DIR') or None
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+_executor = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix='extraction')
+_capacity = threading.BoundedSemaphore(EXTRACTION_WORKERS + EXTRACTION_QUEUE_SIZE)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+def _update_job(job_id, **fields):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+def _prune_jobs():
+    """Drop the oldest finished jobs once the retention limit is exceeded"""
+    excess = len(_jobs) - EXTRACTION_JOB_RETENTION
+    if excess <= 0:
+        return
+    for job_id in [jid for jid, job in _jobs.items() if job['status'] in (JOB_DONE, JOB_FAILED)][:excess]:
+        del _jobs[job_id]
+
+def _spool_upload(image_file):
+    """Copy an upload to a temp file in chunks and return its path"""
+    suffix = os.path.splitext(image_file.filename or '')[1]
+    with tempfile.NamedTemporaryFile(prefix='extraction-', suffix=suffix, dir=EXTRACTION_SPOOL_DIR,
+                                     delete=False) as spool:
+        image_file.save(spool)
+    return spool.name
+
+def _remove_spool(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _run_job(app, job_id, spool_path, mime_type, filename, patient_json_schema, force_refresh, is_document):
+    try:
+        _update_job(job_id, status=JOB_RUNNING, started_at=_now())
+        with app.app_context():
+            if is_document:
+                with open(spool_path, 'rb') as stream:
+                    upload = FileStorage(stream=stream, filename=filename, content_type=mime_type)
+                    result, status_code = extract_document(upload, patient_json_schema, force_refresh)
+            else:
+                with open(spool_path, 'rb') as stream:
+                    image_data = stream.read()
+                result, status_code = process_image_data(image_data, mime_type, patient_json_schema, force_refresh)
+        if status_code < 400:
+            _update_job(job_id, status=JOB_DONE, result=result['Data'], finished_at=_now())
+        else:
+            _update_job(job_id, status=JOB_FAILED, error=result['Message'], finished_at=_now())
+    except Exception as e:
+        _update_job(job_id, status=JOB_FAILED, error=f"Error processing image: {e}", finished_at=_now())
+    finally:
+        _remove_spool(spool_path)
+        _capacity.release()
+
+def submit_extraction_job(app, image_file, patient_json_schema, force_refresh=False, is_document=False):
+    """
+    Queue an image or multi-page document for background extraction.
+
+    Args:
+        app (Flask): The application, needed to open an app context in the worker
+        image_file (FileStorage): The uploaded image or document
+        patient_json_schema (dict): Schema passed to the extraction prompt
+        force_refresh (bool): Bypass the extraction cache
+        is_document (bool): Split the upload into pages with extract_document,
+            as for a synchronous PDF or TIFF upload
+
+    Returns:
+        tuple: Formatted response and status code, 202 with the job id on success
+    """
+    if image_file.filename == '':
+        return _format_response("No image selected", success=False, status_code=400)
+
+    if not _capacity.acquire(blocking=False):
+        return _format_response("Extraction queue is full, please retry later", success=False, status_code=503)
+
+    # The upload stream is closed once the request ends, so copy it to disk
+    # now; the job reads it back and deletes it when it finishes
+    try:
+        spool_path = _spool_upload(image_file)
+    except Exception as e:
+        _capacity.release()
+        return _format_response(f"Could not queue extraction: {e}", success=False, status_code=500)
+
+    job_id = str(uuid.uuid4())
+    with _jobs_lock:
+        _jobs[job_id] = {
+            'job_id': job_id,
+            'status': JOB_QUEUED,
+            'created_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        _prune_jobs()
+
+    try:
+        _executor.submit(
+            _run_job, app, job_id, spool_path, image_file.content_type, image_file.filename,
+            patient_json_schema, force_refresh, is_document
+        )
+    except Exception as e:
+        _remove_spool(spool_path)
+        _capacity.release()
+        _update_job(job_id, status=JOB_FAILED, error=f"Could not queue extraction: {e}", finished_at=_now())
+        return _format_response(f"Could not queue extraction: {e}", success=False, status_code=500)
+
+    return _format_response("Extraction job queued", {'job_id': job_id, 'status': JOB_QUEUED}, status_code=202)
+
+def get_extraction_job(job_id):
+    """
+    Get the status of an extraction job, including its result once finished
+
+    Args:
+        job_id (str): The id returned by submit_extraction_job
+
+    Returns:
+        tuple: Formatted response and status code
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        job = dict(job) if job else None
+
+    if not job:
+        return _format_response("Extraction job not found", success=False, status_code=404)
+
+    return _format_response("Extraction job retrieved successfully", job)
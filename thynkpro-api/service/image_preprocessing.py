@@ -0,0 +1,105 @@
+import io
+import logging
+import os
+from config.instrumentation import timed_phase
+from config.metrics import registry, Counter
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional, images are sent unchanged without it
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Shrink, rotate and re-encode uploads before they are sent to the model
+IMAGE_PREPROCESS_ENABLED = os.getenv('IMAGE_PREPROCESS_ENABLED', 'True').lower() == 'true'
+# Longest side in pixels after downscaling
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', '2048'))
+# Convert to grayscale, usually fine for printed or handwritten prescriptions
+IMAGE_GRAYSCALE = os.getenv('IMAGE_GRAYSCALE', 'False').lower() == 'true'
+# Output encoding (JPEG or WEBP) and its quality (1-100)
+IMAGE_OUTPUT_FORMAT = os.getenv('IMAGE_OUTPUT_FORMAT', 'JPEG').upper()
+IMAGE_OUTPUT_QUALITY = int(os.getenv('IMAGE_OUTPUT_QUALITY', '85'))
+
+OUTPUT_MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp'}
+EXIF_ORIENTATION = 0x0112
+
+image_bytes_in = registry.register(Counter(
+    'image_preprocess_input_bytes_total', 'Upload bytes before pre-processing'))
+image_bytes_out = registry.register(Counter(
+    'image_preprocess_output_bytes_total', 'Bytes sent to the model after pre-processing'))
+images_processed = registry.register(Counter(
+    'image_preprocess_total', 'Images seen by the pre-processing stage', ('outcome',)))
+
+
+def preprocess_image(image_data, mime_type, max_dimension=None, grayscale=None,
+                     output_format=None, quality=None):
+    """
+    Prepare an uploaded image for the extraction prompt.
+
+    Applies the EXIF orientation, downscales so the longest side is at most
+    max_dimension, optionally converts to grayscale and re-encodes as JPEG
+    or WEBP. The original bytes are kept when Pillow is missing, the image
+    cannot be decoded (e.g. HEIC without a plugin) or the result would not
+    be smaller. Arguments default to the IMAGE_* settings.
+
+    Returns:
+        tuple: (image bytes, mime type, stats dict with original_bytes,
+            output_bytes, saved_bytes, size and outcome)
+    """
+    original_bytes = len(image_data)
+    stats = {'original_bytes': original_bytes, 'output_bytes': original_bytes,
+             'saved_bytes': 0, 'size': None, 'outcome': 'skipped'}
+    if Image is None or not IMAGE_PREPROCESS_ENABLED or not (mime_type or '').startswith('image/'):
+        images_processed.inc(outcome='skipped')
+        return image_data, mime_type, stats
+
+    max_dimension = max_dimension or IMAGE_MAX_DIMENSION
+    grayscale = IMAGE_GRAYSCALE if grayscale is None else grayscale
+    output_format = (output_format or IMAGE_OUTPUT_FORMAT).upper()
+    quality = quality or IMAGE_OUTPUT_QUALITY
+    if output_format not in OUTPUT_MIME_TYPES:
+        output_format = 'JPEG'
+
+    with timed_phase('preprocess'):
+        try:
+            with Image.open(io.BytesIO(image_data)) as source:
+                if source.format == 'JPEG':
+                    # Let the decoder skip detail that downscaling would drop anyway
+                    source.draft(source.mode, (max_dimension, max_dimension))
+                needs_rotation = source.getexif().get(EXIF_ORIENTATION, 1) != 1
+                was_changed = needs_rotation or max(source.size) > max_dimension
+                image = ImageOps.exif_transpose(source)
+                image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+                if grayscale:
+                    image = image.convert('L')
+                elif image.mode not in ('RGB', 'L'):
+                    # JPEG has no alpha channel or palette
+                    image = image.convert('RGB')
+                buffer = io.BytesIO()
+                image.save(buffer, format=output_format, quality=quality, optimize=True)
+                output = buffer.getvalue()
+                stats['size'] = list(image.size)
+        except Exception as e:
+            logger.info("Image pre-processing skipped: %s", e)
+            images_processed.inc(outcome='error')
+            image_bytes_in.inc(original_bytes)
+            image_bytes_out.inc(original_bytes)
+            stats['outcome'] = 'error'
+            return image_data, mime_type, stats
+
+    # Rotation and downscaling must always apply; otherwise only a smaller
+    # re-encode is worth replacing the original
+    if len(output) >= original_bytes and not was_changed and not grayscale:
+        output, output_mime = image_data, mime_type
+        stats['outcome'] = 'unchanged'
+    else:
+        output_mime = OUTPUT_MIME_TYPES[output_format]
+        stats['outcome'] = 'processed'
+
+    stats['output_bytes'] = len(output)
+    stats['saved_bytes'] = original_bytes - len(output)
+    images_processed.inc(outcome=stats['outcome'])
+    image_bytes_in.inc(original_bytes)
+    image_bytes_out.inc(len(output))
+    return output, output_mime, stats
@@ -0,0 +1,129 @@
+import json
+import re
+
+_FENCE = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*(?:```|$)', re.IGNORECASE)
+_CLOSERS = {'{': '}', '[': ']'}
+_PYTHON_LITERALS = {'None': 'null', 'True': 'true', 'False': 'false'}
+_BARE_WORD = re.compile(r'[A-Za-z_]\w*')
+_NEXT_TOKEN = re.compile(r'\s*(.)')
+
+
+def _scan(text):
+    """
+    Walk a JSON candidate starting at its first brace.
+
+    Returns:
+        tuple: (end index just past the balanced value or None if the text is
+            truncated, stack of still-open brackets, whether a string is open)
+    """
+    stack = []
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in ('}', ']') and stack:
+            stack.pop()
+            if not stack:
+                return index + 1, [], False
+    return None, stack, in_string
+
+
+def _fix_outside_strings(text):
+    """Drop trailing commas and turn Python literals into JSON ones, leaving string contents alone"""
+    fixed = []
+    in_string = escaped = False
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ',':
+            following = _NEXT_TOKEN.match(text, index + 1)
+            if following and following.group(1) in '}]':
+                index += 1
+                continue
+        elif char.isalpha() or char == '_':
+            word = _BARE_WORD.match(text, index).group()
+            fixed.append(_PYTHON_LITERALS.get(word, word))
+            index += len(word)
+            continue
+        fixed.append(char)
+        index += 1
+    return ''.join(fixed)
+
+
+def extract_json_from_text(text):
+    """
+    The first complete JSON object in a model reply.
+
+    Looks inside a ```json fence when there is one, then takes the first
+    balanced {...} block, so text before or after the object (or a second
+    object) is ignored. Truncated objects are returned up to the end of the text.
+    """
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find('{')
+    if start < 0:
+        return text
+    end, _, _ = _scan(text[start:])
+    return text[start:start + end] if end else text[start:]
+
+
+def repair_json(text):
+    """
+    Fix the usual ways model JSON breaks, without calling the model again:
+    trailing commas, a reply cut off mid-string or mid-object (open strings
+    and brackets are closed, a dangling key or comma is dropped) and
+    Python-style literals. String contents are never changed.
+    """
+    text = text.strip()
+    end, stack, in_string = _scan(text)
+    if end:
+        text = text[:end]
+    else:
+        if in_string:
+            text += '"'
+        # Drop an incomplete trailing member: `"key":`, `"key"` or a comma
+        text = re.sub(r'(,\s*"[^"]*"\s*:?\s*|,\s*|:\s*)$', '', text)
+        text = re.sub(r'([{,]\s*)"[^"]*"\s*$', r'\1', text).rstrip().rstrip(',')
+        text += ''.join(_CLOSERS[opener] for opener in reversed(stack))
+    return _fix_outside_strings(text)
+
+
+def parse_model_json(text):
+    """
+    Decode a model reply as JSON, repairing it locally if needed.
+
+    Tries the reply as-is (JSON response mode), then the extracted object,
+    then the repaired object.
+
+    Raises:
+        json.JSONDecodeError: If the reply cannot be repaired
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    candidate = extract_json_from_text(text)
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(candidate))
@@ -1,5 +1,7 @@
 from model.patient import Patient, Note
-from config.db_config import db
+from config.db_config import db, read_session
+from service.search_index import index_patient
+from service.resource_versions import touch_patient
 import uuid
 from datetime import datetime
 
@@ -13,7 +15,7 @@ def get_all_notes_for_patient(patient_id):
     Returns:
         list: List of note dictionaries
     """
-    patient = Patient.query.get(uuid.UUID(patient_id))
+    patient = read_session().get(Patient, uuid.UUID(patient_id))
     if not patient:
         return None
     
@@ -40,6 +42,8 @@ def create_patient_note(patient_id, content):
     )
     
     db.session.add(note)
+    touch_patient(note.patient_id)
+    index_patient(note.patient_id)
     db.session.commit()
     
     return note.to_dict()
@@ -54,7 +58,7 @@ def get_note_by_id(note_id):
     Returns:
         dict: The note as a dictionary
     """
-    note = Note.query.get(uuid.UUID(note_id))
+    note = read_session().get(Note, uuid.UUID(note_id))
     if not note:
         return None
     
@@ -78,6 +82,8 @@ def update_note(note_id, content):
     note.content = content
     note.updated_at = datetime.utcnow()
     
+    touch_patient(note.patient_id)
+    index_patient(note.patient_id)
     db.session.commit()
     
     return note.to_dict()
@@ -97,6 +103,8 @@ def delete_note(note_id):
         return False
     
     db.session.delete(note)
+    touch_patient(note.patient_id)
+    index_patient(note.patient_id)
     db.session.commit()
     
     return True
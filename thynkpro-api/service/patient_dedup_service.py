@@ -0,0 +1,312 @@
+import os
+import re
+import unicodedata
+from datetime import datetime
+from difflib import SequenceMatcher
+from sqlalchemy import func
+from config.db_config import db
+from model.patient import Patient, Medicine, Note
+from model.dedup import PatientBlockingKey, PatientDuplicateCandidate
+
+# Merge new extractions into a likely existing patient instead of inserting a new one
+PATIENT_DEDUP_ENABLED = os.getenv('PATIENT_DEDUP_ENABLED', 'True').lower() == 'true'
+# Minimum match score (0-1) for a candidate to be treated as the same person
+PATIENT_DEDUP_THRESHOLD = float(os.getenv('PATIENT_DEDUP_THRESHOLD', '0.85'))
+# Candidates scoring at least this, but not merged, are recorded as possible duplicates
+PATIENT_DEDUP_REVIEW_THRESHOLD = float(os.getenv('PATIENT_DEDUP_REVIEW_THRESHOLD', '0.6'))
+# Upper bound on candidates scored per extraction, keeps very common names cheap
+PATIENT_DEDUP_MAX_CANDIDATES = int(os.getenv('PATIENT_DEDUP_MAX_CANDIDATES', '50'))
+
+# Ages are blocked in bands of this many years; neighbouring bands are searched too
+AGE_BAND_YEARS = 5
+MAX_AGE = 130
+NAME_TITLES = {'mr', 'mrs', 'ms', 'miss', 'dr', 'master', 'baby', 'smt', 'shri', 'sri', 'kumari'}
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6'
+}
+
+
+def normalize_text(value):
+    """Lowercase ASCII letters, digits and single spaces"""
+    value = unicodedata.normalize('NFKD', str(value or '')).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', value.lower()).split())
+
+
+def normalize_name(name):
+    """Normalized name without titles such as Mr or Dr"""
+    return ' '.join(token for token in normalize_text(name).split() if token not in NAME_TITLES)
+
+
+def soundex(token):
+    """American Soundex code of one name token"""
+    letters = [char for char in token if char.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+        if char not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def _phonetic_name(name):
+    # Sorted so "Kumar Ravi" and "Ravi Kumar" block together
+    return '.'.join(sorted(soundex(token) for token in name.split() if soundex(token)))
+
+
+def _age_band(age):
+    return None if age is None else max(0, min(int(age), MAX_AGE)) // AGE_BAND_YEARS
+
+
+def _parse_age(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def blocking_keys(name, age, hospital_name, query=False):
+    """
+    Blocking keys for a patient.
+
+    Stored keys use the patient's own age band (or 'x' without an age).
+    Query keys (query=True) also cover the neighbouring bands, or every
+    band when the age is unknown, so small age differences still collide.
+    """
+    name = normalize_name(name)
+    if not name:
+        return []
+    phonetic = _phonetic_name(name)
+    band = _age_band(age)
+    if band is None:
+        bands = list(range(MAX_AGE // AGE_BAND_YEARS + 1)) + ['x'] if query else ['x']
+    else:
+        bands = [band - 1, band, band + 1, 'x'] if query else [band]
+
+    keys = []
+    for value in bands:
+        keys.append(f'n:{name}:{value}'[:160])
+        if phonetic:
+            keys.append(f'p:{phonetic}:{value}'[:160])
+    hospital = normalize_text(hospital_name)
+    if hospital and phonetic:
+        keys.append(f'h:{phonetic}:{hospital}'[:160])
+    return keys
+
+
+def index_blocking_keys(patient, replace=True):
+    """Replace a patient's blocking keys (replace=False for a new patient), without committing"""
+    if replace:
+        remove_blocking_keys(patient.id)
+    for key in blocking_keys(patient.patient_name, patient.patient_age, patient.hospital_name):
+        db.session.add(PatientBlockingKey(key=key, patient_id=patient.id))
+
+
+def remove_blocking_keys(patient_id):
+    """Delete a patient's blocking keys, without committing"""
+    db.session.query(PatientBlockingKey).filter(PatientBlockingKey.patient_id == patient_id) \
+        .delete(synchronize_session=False)
+
+
+def remove_duplicate_candidates(patient_id):
+    """Delete possible-duplicate links from or to a patient, without committing"""
+    db.session.query(PatientDuplicateCandidate).filter(
+        (PatientDuplicateCandidate.patient_id == patient_id) | (PatientDuplicateCandidate.candidate_id == patient_id)
+    ).delete(synchronize_session=False)
+
+
+def blocking_key_rows(patient_rows):
+    """Insert rows for patient_blocking_keys, for bulk loads that bypass the ORM"""
+    return [
+        {'key': key, 'patient_id': row['id']}
+        for row in patient_rows
+        for key in blocking_keys(row.get('patient_name'), row.get('patient_age'), row.get('hospital_name'))
+    ]
+
+
+def match_score(data, patient):
+    """
+    Similarity (0-1) of an extracted record and an existing patient.
+
+    Name similarity carries most of the weight; age, hospital and gender
+    add to it only when both records have them and they agree, so missing
+    data never counts as a match. Known but conflicting genders, or ages
+    more than two years apart, rule the candidate out. A known hospital
+    that differs adds nothing and leaves the match uncorroborated, so the
+    candidate can at most be sent for review.
+
+    Returns:
+        tuple: (score, corroborated) where corroborated is True only when
+            both the age and the hospital are known on both sides and match
+    """
+    gender, existing_gender = normalize_text(data.get('patient_gender')), normalize_text(patient.patient_gender)
+    if gender and existing_gender and gender[0] != existing_gender[0]:
+        return 0.0, False
+    age = _parse_age(data.get('patient_age'))
+    if age is not None and patient.patient_age is not None and abs(age - patient.patient_age) > 2:
+        return 0.0, False
+
+    score = 0.7 * SequenceMatcher(None, normalize_name(data.get('patient_name')),
+                                  normalize_name(patient.patient_name)).ratio()
+    age_matches = age is not None and patient.patient_age is not None
+    if age_matches:
+        score += 0.15 * (1 - abs(age - patient.patient_age) / 3)
+    hospital, existing_hospital = normalize_text(data.get('hospital_name')), normalize_text(patient.hospital_name)
+    hospital_matches = bool(hospital) and hospital == existing_hospital
+    if hospital_matches:
+        score += 0.1
+    if gender and existing_gender:
+        score += 0.05
+    return round(score, 3), age_matches and hospital_matches
+
+
+def find_duplicate(data):
+    """
+    The existing patient most likely to be the person in an extracted record.
+
+    Candidates share at least one blocking key. The PATIENT_DEDUP_MAX_CANDIDATES
+    scored are those sharing the most keys, then the most recently updated.
+
+    Returns:
+        tuple: (Patient, score, corroborated), or (None, 0, False) when no
+            candidate reaches PATIENT_DEDUP_REVIEW_THRESHOLD
+    """
+    keys = blocking_keys(data.get('patient_name'), _parse_age(data.get('patient_age')),
+                         data.get('hospital_name'), query=True)
+    if not keys:
+        return None, 0, False
+    candidates = db.session.query(Patient) \
+        .join(PatientBlockingKey, PatientBlockingKey.patient_id == Patient.id) \
+        .filter(PatientBlockingKey.key.in_(keys)) \
+        .group_by(Patient.id) \
+        .order_by(func.count(PatientBlockingKey.key).desc(), Patient.updated_at.desc(), Patient.id) \
+        .limit(PATIENT_DEDUP_MAX_CANDIDATES).all()
+
+    best, best_score, best_corroborated = None, 0, False
+    for patient in candidates:
+        score, corroborated = match_score(data, patient)
+        if (score, corroborated) > (best_score, best_corroborated):
+            best, best_score, best_corroborated = patient, score, corroborated
+    if best_score < PATIENT_DEDUP_REVIEW_THRESHOLD:
+        return None, 0, False
+    return best, best_score, best_corroborated
+
+
+def _merged_note(data):
+    # Clinical text that differs from the record is kept as a note instead of overwriting it
+    parts = []
+    for field, label in (('diagnosis', 'Diagnosis'), ('doctor_advice', "Doctor's advice")):
+        if data.get(field):
+            parts.append(f"{label}: {data[field]}")
+    return f"Merged extraction ({datetime.utcnow():%Y-%m-%d})\n" + '\n'.join(parts)
+
+
+def merge_into_patient(patient, data):
+    """
+    Fold a new extraction into an existing patient without losing anything.
+
+    Empty fields are filled in. A diagnosis or advice that differs from the
+    stored one is not overwritten; the new extraction's clinical text is
+    attached to the patient as a note instead. Medicines not already on
+    record (by normalized name) are attached.
+
+    Returns:
+        tuple: (medicines added, whether a note was added)
+    """
+    for field in ('patient_age', 'patient_gender', 'doctor_name', 'hospital_name', 'diagnosis', 'doctor_advice'):
+        if getattr(patient, field) in (None, '') and data.get(field) not in (None, ''):
+            setattr(patient, field, data[field])
+
+    differs = any(
+        data.get(field) and normalize_text(data[field]) != normalize_text(getattr(patient, field))
+        for field in ('diagnosis', 'doctor_advice')
+    )
+    if differs:
+        # Added directly, appending to patient.notes would load the whole note history
+        db.session.add(Note(patient_id=patient.id, content=_merged_note(data)))
+
+    known = {normalize_text(medicine.medicine_name) for medicine in patient.medicines}
+    added = 0
+    for med_data in data.get('medicines') or []:
+        if not isinstance(med_data, dict):
+            continue
+        name = normalize_text(med_data.get('medicine_name'))
+        if not name or name in known:
+            continue
+        known.add(name)
+        patient.medicines.append(Medicine(
+            medicine_name=med_data.get('medicine_name', ''),
+            dosage=med_data.get('dosage', ''),
+            frequency=med_data.get('frequency', '')
+        ))
+        added += 1
+    patient.updated_at = datetime.utcnow()
+    return added, differs
+
+
+def save_extracted_patient(data, dedup=None):
+    """
+    Add an extracted record to the session, merged into a likely duplicate
+    when one exists. Nothing is committed; callers index and commit as before.
+
+    A candidate is merged only when it reaches PATIENT_DEDUP_THRESHOLD and
+    both its age and its hospital match. Any other candidate scoring at
+    least PATIENT_DEDUP_REVIEW_THRESHOLD, e.g. the same name and age at a
+    different hospital, gets a new patient linked to it as a possible
+    duplicate, for a person to review.
+
+    Args:
+        data (dict): Validated extraction result
+        dedup (bool): Override PATIENT_DEDUP_ENABLED
+
+    Returns:
+        tuple: (Patient, match) where match is None for an unrelated new
+            patient, {'status': 'merged', 'patient_id', 'score',
+            'medicines_added', 'note_added'} after a merge, or
+            {'status': 'possible_duplicate', 'patient_id', 'score'}
+    """
+    candidate, score = None, 0
+    if PATIENT_DEDUP_ENABLED if dedup is None else dedup:
+        candidate, score, corroborated = find_duplicate(data)
+        if candidate is not None and corroborated and score >= PATIENT_DEDUP_THRESHOLD:
+            added, note_added = merge_into_patient(candidate, data)
+            index_blocking_keys(candidate)
+            return candidate, {'status': 'merged', 'patient_id': candidate.id, 'score': score,
+                               'medicines_added': added, 'note_added': note_added}
+
+    patient = Patient.from_json(data)
+    db.session.add(patient)
+    index_blocking_keys(patient, replace=False)
+    if candidate is None:
+        return patient, None
+    db.session.add(PatientDuplicateCandidate(patient_id=patient.id, candidate_id=candidate.id, score=score))
+    return patient, {'status': 'possible_duplicate', 'patient_id': candidate.id, 'score': score}
+
+
+def rebuild_blocking_keys(batch_size=500):
+    """Rebuild the blocking keys of every patient, committing per batch. Used to backfill existing data."""
+    indexed = 0
+    last_id = None
+    while True:
+        query = db.session.query(Patient.id, Patient.patient_name, Patient.patient_age, Patient.hospital_name) \
+            .order_by(Patient.id)
+        if last_id is not None:
+            query = query.filter(Patient.id > last_id)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            return indexed
+        ids = [row.id for row in rows]
+        db.session.query(PatientBlockingKey).filter(PatientBlockingKey.patient_id.in_(ids)) \
+            .delete(synchronize_session=False)
+        key_rows = blocking_key_rows([row._asdict() for row in rows])
+        if key_rows:
+            db.session.execute(PatientBlockingKey.__table__.insert(), key_rows)
+        db.session.commit()
+        indexed += len(rows)
+        last_id = ids[-1]
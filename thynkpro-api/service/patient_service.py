@@ -1,43 +1,99 @@
+import base64
 import json
-import re
+import logging
+import os
+import uuid
+from datetime import datetime
 from config.ai_config import model
-from model.patient import Patient
-from config.db_config import db
+from sqlalchemy.orm import selectinload
+from model.patient import Patient, Medicine, Note, Summary, PATIENT_RELATIONSHIPS
+from model.serializers import rows_to_dicts
+from config.db_config import db, read_session, release_connection
+from config.instrumentation import timed_phase
+from service.extraction_cache import extraction_cache, make_cache_key
+from service.image_preprocessing import preprocess_image
+from service.json_repair import parse_model_json
+from schema.validator import validate_patient
+from service.search_index import index_patient, remove_patient_from_index
+from service.patient_dedup_service import save_extracted_patient, index_blocking_keys, remove_blocking_keys, \
+    remove_duplicate_candidates
 
-def _format_response(message, data=None, success=True, status_code=200):
-    return {
+logger = logging.getLogger(__name__)
+
+# Default and maximum page size for GET /patient
+PATIENT_PAGE_SIZE = int(os.getenv('PATIENT_PAGE_SIZE', '50'))
+PATIENT_MAX_PAGE_SIZE = int(os.getenv('PATIENT_MAX_PAGE_SIZE', '200'))
+
+# Columns returned by GET /patient when no fields= projection is given
+PATIENT_LIST_FIELDS = ('id', 'patient_name', 'diagnosis', 'patient_age', 'patient_gender', 'created_at', 'updated_at')
+PATIENT_SELECTABLE_FIELDS = PATIENT_LIST_FIELDS + ('doctor_advice', 'doctor_name', 'hospital_name')
+
+# Default and maximum number of notes/summaries embedded in GET /patient/<id>
+PATIENT_COLLECTION_PAGE_SIZE = int(os.getenv('PATIENT_COLLECTION_PAGE_SIZE', '20'))
+PATIENT_COLLECTION_MAX_PAGE_SIZE = int(os.getenv('PATIENT_COLLECTION_MAX_PAGE_SIZE', '100'))
+
+# Ask the model for schema-conforming JSON instead of free text
+EXTRACTION_JSON_MODE = os.getenv('EXTRACTION_JSON_MODE', 'True').lower() == 'true'
+
+EXTRACTION_PROMPT = "Extract all text from this image and convert it to structured data. Return ONLY valid JSON data according to this schema: "
+
+def _format_response(message, data=None, success=True, status_code=200, pagination=None):
+    response = {
         "Message": message,
-        "Data": data or {},
+        "Data": {} if data is None else data,
         "success": "true" if success else "false"
-    }, status_code
+    }
+    if pagination is not None:
+        response["Pagination"] = pagination
+    return response, status_code
 
-def extract_text_from_image(image_file, patient_json_schema):
+def extract_text_from_image(image_file, patient_json_schema, force_refresh=False):
 
     if image_file.filename == '':
         return _format_response("No image selected", success=False, status_code=400)
 
     try:
         image_data = image_file.read()
-        prompt = [
-            {"mime_type": image_file.content_type, "data": image_data},
-            "Extract all text from this image and convert it to structured data. Return ONLY valid JSON data according to this schema: " + json.dumps(patient_json_schema),
-        ]
-        response = model.generate_content(prompt)
+    except Exception as e:
+        return _format_response(f"Error processing image: {e}", success=False, status_code=500)
 
-        response_text = response.text
-        json_str = extract_json_from_text(response_text)
+    return process_image_data(image_data, image_file.content_type, patient_json_schema, force_refresh)
 
-        extracted_data = json.loads(json_str)
-        
-        # Create a new Patient object from the extracted data
-        patient = Patient.from_json(extracted_data)
+def process_image_data(image_data, mime_type, patient_json_schema, force_refresh=False):
+    """
+    Run the extraction prompt over raw image bytes and save the resulting patient.
+
+    Split out of extract_text_from_image so the job queue can run it after the
+    upload request has already returned. A re-upload of identical bytes returns
+    the patient created the first time instead of inserting a duplicate, unless
+    force_refresh is set.
+    """
+    try:
+        cache_key = make_cache_key(image_data, EXTRACTION_PROMPT, patient_json_schema)
+        if not force_refresh:
+            cached = extraction_cache.get(cache_key)
+            if cached and cached['patient_id']:
+                existing = Patient.query.get(cached['patient_id'])
+                if existing:
+                    cached['data']['id'] = existing.id
+                    return _format_response("Patient Data Already Extracted", cached['data'])
+
+        release_connection()
+        extracted_data = run_extraction_prompt(image_data, mime_type, patient_json_schema, force_refresh, cache_key)
         
-        # Save the patient to the database
+        # Save the patient to the database, merged into an existing record if it is a likely duplicate
         try:
-            db.session.add(patient)
+            patient, match = save_extracted_patient(extracted_data)
+            index_patient(patient.id)
             db.session.commit()
+            extraction_cache.link_patient(cache_key, patient.id)
             # Update extracted_data with database ID
             extracted_data['id'] = patient.id
+            if match and match['status'] == 'merged':
+                extracted_data['merged_into'] = match
+                return _format_response("Patient Data Merged With Existing Patient", extracted_data)
+            if match:
+                extracted_data['possible_duplicate_of'] = match
             return _format_response("Patient Data Extracted and Saved Successfully", extracted_data)
         except Exception as db_error:
             db.session.rollback()
@@ -48,45 +104,213 @@ def extract_text_from_image(image_file, patient_json_schema):
     except Exception as e:
         return _format_response(f"Error processing image: {e}", success=False, status_code=500)
 
-def extract_json_from_text(text):
-    json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
-    if json_match:
-        return json_match.group(1)
-    
-    json_match = re.search(r'({[\s\S]*})', text)
-    if json_match:
-        return json_match.group(1)
-    return text
-
-def get_all_patients():
+def run_extraction_prompt(image_data, mime_type, patient_json_schema, force_refresh=False, cache_key=None):
+    """
+    Send one image to the model and parse its reply.
+
+    Parsed results are cached by content hash, so identical images skip the
+    model call unless force_refresh is set. The image is downscaled and
+    re-encoded by preprocess_image before it is sent. Does not touch the database, so it
+    is safe to call from worker threads.
+
+    The model is asked for JSON matching the schema (JSON response mode);
+    replies that still come back malformed are repaired locally, and the
+    result is coerced to the schema by validate_patient.
+
+    Raises:
+        json.JSONDecodeError: If the reply cannot be repaired into JSON
+        ValueError: If the reply is not a JSON object
+    """
+    cache_key = cache_key or make_cache_key(image_data, EXTRACTION_PROMPT, patient_json_schema)
+    if not force_refresh:
+        cached = extraction_cache.get(cache_key)
+        if cached:
+            return cached['data']
+
+    # The cache key is taken from the original upload, so cache hits skip this too
+    image_data, mime_type, _ = preprocess_image(image_data, mime_type)
+    prompt = [
+        {"mime_type": mime_type, "data": image_data},
+        EXTRACTION_PROMPT + json.dumps(patient_json_schema),
+    ]
+    generation_config = None
+    if EXTRACTION_JSON_MODE:
+        generation_config = {'response_mime_type': 'application/json', 'response_schema': patient_json_schema}
+    response = model.generate_content(prompt, generation_config=generation_config)
+
+    extracted_data, errors = validate_patient(parse_model_json(response.text))
+    if errors:
+        logger.info("Extraction coerced or dropped fields: %s", '; '.join(errors))
+    extraction_cache.set(cache_key, extracted_data)
+    return extracted_data
+
+def _encode_cursor(created_at, patient_id):
+    payload = json.dumps([created_at.isoformat() if created_at else None, str(patient_id)])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor):
+    created_at, patient_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    return (datetime.fromisoformat(created_at) if created_at else None), uuid.UUID(patient_id)
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _parse_list_params(params):
+    """Validate GET /patient query parameters, raising ValueError on bad input"""
+    limit = int(params.get('limit', PATIENT_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+
+    fields = list(PATIENT_LIST_FIELDS)
+    if params.get('fields'):
+        fields = [field.strip() for field in params['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in PATIENT_SELECTABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+
+    return {
+        'limit': min(limit, PATIENT_MAX_PAGE_SIZE),
+        'cursor': _decode_cursor(params['cursor']) if params.get('cursor') else None,
+        'fields': fields,
+        'name': params.get('name'),
+        'diagnosis': params.get('diagnosis'),
+        'gender': params.get('gender'),
+        'min_age': int(params['min_age']) if params.get('min_age') else None,
+        'max_age': int(params['max_age']) if params.get('max_age') else None,
+        'created_from': datetime.fromisoformat(params['created_from']) if params.get('created_from') else None,
+        'created_to': datetime.fromisoformat(params['created_to']) if params.get('created_to') else None
+    }
+
+def get_all_patients(params=None):
+    """
+    List patients newest first, one keyset page at a time.
+
+    Supported parameters: limit, cursor (next_cursor from the previous page),
+    name (prefix), diagnosis (substring), gender, min_age, max_age,
+    created_from, created_to (ISO dates) and fields (comma separated columns).
+    Only the requested columns are selected, no ORM objects are built.
+    """
     try:
-        patients = Patient.query.all()
-        patients_data = []
+        options = _parse_list_params(params or {})
+    except (ValueError, TypeError, KeyError) as e:
+        return _format_response(f"Invalid query parameters: {e}", success=False, status_code=400)
 
-        if patients is None:
-            return _format_response({}, success=False, status_code=404)
-        
-        for patient in patients:
-            patients_data.append({
-                'id': patient.id,
-                'patient_name': patient.patient_name,
-                'diagnosis': patient.diagnosis,
-                'patient_age': patient.patient_age,
-                'patient_gender': patient.patient_gender,
-                'created_at': patient.created_at.isoformat() if patient.created_at else None,
-                'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
-            })
-        
-        return _format_response("Patients retrieved successfully", patients_data)
+    try:
+        # created_at is always selected because the cursor is built from it
+        selected = list(dict.fromkeys(options['fields'] + ['created_at']))
+        query = read_session().query(*[getattr(Patient, field) for field in selected])
+
+        if options['name']:
+            query = query.filter(Patient.patient_name.ilike(_escape_like(options['name']) + '%', escape='\\'))
+        if options['diagnosis']:
+            query = query.filter(Patient.diagnosis.ilike('%' + _escape_like(options['diagnosis']) + '%', escape='\\'))
+        if options['gender']:
+            query = query.filter(db.func.lower(Patient.patient_gender) == options['gender'].lower())
+        if options['min_age'] is not None:
+            query = query.filter(Patient.patient_age >= options['min_age'])
+        if options['max_age'] is not None:
+            query = query.filter(Patient.patient_age <= options['max_age'])
+        if options['created_from']:
+            query = query.filter(Patient.created_at >= options['created_from'])
+        if options['created_to']:
+            query = query.filter(Patient.created_at <= options['created_to'])
+
+        if options['cursor']:
+            cursor_created_at, cursor_id = options['cursor']
+            query = query.filter(db.or_(
+                Patient.created_at < cursor_created_at,
+                db.and_(Patient.created_at == cursor_created_at, Patient.id < cursor_id)
+            ))
+
+        # Fetch one extra row to know whether another page exists
+        rows = query.order_by(Patient.created_at.desc(), Patient.id.desc()).limit(options['limit'] + 1).all()
+        has_more = len(rows) > options['limit']
+        rows = rows[:options['limit']]
+
+        with timed_phase('serialize'):
+            patients_data = rows_to_dicts(rows, options['fields'])
+
+        pagination = {
+            'limit': options['limit'],
+            'has_more': has_more,
+            'next_cursor': _encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        }
+        return _format_response("Patients retrieved successfully", patients_data, pagination=pagination)
     except Exception as e:
         return _format_response(f"Error retrieving patients: {e}", success=False, status_code=500)
 
+def _parse_patient_id(patient_id):
+    try:
+        return uuid.UUID(str(patient_id))
+    except ValueError:
+        return None
+
+def _parse_detail_params(params):
+    """Validate include= and collection paging parameters, raising ValueError on bad input"""
+    include = PATIENT_RELATIONSHIPS
+    if params.get('include') is not None:
+        include = tuple(name.strip() for name in params['include'].split(',') if name.strip())
+        unknown = [name for name in include if name not in PATIENT_RELATIONSHIPS]
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)}")
+
+    options = {'include': include}
+    for name in ('notes', 'summaries'):
+        limit = int(params.get(f'{name}_limit', PATIENT_COLLECTION_PAGE_SIZE))
+        offset = int(params.get(f'{name}_offset', 0))
+        if limit < 1 or offset < 0:
+            raise ValueError(f"{name}_limit must be positive and {name}_offset not negative")
+        options[name] = (min(limit, PATIENT_COLLECTION_MAX_PAGE_SIZE), offset)
+    return options
+
+def _load_patient_detail(patient_uuid, options, session):
+    """
+    Load a patient and the requested collections in a fixed number of queries:
+    one for the patient (plus one for medicines when included) and one per
+    capped notes/summaries page.
+
+    session is read_session() for plain reads, db.session after a write.
+
+    Returns:
+        tuple: (patient dict, per-collection paging info), or None if not found
+    """
+    query = session.query(Patient)
+    if 'medicines' in options['include']:
+        query = query.options(selectinload(Patient.medicines))
+    patient = query.filter(Patient.id == patient_uuid).first()
+    if not patient:
+        return None
+
+    collections = {}
+    pagination = {}
+    for name, child_model in (('notes', Note), ('summaries', Summary)):
+        if name not in options['include']:
+            continue
+        limit, offset = options[name]
+        rows = session.query(child_model).filter(child_model.patient_id == patient_uuid) \
+            .order_by(child_model.created_at.desc(), child_model.id.desc()) \
+            .offset(offset).limit(limit + 1).all()
+        collections[name] = rows[:limit]
+        pagination[name] = {'limit': limit, 'offset': offset, 'has_more': len(rows) > limit}
+
+    with timed_phase('serialize'):
+        return patient.to_dict(options['include'], collections), pagination
+
 def delete_patient(patient_id):
     try:
-        patient = Patient.query.get(patient_id)
+        patient_uuid = _parse_patient_id(patient_id)
+        if not patient_uuid:
+            return _format_response("Invalid patient ID format", success=False, status_code=400)
+
+        patient = Patient.query.get(patient_uuid)
         if not patient:
             return _format_response("Patient not found", success=False, status_code=404)
         
+        remove_patient_from_index(patient_uuid)
+        remove_blocking_keys(patient_uuid)
+        remove_duplicate_candidates(patient_uuid)
         db.session.delete(patient)
         db.session.commit()
         return _format_response("Patient deleted successfully")
@@ -94,9 +318,17 @@ def delete_patient(patient_id):
         db.session.rollback()
         return _format_response(f"Error deleting patient: {e}", success=False, status_code=500)
 
-def update_patient(patient_id, data):
+def update_patient(patient_id, data, params=None):
     try:
-        patient = Patient.query.get(patient_id)
+        patient_uuid = _parse_patient_id(patient_id)
+        if not patient_uuid:
+            return _format_response("Invalid patient ID format", success=False, status_code=400)
+        try:
+            options = _parse_detail_params(params or {})
+        except (ValueError, TypeError) as e:
+            return _format_response(f"Invalid query parameters: {e}", success=False, status_code=400)
+
+        patient = Patient.query.get(patient_uuid)
         if not patient:
             return _format_response("Patient not found", success=False, status_code=404)
         
@@ -123,26 +355,45 @@ def update_patient(patient_id, data):
             # Add new medicines
             for med_data in data['medicines']:
                 if isinstance(med_data, dict):
-                    from model.patient import Medicine
                     medicine = Medicine(
                         medicine_name=med_data.get('medicine_name', ''),
                         dosage=med_data.get('dosage', ''),
                         frequency=med_data.get('frequency', '')
                     )
                     patient.medicines.append(medicine)
+            # Medicines have no timestamp of their own; bump the patient so its ETag changes
+            patient.updated_at = datetime.utcnow()
         
+        if any(field in data for field in ('patient_name', 'patient_age', 'hospital_name')):
+            index_blocking_keys(patient)
+        index_patient(patient_uuid)
         db.session.commit()
-        return _format_response("Patient updated successfully", patient.to_dict())
+        patient_data, pagination = _load_patient_detail(patient_uuid, options, db.session)
+        return _format_response("Patient updated successfully", patient_data, pagination=pagination)
     except Exception as e:
         db.session.rollback()
         return _format_response(f"Error updating patient: {e}", success=False, status_code=500)
 
-def get_patient_by_id(patient_id):
+def get_patient_by_id(patient_id, params=None):
+    """
+    Get one patient with the collections named in params['include']
+    (medicines, summaries, notes; all by default). Notes and summaries are
+    returned newest first and capped by <name>_limit / <name>_offset.
+    """
     try:
-        patient = Patient.query.get(patient_id)
-        if not patient:
+        patient_uuid = _parse_patient_id(patient_id)
+        if not patient_uuid:
+            return _format_response("Invalid patient ID format", success=False, status_code=400)
+        try:
+            options = _parse_detail_params(params or {})
+        except (ValueError, TypeError) as e:
+            return _format_response(f"Invalid query parameters: {e}", success=False, status_code=400)
+
+        detail = _load_patient_detail(patient_uuid, options, read_session())
+        if not detail:
             return _format_response("Patient not found", success=False, status_code=404)
         
-        return _format_response("Patient retrieved successfully", patient.to_dict())
+        patient_data, pagination = detail
+        return _format_response("Patient retrieved successfully", patient_data, pagination=pagination)
     except Exception as e:
         return _format_response(f"Error retrieving patient: {e}", success=False, status_code=500)
@@ -0,0 +1,333 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, select
+from config.db_config import db, read_session
+from model.patient import Patient, Medicine, Note, Summary
+from service.patient_service import _format_response
+from service.search_index import index_patients
+from service.patient_dedup_service import blocking_key_rows
+from model.dedup import PatientBlockingKey
+
+# Patients per server-side fetch on export and per insert batch on import
+TRANSFER_BATCH_SIZE = int(os.getenv('TRANSFER_BATCH_SIZE', '500'))
+# Import errors listed in the response, the rest are only counted
+TRANSFER_MAX_REPORTED_ERRORS = int(os.getenv('TRANSFER_MAX_REPORTED_ERRORS', '100'))
+
+PATIENT_COLUMNS = ('id', 'patient_name', 'patient_age', 'patient_gender', 'diagnosis',
+                   'doctor_advice', 'doctor_name', 'hospital_name', 'created_at', 'updated_at')
+MEDICINE_COLUMNS = ('medicine_name', 'dosage', 'frequency')
+NOTE_COLUMNS = ('id', 'content', 'created_at', 'updated_at')
+SUMMARY_COLUMNS = ('id', 'summary', 'input_fingerprint', 'notes_through', 'notes_through_id',
+                   'notes_partial_offset', 'created_at', 'updated_at')
+
+# Column length limits checked before insert, so one bad record fails alone
+# instead of aborting its whole batch
+STRING_LIMITS = {
+    'patient_name': 255, 'patient_gender': 10, 'doctor_name': 255, 'hospital_name': 255,
+    'medicine_name': 255, 'dosage': 100, 'frequency': 100, 'input_fingerprint': 64
+}
+# Ages outside this range are rejected per record, like the string limits
+MAX_PATIENT_AGE = 150
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _row_dict(row, columns):
+    return {column: _jsonable(getattr(row, column)) for column in columns}
+
+
+def _children_by_patient(session, model, columns, patient_ids, order_by):
+    """One IN query for a batch of patients, grouped by patient_id"""
+    children = {}
+    query = session.query(model.patient_id, *[getattr(model, column) for column in columns]) \
+        .filter(model.patient_id.in_(patient_ids)).order_by(*order_by)
+    for row in query:
+        children.setdefault(row.patient_id, []).append(_row_dict(row, columns))
+    return children
+
+
+def iter_patient_export(batch_size=None):
+    """
+    Yield every patient with medicines, notes and summaries as one dict each.
+
+    Patients are read through a server-side cursor (stream_results) in
+    partitions of batch_size, and each partition loads its children with
+    one query per table, so memory stays flat however large the table is.
+    Plain column rows are used, no ORM objects are built.
+    """
+    batch_size = batch_size or TRANSFER_BATCH_SIZE
+    session = read_session()
+    statement = select(*[getattr(Patient, column) for column in PATIENT_COLUMNS]) \
+        .order_by(Patient.created_at, Patient.id) \
+        .execution_options(stream_results=True, yield_per=batch_size)
+    result = session.execute(statement)
+    try:
+        for partition in result.partitions():
+            patient_ids = [row.id for row in partition]
+            medicines = _children_by_patient(session, Medicine, MEDICINE_COLUMNS, patient_ids, (Medicine.id,))
+            notes = _children_by_patient(session, Note, NOTE_COLUMNS, patient_ids, (Note.created_at, Note.id))
+            summaries = _children_by_patient(session, Summary, SUMMARY_COLUMNS, patient_ids,
+                                             (Summary.created_at, Summary.id))
+            for row in partition:
+                record = _row_dict(row, PATIENT_COLUMNS)
+                record['medicines'] = medicines.get(row.id, [])
+                record['notes'] = notes.get(row.id, [])
+                record['summaries'] = summaries.get(row.id, [])
+                yield record
+    finally:
+        result.close()
+
+
+def iter_patient_ndjson(batch_size=None):
+    """NDJSON lines (with trailing newline) for iter_patient_export"""
+    for record in iter_patient_export(batch_size):
+        yield current_app.json.dumps(record) + '\n'
+
+
+def _parse_uuid(value, field):
+    if value in (None, ''):
+        return uuid.uuid4()
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise ValueError(f"{field} is not a valid UUID")
+
+
+def _parse_datetime(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not an ISO 8601 datetime")
+
+
+def _parse_offset(value, field):
+    if value in (None, ''):
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"{field} is not a non-negative integer")
+    return value
+
+
+def _check_strings(values, columns, prefix=''):
+    for column in columns:
+        value = values.get(column)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"{prefix}{column} must be a string")
+        limit = STRING_LIMITS.get(column)
+        if limit and len(value) > limit:
+            raise ValueError(f"{prefix}{column} is longer than {limit} characters")
+
+
+def _timestamps(item, prefix, now):
+    created_at = _parse_datetime(item.get('created_at'), f'{prefix}created_at') or now
+    updated_at = _parse_datetime(item.get('updated_at'), f'{prefix}updated_at') or created_at
+    return created_at, updated_at
+
+
+def _child_list(record, name):
+    items = record.get(name) or []
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"{name} must be a list of objects")
+    return items
+
+
+def _validate_record(record, now):
+    """
+    Turn one import record into insert rows.
+
+    Accepts the export format (ids and timestamps are kept when present,
+    generated otherwise).
+
+    Returns:
+        dict: Rows per table: patients (one row), medicines, notes, summaries
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+
+    patient_id = _parse_uuid(record.get('id'), 'id')
+    _check_strings(record, ('patient_name', 'patient_gender', 'diagnosis', 'doctor_advice',
+                            'doctor_name', 'hospital_name'))
+    age = record.get('patient_age')
+    if age is not None:
+        if isinstance(age, bool) or not isinstance(age, (int, float, str)):
+            raise ValueError("patient_age must be a number")
+        try:
+            age = int(float(age))
+        except (ValueError, OverflowError):
+            raise ValueError("patient_age must be a number")
+        if not 0 <= age <= MAX_PATIENT_AGE:
+            raise ValueError(f"patient_age must be between 0 and {MAX_PATIENT_AGE}")
+    created_at, updated_at = _timestamps(record, '', now)
+
+    rows = {
+        'patients': [{
+            'id': patient_id,
+            'patient_name': record.get('patient_name'),
+            'patient_age': age,
+            'patient_gender': record.get('patient_gender'),
+            'diagnosis': record.get('diagnosis'),
+            'doctor_advice': record.get('doctor_advice'),
+            'doctor_name': record.get('doctor_name'),
+            'hospital_name': record.get('hospital_name'),
+            'created_at': created_at,
+            'updated_at': updated_at
+        }],
+        'medicines': [],
+        'notes': [],
+        'summaries': []
+    }
+
+    for index, medicine in enumerate(_child_list(record, 'medicines')):
+        _check_strings(medicine, MEDICINE_COLUMNS, f'medicines[{index}].')
+        rows['medicines'].append({
+            'id': uuid.uuid4(),
+            'patient_id': patient_id,
+            **{column: medicine.get(column, '') for column in MEDICINE_COLUMNS}
+        })
+
+    for index, note in enumerate(_child_list(record, 'notes')):
+        prefix = f'notes[{index}].'
+        _check_strings(note, ('content',), prefix)
+        note_created_at, note_updated_at = _timestamps(note, prefix, now)
+        rows['notes'].append({
+            'id': _parse_uuid(note.get('id'), f'{prefix}id'),
+            'patient_id': patient_id,
+            'content': note.get('content', ''),
+            'created_at': note_created_at,
+            'updated_at': note_updated_at
+        })
+
+    for index, summary in enumerate(_child_list(record, 'summaries')):
+        prefix = f'summaries[{index}].'
+        _check_strings(summary, ('summary', 'input_fingerprint'), prefix)
+        summary_created_at, summary_updated_at = _timestamps(summary, prefix, now)
+        rows['summaries'].append({
+            'id': _parse_uuid(summary.get('id'), f'{prefix}id'),
+            'patient_id': patient_id,
+            'summary': summary.get('summary', ''),
+            'input_fingerprint': summary.get('input_fingerprint'),
+            'notes_through': _parse_datetime(summary.get('notes_through'), f'{prefix}notes_through'),
+            'notes_through_id': _parse_uuid(summary['notes_through_id'], f'{prefix}notes_through_id')
+            if summary.get('notes_through_id') else None,
+            'notes_partial_offset': _parse_offset(summary.get('notes_partial_offset'), f'{prefix}notes_partial_offset'),
+            'created_at': summary_created_at,
+            'updated_at': summary_updated_at
+        })
+
+    return rows
+
+
+def _insert_batch(batch, report, update_index):
+    """
+    Insert one validated batch with a single executemany per table and commit.
+
+    Patients whose id already exists are skipped, so re-running an import
+    of the same file is harmless.
+    """
+    ids = [rows['patients'][0]['id'] for _, rows in batch]
+    existing = {row.id for row in db.session.query(Patient.id).filter(Patient.id.in_(ids))}
+    tables = {'patients': [], 'medicines': [], 'notes': [], 'summaries': []}
+    seen = set()
+    for line_number, rows in batch:
+        patient_id = rows['patients'][0]['id']
+        if patient_id in existing or patient_id in seen:
+            report['skipped'] += 1
+            continue
+        seen.add(patient_id)
+        for table, table_rows in rows.items():
+            tables[table].extend(table_rows)
+
+    if not seen:
+        return
+    try:
+        for table, model in (('patients', Patient), ('medicines', Medicine), ('notes', Note), ('summaries', Summary)):
+            if tables[table]:
+                db.session.execute(insert(model.__table__), tables[table])
+        key_rows = blocking_key_rows(tables['patients'])
+        if key_rows:
+            db.session.execute(insert(PatientBlockingKey.__table__), key_rows)
+        if update_index:
+            index_patients(list(seen))
+        db.session.commit()
+        report['imported'] += len(seen)
+    except Exception as e:
+        db.session.rollback()
+        report['failed'] += len(seen)
+        _add_error(report, batch[0][0], f"Batch starting at this line was not saved: {e}")
+
+
+def _add_error(report, line_number, message):
+    if len(report['errors']) < TRANSFER_MAX_REPORTED_ERRORS:
+        report['errors'].append({'line': line_number, 'error': message})
+
+
+def import_patients(lines, batch_size=None, update_index=True):
+    """
+    Bulk import NDJSON patient records, e.g. a file written by the export.
+
+    Records are validated one by one, and valid ones are inserted in
+    batches of batch_size with one executemany per table and one commit
+    per batch. Invalid lines are reported and skipped.
+
+    Args:
+        lines (iterable): NDJSON lines as str or bytes; blank lines are ignored
+        batch_size (int): Records per insert batch
+        update_index (bool): Refresh search documents for imported patients;
+            large backfills can skip it and run `flask search rebuild` afterwards
+
+    Returns:
+        dict: Counts (total, imported, skipped, failed) and the first errors by line
+    """
+    batch_size = batch_size or TRANSFER_BATCH_SIZE
+    report = {'total': 0, 'imported': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+    batch = []
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        report['total'] += 1
+        try:
+            rows = _validate_record(json.loads(line), datetime.utcnow())
+        except (ValueError, json.JSONDecodeError) as e:
+            report['failed'] += 1
+            _add_error(report, line_number, str(e))
+            continue
+        batch.append((line_number, rows))
+        if len(batch) >= batch_size:
+            _insert_batch(batch, report, update_index)
+            batch = []
+    if batch:
+        _insert_batch(batch, report, update_index)
+    return report
+
+
+def import_patients_upload(lines, batch_size=None):
+    """Run import_patients for POST /patient/import and format the response"""
+    if batch_size is not None and batch_size < 1:
+        return _format_response("batch_size must be a positive integer", success=False, status_code=400)
+    try:
+        report = import_patients(lines, batch_size)
+    except UnicodeDecodeError:
+        return _format_response("Import file must be UTF-8 encoded NDJSON", success=False, status_code=400)
+    if report['total'] == 0:
+        return _format_response("No records provided", report, success=False, status_code=400)
+    if report['failed'] and not report['imported'] and not report['skipped']:
+        return _format_response("No patients imported", report, success=False, status_code=400)
+    return _format_response("Patients imported", report)
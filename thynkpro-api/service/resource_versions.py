@@ -0,0 +1,83 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import func, select
+from config.db_config import db, read_session
+from config.http_caching import make_etag
+from model.patient import Patient, Medicine, Note, Summary
+
+# Bump when the JSON shape of a versioned resource changes, so old ETags stop matching
+REPRESENTATION_VERSION = 1
+
+
+def _child_count(model, patient_uuid):
+    """Row count of a patient's child rows, as a scalar subquery"""
+    return select(func.count()).select_from(model).where(model.patient_id == patient_uuid).scalar_subquery()
+
+
+def touch_patient(patient_id):
+    """
+    Bump a patient's updated_at, without committing.
+
+    Called on every note and summary add, edit or delete, so the patient's
+    updated_at only ever moves forward and can serve as Last-Modified for
+    the patient and everything under it.
+    """
+    db.session.query(Patient).filter(Patient.id == patient_id) \
+        .update({Patient.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def _parse(patient_id):
+    try:
+        return uuid.UUID(str(patient_id))
+    except ValueError:
+        return None
+
+
+def patient_version(patient_id, params=None):
+    """
+    Validators for GET /patient/<id>, from one aggregate query.
+
+    Changes to medicines, notes and summaries all touch the patient's
+    updated_at (see touch_patient), so it is the Last-Modified. The ETag
+    covers it, the child row counts and the query string, since include=
+    and paging change the body.
+
+    Returns:
+        tuple: (etag, last_modified), or None if the id is invalid or unknown
+    """
+    patient_uuid = _parse(patient_id)
+    if patient_uuid is None:
+        return None
+    statement = select(
+        Patient.updated_at,
+        _child_count(Medicine, patient_uuid),
+        _child_count(Note, patient_uuid),
+        _child_count(Summary, patient_uuid)
+    ).where(Patient.id == patient_uuid)
+    row = read_session().execute(statement).first()
+    if row is None:
+        return None
+    updated_at, medicines, notes, summaries = row
+    params = params or {}
+    query = sorted(params.items(multi=True) if hasattr(params, 'getlist') else params.items())
+    etag = make_etag('patient', REPRESENTATION_VERSION, patient_uuid, updated_at, medicines,
+                     notes, summaries, query)
+    return etag, updated_at
+
+
+def summaries_version(patient_id):
+    """
+    Validators for GET /summary/<patient_id>: the patient's updated_at,
+    which every summary change touches, and the summary count.
+
+    Returns:
+        tuple: (etag, last_modified), or None if the id is invalid
+    """
+    patient_uuid = _parse(patient_id)
+    if patient_uuid is None:
+        return None
+    count = _child_count(Summary, patient_uuid)
+    updated_at, count = read_session().execute(
+        select(select(Patient.updated_at).where(Patient.id == patient_uuid).scalar_subquery(), count)).one()
+    etag = make_etag('summaries', REPRESENTATION_VERSION, patient_uuid, count, updated_at)
+    return etag, updated_at
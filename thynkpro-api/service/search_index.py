@@ -0,0 +1,99 @@
+import os
+from config.db_config import db
+from model.patient import Patient, Note, Summary
+from model.search import PatientSearchDocument
+
+# Postgres text search configuration used for both documents and queries
+SEARCH_TEXT_CONFIG = os.getenv('SEARCH_TEXT_CONFIG', 'english')
+
+def is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+def _weighted_vector(diagnosis, doctor_advice, summaries, notes):
+    """Postgres tsvector expression ranking diagnosis > advice > summaries > notes"""
+    parts = [(diagnosis, 'A'), (doctor_advice, 'B'), (summaries, 'C'), (notes, 'D')]
+    vector = None
+    for text, weight in parts:
+        part = db.func.setweight(db.func.to_tsvector(SEARCH_TEXT_CONFIG, text or ''), weight)
+        vector = part if vector is None else vector.op('||')(part)
+    return vector
+
+def index_patient(patient_id):
+    """
+    Refresh the search document of one patient.
+
+    Adds the change to the current session without committing, so callers
+    call it right before their own commit and the index moves with the data.
+    Pending notes and summaries are picked up through autoflush.
+
+    Args:
+        patient_id (UUID): The patient whose document should be rebuilt
+    """
+    index_patients([patient_id])
+
+def _texts_by_patient(column, patient_ids):
+    texts = {}
+    rows = db.session.query(column.class_.patient_id, column).filter(column.class_.patient_id.in_(patient_ids))
+    for patient_id, text in rows:
+        if text:
+            texts.setdefault(patient_id, []).append(text)
+    return texts
+
+def index_patients(patient_ids):
+    """
+    Refresh the search documents of many patients in a fixed number of queries.
+
+    Same semantics as index_patient: nothing is committed, and patients that
+    no longer exist lose their document.
+    """
+    patient_ids = list(patient_ids)
+    if not patient_ids:
+        return
+    patients = {patient.id: patient for patient in
+                db.session.query(Patient).filter(Patient.id.in_(patient_ids))}
+    summaries = _texts_by_patient(Summary.summary, patient_ids)
+    notes = _texts_by_patient(Note.content, patient_ids)
+    documents = {document.patient_id: document for document in
+                 db.session.query(PatientSearchDocument).filter(PatientSearchDocument.patient_id.in_(patient_ids))}
+
+    for patient_id in patient_ids:
+        patient = patients.get(patient_id)
+        if not patient:
+            remove_patient_from_index(patient_id)
+            continue
+
+        summaries_text = '\n'.join(summaries.get(patient_id, []))
+        notes_text = '\n'.join(notes.get(patient_id, []))
+
+        document = documents.get(patient_id)
+        if document is None:
+            document = PatientSearchDocument(patient_id=patient_id)
+            documents[patient_id] = document
+            db.session.add(document)
+
+        document.content = '\n'.join(
+            text for text in (patient.diagnosis, patient.doctor_advice, summaries_text, notes_text) if text
+        )
+        if is_postgres():
+            document.search_vector = _weighted_vector(patient.diagnosis, patient.doctor_advice, summaries_text, notes_text)
+
+def remove_patient_from_index(patient_id):
+    """Delete a patient's search document, without committing"""
+    db.session.query(PatientSearchDocument).filter(PatientSearchDocument.patient_id == patient_id) \
+        .delete(synchronize_session=False)
+
+def rebuild_index(batch_size=500):
+    """Index every patient, committing per batch. Used to backfill existing data."""
+    indexed = 0
+    last_id = None
+    while True:
+        query = db.session.query(Patient.id).order_by(Patient.id)
+        if last_id is not None:
+            query = query.filter(Patient.id > last_id)
+        ids = [row.id for row in query.limit(batch_size)]
+        if not ids:
+            return indexed
+        index_patients(ids)
+        db.session.commit()
+        indexed += len(ids)
+        last_id = ids[-1]
@@ -0,0 +1,133 @@
+import html
+import math
+import os
+import re
+from config.db_config import db, read_session
+from model.patient import Patient
+from model.search import PatientSearchDocument
+from service.patient_service import _format_response
+from service.search_index import SEARCH_TEXT_CONFIG, is_postgres
+
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '20'))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv('SEARCH_MAX_PAGE_SIZE', '100'))
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+# ts_headline marks matches with these private-use characters instead of the
+# tags, so the text can be HTML-escaped before the tags are put in
+_HEADLINE_START = '\ue000'
+_HEADLINE_STOP = '\ue001'
+SNIPPET_RADIUS = 80
+
+def _query_terms(query_text):
+    return [term for term in re.findall(r'[^\W_]+', query_text.lower()) if term]
+
+def _local_snippet(content, terms):
+    """Window of text around the first match with every term occurrence highlighted"""
+    lowered = content.lower()
+    positions = [lowered.find(term) for term in terms if lowered.find(term) >= 0]
+    first = min(positions) if positions else 0
+    start = max(0, first - SNIPPET_RADIUS)
+    end = min(len(content), first + SNIPPET_RADIUS)
+    snippet = html.escape(content[start:end])
+    pattern = re.compile('|'.join(re.escape(html.escape(term)) for term in terms), re.IGNORECASE)
+    snippet = pattern.sub(lambda match: HIGHLIGHT_START + match.group(0) + HIGHLIGHT_STOP, snippet)
+    return ('...' if start > 0 else '') + snippet + ('...' if end < len(content) else '')
+
+def _escape_headline(headline):
+    """HTML-escape a ts_headline fragment and turn its match markers into highlight tags"""
+    return html.escape(headline or '').replace(_HEADLINE_START, HIGHLIGHT_START).replace(_HEADLINE_STOP, HIGHLIGHT_STOP)
+
+def _search_postgres(query_text, limit, offset):
+    ts_query = db.func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, query_text)
+    rank = db.func.ts_rank(PatientSearchDocument.search_vector, ts_query)
+    headline = db.func.ts_headline(
+        SEARCH_TEXT_CONFIG, PatientSearchDocument.content, ts_query,
+        f'StartSel={_HEADLINE_START},StopSel={_HEADLINE_STOP},MaxFragments=2,MaxWords=30,MinWords=10'
+    )
+    rows = read_session().query(PatientSearchDocument.patient_id, rank.label('rank'), headline.label('snippet')) \
+        .filter(PatientSearchDocument.search_vector.op('@@')(ts_query)) \
+        .order_by(rank.desc(), PatientSearchDocument.patient_id) \
+        .offset(offset).limit(limit + 1).all()
+    return [(row.patient_id, float(row.rank), _escape_headline(row.snippet)) for row in rows]
+
+def _search_local(query_text, limit, offset):
+    """
+    Fallback for databases without full-text search: every term must appear
+    (case-insensitive LIKE), and ranking is log-scaled term frequency
+    normalized by document length, close to what ts_rank does.
+    """
+    terms = _query_terms(query_text)
+    if not terms:
+        return []
+    query = read_session().query(PatientSearchDocument.patient_id, PatientSearchDocument.content)
+    for term in terms:
+        query = query.filter(PatientSearchDocument.content.ilike(f'%{term}%'))
+
+    scored = []
+    for row in query:
+        lowered = row.content.lower()
+        frequency = sum(lowered.count(term) for term in terms)
+        rank = math.log1p(frequency) / math.log(len(lowered.split()) + 2)
+        scored.append((row.patient_id, rank, row.content))
+    scored.sort(key=lambda item: (-item[1], str(item[0])))
+    return [(patient_id, rank, _local_snippet(content, terms))
+            for patient_id, rank, content in scored[offset:offset + limit + 1]]
+
+def search_patients(query_text, limit=None, offset=0):
+    """
+    Ranked full-text search over diagnoses, doctor advice, notes and summaries
+
+    Args:
+        query_text (str): Free text; on Postgres web search syntax is supported
+        limit (int): Page size, capped at SEARCH_MAX_PAGE_SIZE
+        offset (int): Number of results to skip
+
+    Returns:
+        tuple: Formatted response with ranked hits and highlighted snippets, and status code
+    """
+    if not query_text or not query_text.strip():
+        return _format_response("Search query is required", success=False, status_code=400)
+
+    limit = min(max(int(limit or SEARCH_PAGE_SIZE), 1), SEARCH_MAX_PAGE_SIZE)
+    offset = max(int(offset or 0), 0)
+
+    try:
+        if is_postgres():
+            hits = _search_postgres(query_text, limit, offset)
+        else:
+            hits = _search_local(query_text, limit, offset)
+        has_more = len(hits) > limit
+        hits = hits[:limit]
+
+        patients = {}
+        if hits:
+            rows = read_session().query(
+                Patient.id, Patient.patient_name, Patient.patient_age, Patient.patient_gender, Patient.diagnosis
+            ).filter(Patient.id.in_([patient_id for patient_id, _, _ in hits]))
+            patients = {row.id: row for row in rows}
+
+        results = []
+        for patient_id, rank, snippet in hits:
+            patient = patients.get(patient_id)
+            if patient is None:
+                continue
+            results.append({
+                'id': str(patient.id),
+                'patient_name': patient.patient_name,
+                'patient_age': patient.patient_age,
+                'patient_gender': patient.patient_gender,
+                'diagnosis': patient.diagnosis,
+                'rank': rank,
+                'snippet': snippet
+            })
+
+        return _format_response("Search completed successfully", {
+            'results': results,
+            'limit': limit,
+            'offset': offset,
+            'has_more': has_more
+        })
+    except Exception as e:
+        db.session.rollback()
+        return _format_response(f"Error searching patients: {e}", success=False, status_code=500)
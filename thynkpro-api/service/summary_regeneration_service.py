@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config.db_config import db, release_connection
+from config.ai_config import model
+from config.llm_client import TokenBucket
+from model.patient import Patient
+from service.summary_service import _prepare_summary, _save_summary
+
+logger = logging.getLogger(__name__)
+
+# Model calls in flight at once during a regeneration run
+SUMMARY_REGENERATION_CONCURRENCY = int(os.getenv('SUMMARY_REGENERATION_CONCURRENCY', '4'))
+# Model calls started per second, 0 disables the limit
+SUMMARY_REGENERATION_RATE_PER_SECOND = float(os.getenv('SUMMARY_REGENERATION_RATE_PER_SECOND', '2'))
+# Patients per batch; summaries are committed and the checkpoint written once per batch
+SUMMARY_REGENERATION_BATCH_SIZE = int(os.getenv('SUMMARY_REGENERATION_BATCH_SIZE', '50'))
+# Progress file used to resume an interrupted run
+SUMMARY_REGENERATION_CHECKPOINT = os.getenv('SUMMARY_REGENERATION_CHECKPOINT', 'summary_regeneration.json')
+# Failures listed in the report, the rest are only counted
+SUMMARY_REGENERATION_MAX_REPORTED_ERRORS = int(os.getenv('SUMMARY_REGENERATION_MAX_REPORTED_ERRORS', '100'))
+
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_STOPPED = 'stopped'
+JOB_FAILED = 'failed'
+
+# Background job state lives in this process only. Run the API as a single
+# process (python serve.py, or gunicorn --workers 1) when using
+# /summary/regenerate, otherwise status and stop requests reach whichever
+# worker handles them and a second run can start elsewhere. With several
+# workers use 'flask summaries regenerate' instead.
+_job = None
+_job_lock = threading.Lock()
+_stop_requested = threading.Event()
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def load_checkpoint(path):
+    """The saved progress of an interrupted run, or None"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as checkpoint:
+        return json.load(checkpoint)
+
+
+def _write_checkpoint(path, report):
+    # Written to a temporary file and renamed, so a crash never leaves half a checkpoint
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as checkpoint:
+        json.dump(report, checkpoint, indent=2)
+    os.replace(temporary, path)
+
+
+def _patient_id_batches(after_id, batch_size):
+    """Patient ids in id order, one keyset page per batch, starting after after_id"""
+    while True:
+        query = db.session.query(Patient.id).order_by(Patient.id)
+        if after_id is not None:
+            query = query.filter(Patient.id > after_id)
+        ids = [row.id for row in query.limit(batch_size)]
+        if not ids:
+            return
+        yield ids
+        after_id = ids[-1]
+
+
+def _generate(bucket, prompt):
+    if bucket:
+        bucket.acquire(timeout=float('inf'))
+    return model.generate_content(prompt).text
+
+
+def _record_error(report, patient_id, error):
+    report['failed'] += 1
+    if len(report['errors']) < SUMMARY_REGENERATION_MAX_REPORTED_ERRORS:
+        report['errors'].append({'patient_id': str(patient_id), 'error': str(error)})
+
+
+def _update_rates(report, started, previous_elapsed, run_processed):
+    # Throughput counts only this run; elapsed time also includes the runs before a resume
+    elapsed = time.monotonic() - started
+    report['elapsed_seconds'] = round(previous_elapsed + elapsed, 1)
+    report['patients_per_second'] = round(run_processed / elapsed, 2) if elapsed else 0.0
+
+
+def regenerate_summaries(force=True, concurrency=None, rate_per_second=None, batch_size=None,
+                         checkpoint_path=None, resume=True, progress=None, should_stop=None):
+    """
+    Regenerate the summary of every patient.
+
+    Patients are walked in id order one keyset page (batch_size) at a time.
+    Each batch is loaded with _prepare_summary, sent to the model from a
+    pool of `concurrency` threads paced by a token bucket (with the database
+    connection back in the pool meanwhile), then saved with _save_summary
+    and committed together. After each commit the last patient
+    id is written to the checkpoint file, so an interrupted run resumes with
+    the next batch; the file is removed once the run completes.
+
+    A patient whose model call fails is counted and listed, and the run
+    carries on. A failed commit stops the run without advancing the checkpoint.
+
+    Args:
+        force (bool): Regenerate even when the stored summary is current
+            (needed after a prompt change that is not part of the fingerprint)
+        concurrency (int): Model calls in flight at once
+        rate_per_second (float): Model calls started per second, 0 for no limit
+        batch_size (int): Patients per batch and per commit
+        checkpoint_path (str): Progress file, None to run without one
+        resume (bool): Continue after the checkpoint's last patient if one exists
+        progress (callable): Called with the report after every batch
+        should_stop (callable): Checked between batches; returning True ends
+            the run early, keeping the checkpoint
+
+    Returns:
+        dict: Report with processed, regenerated, unchanged, failed, errors,
+            throughput and status (done or stopped)
+    """
+    concurrency = max(1, concurrency or SUMMARY_REGENERATION_CONCURRENCY)
+    rate_per_second = SUMMARY_REGENERATION_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+    batch_size = batch_size or SUMMARY_REGENERATION_BATCH_SIZE
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    report = {
+        'status': JOB_RUNNING,
+        'force': force,
+        'started_at': checkpoint['started_at'] if checkpoint else _now(),
+        'last_patient_id': None,
+        'processed': 0,
+        'regenerated': 0,
+        'unchanged': 0,
+        'skipped': 0,
+        'failed': 0,
+        'errors': [],
+        'elapsed_seconds': 0.0,
+        'patients_per_second': 0.0,
+        'resumed': checkpoint is not None
+    }
+    if checkpoint:
+        for key in ('last_patient_id', 'processed', 'regenerated', 'unchanged', 'skipped', 'failed', 'errors'):
+            report[key] = checkpoint.get(key, report[key])
+    previous_elapsed = checkpoint.get('elapsed_seconds', 0.0) if checkpoint else 0.0
+    run_processed = 0
+
+    bucket = TokenBucket(rate_per_second, max(int(rate_per_second), 1)) if rate_per_second > 0 else None
+    after_id = uuid.UUID(report['last_patient_id']) if report['last_patient_id'] else None
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='summary-regeneration') as executor:
+        for patient_ids in _patient_id_batches(after_id, batch_size):
+            if should_stop and should_stop():
+                report['status'] = JOB_STOPPED
+                break
+
+            pending = []
+            for patient_id in patient_ids:
+                context, response = _prepare_summary(patient_id, force)
+                if context is not None:
+                    pending.append((patient_id, context))
+                elif response[1] == 200:
+                    report['unchanged'] += 1
+                else:
+                    # Deleted since the batch was listed
+                    report['skipped'] += 1
+            # Nothing is written until the model answers, so hand the
+            # connection back to the pool for the length of the model calls
+            release_connection()
+
+            futures = [(patient_id, context, executor.submit(_generate, bucket, context['prompt']))
+                       for patient_id, context in pending]
+            # Saved only once every call of the batch has returned, so no
+            # connection is checked out while the model is working
+            generated = []
+            for patient_id, context, future in futures:
+                try:
+                    generated.append((patient_id, context, future.result()))
+                except Exception as e:
+                    logger.warning("Summary regeneration failed for patient %s: %s", patient_id, e)
+                    _record_error(report, patient_id, e)
+            for patient_id, context, summary in generated:
+                try:
+                    _save_summary(patient_id, context, summary, commit=False)
+                    report['regenerated'] += 1
+                except Exception as e:
+                    logger.warning("Summary regeneration failed for patient %s: %s", patient_id, e)
+                    _record_error(report, patient_id, e)
+
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            # Committed objects are not needed again, keep the identity map small
+            db.session.expunge_all()
+
+            report['processed'] += len(patient_ids)
+            run_processed += len(patient_ids)
+            report['last_patient_id'] = str(patient_ids[-1])
+            _update_rates(report, started, previous_elapsed, run_processed)
+            if checkpoint_path:
+                _write_checkpoint(checkpoint_path, report)
+            if progress:
+                progress(dict(report))
+
+    _update_rates(report, started, previous_elapsed, run_processed)
+    if report['status'] == JOB_RUNNING:
+        report['status'] = JOB_DONE
+        report['finished_at'] = _now()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    return report
+
+
+def _set_job(**fields):
+    with _job_lock:
+        if _job is not None:
+            _job.update(fields)
+
+
+def _run_job(app, options):
+    try:
+        with app.app_context():
+            report = regenerate_summaries(
+                progress=lambda update: _set_job(**update),
+                should_stop=_stop_requested.is_set,
+                **options
+            )
+        _set_job(**report)
+    except Exception as e:
+        logger.exception("Summary regeneration job failed")
+        _set_job(status=JOB_FAILED, error=str(e), finished_at=_now())
+
+
+def start_regeneration_job(app, options):
+    """
+    Run regenerate_summaries in a background thread.
+
+    Only one run at a time per process (see the note on _job above); it uses
+    the SUMMARY_REGENERATION_CHECKPOINT file, so a job interrupted by a
+    restart resumes where it stopped.
+
+    Returns:
+        tuple: Job state and status code (202, or 409 when a run is active)
+    """
+    global _job
+    with _job_lock:
+        if _job is not None and _job['status'] == JOB_RUNNING:
+            return dict(_job), 409
+        _stop_requested.clear()
+        options = {'checkpoint_path': SUMMARY_REGENERATION_CHECKPOINT, **options}
+        _job = {'status': JOB_RUNNING, 'requested_at': _now(), 'options': options}
+        job = dict(_job)
+
+    threading.Thread(target=_run_job, args=(app, options), name='summary-regeneration-job', daemon=True).start()
+    return job, 202
+
+
+def stop_regeneration_job():
+    """Ask the running job to stop after its current batch"""
+    with _job_lock:
+        if _job is None or _job['status'] != JOB_RUNNING:
+            return {'error': 'No summary regeneration is running'}, 409
+        _stop_requested.set()
+        return dict(_job, stop_requested=True), 202
+
+
+def get_regeneration_job():
+    """State and progress of the current or most recent job"""
+    with _job_lock:
+        if _job is None:
+            return {'error': 'No summary regeneration has been started'}, 404
+        return dict(_job), 200
@@ -1,93 +1,437 @@
-from config.db_config import db
-from model.patient import Patient, Summary
+from config.db_config import db, read_session, release_connection
+from model.patient import Patient, Summary, Note
+from model.serializers import columns, rows_to_dicts, SUMMARY_FIELDS
 from config.ai_config import model
+from service.search_index import index_patient
+from service.resource_versions import touch_patient
+from config.instrumentation import timed_phase
+import hashlib
+import json
 import os
+import re
 from datetime import datetime
+from sqlalchemy import and_, or_
 
-def generate_patient_summary(patient_id):
-    patient = Patient.query.get(patient_id)
-    if not patient:
-        return {'error': 'Patient not found'}, 404
+SUMMARY_PROMPT_HEADER = """
+    Analyze the following patient information and provide a concise medical summary:
     
-    # Prepare patient data for AI summary
-    patient_info = {
+    Patient: {name}, {age} years old, {gender}
+    Diagnosis: {diagnosis}
+    Doctor's Advice: {doctor_advice}
+    
+    Medications:
+    """
+SUMMARY_PROMPT_MEDICINE = "- {medicine_name}: {dosage}, {frequency}\n"
+SUMMARY_PROMPT_FOOTER = "\nProvide a brief summary of the patient's condition, treatment plan, and key observations in a professional medical tone."
+
+# Incremental mode: the previous summary plus only the notes written since it
+SUMMARY_PROMPT_UPDATE_HEADER = """
+    Update the existing medical summary of this patient with the information below.
+
+    Existing summary:
+    {previous_summary}
+    """
+SUMMARY_PROMPT_NOTES_HEADER = "\nClinical notes (oldest first):\n"
+SUMMARY_PROMPT_NOTE = "- [{date}] {content}\n"
+SUMMARY_PROMPT_MORE_MEDICINES = "- ... and {count} more\n"
+SUMMARY_PROMPT_UPDATE_FOOTER = "\nRewrite the summary so it reflects the current patient information and any new notes, keeping earlier findings that still apply. Provide only the updated summary, brief and in a professional medical tone."
+
+# Fold notes into summaries incrementally instead of ignoring them
+SUMMARY_INCREMENTAL = os.getenv('SUMMARY_INCREMENTAL', 'True').lower() == 'true'
+# Estimated input tokens per summary prompt; notes beyond it are left for the next update
+SUMMARY_TOKEN_BUDGET = int(os.getenv('SUMMARY_TOKEN_BUDGET', '4000'))
+# Notes folded in per update at most
+SUMMARY_MAX_NOTES_PER_UPDATE = int(os.getenv('SUMMARY_MAX_NOTES_PER_UPDATE', '50'))
+
+# Rough size of a token in English text, used instead of a count_tokens round trip
+CHARS_PER_TOKEN = 4
+TRUNCATED_MARKER = ' [truncated]'
+CONTINUED_MARKER = ' [continues]'
+
+def _build_patient_info(patient):
+    """Collect the patient fields that feed the summary prompt"""
+    return {
         'name': patient.patient_name,
         'age': patient.patient_age,
         'gender': patient.patient_gender,
         'diagnosis': patient.diagnosis,
         'doctor_advice': patient.doctor_advice,
-        'medicines': [
-            {
-                'medicine_name': med.medicine_name,
-                'dosage': med.dosage,
-                'frequency': med.frequency
-            } for med in patient.medicines
-        ]
+        'medicines': sorted(
+            (
+                {
+                    'medicine_name': med.medicine_name,
+                    'dosage': med.dosage,
+                    'frequency': med.frequency
+                } for med in patient.medicines
+            ),
+            key=lambda med: (med['medicine_name'] or '', med['dosage'] or '', med['frequency'] or '')
+        )
     }
-    
-    # Create prompt for Gemini
-    prompt = f"""
-    Analyze the following patient information and provide a concise medical summary:
-    
-    Patient: {patient_info['name']}, {patient_info['age']} years old, {patient_info['gender']}
-    Diagnosis: {patient_info['diagnosis']}
-    Doctor's Advice: {patient_info['doctor_advice']}
-    
-    Medications:
+
+def _build_summary_prompt(patient_info):
+    prompt = SUMMARY_PROMPT_HEADER.format(**patient_info)
+    for med in patient_info['medicines']:
+        prompt += SUMMARY_PROMPT_MEDICINE.format(**med)
+    prompt += SUMMARY_PROMPT_FOOTER
+    return prompt
+
+def estimate_tokens(text):
+    """Approximate token count of a prompt, for budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _truncate(text, max_tokens):
+    limit = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + TRUNCATED_MARKER
+
+def _normalize(text):
+    return ' '.join(text.split())
+
+def _cut_note(text, room):
+    """
+    Whitespace-normalized text cut to at most room characters at a word
+    boundary, or inside the first word when even that does not fit
+
+    Returns:
+        tuple: (normalized part, index in text where the cut falls)
+    """
+    words, length = [], 0
+    for match in re.finditer(r'\S+', text):
+        needed = len(match.group()) + (1 if words else 0)
+        if length + needed > room:
+            if not words:
+                return match.group()[:room], match.start() + room
+            return ' '.join(words), match.start()
+        words.append(match.group())
+        length += needed
+    return ' '.join(words), len(text)
+
+def _note_line(note, content):
+    date = note.created_at.strftime('%Y-%m-%d') if note.created_at else 'undated'
+    return SUMMARY_PROMPT_NOTE.format(date=date, content=content)
+
+def _select_notes(notes, budget, offset=0):
+    """
+    Lines for the oldest notes that fit whole in budget tokens.
+
+    Selection stops at the first note that does not fit, so nothing before
+    the new watermark is left out. Only a first note larger than the whole
+    budget is split: as much as fits is sent, ending with CONTINUED_MARKER,
+    and the rest follows in the next update.
+
+    Args:
+        offset (int): Characters of the first note's raw content already
+            folded in; the stored offset indexes the text as saved, so it
+            does not depend on how whitespace is normalized for the prompt
+
+    Returns:
+        tuple: (lines, number of notes sent whole, characters of the next
+            note sent so far or None when no note was split)
+    """
+    lines = []
+    for index, note in enumerate(notes):
+        raw = (note.content or '')[offset if index == 0 else 0:]
+        content = _normalize(raw)
+        line = _note_line(note, content)
+        cost = estimate_tokens(line)
+        if cost <= budget:
+            lines.append(line)
+            budget -= cost
+            continue
+        if lines:
+            break
+        room = (budget - estimate_tokens(_note_line(note, CONTINUED_MARKER))) * CHARS_PER_TOKEN
+        if room > 0:
+            part, cut = _cut_note(raw, room)
+            lines.append(_note_line(note, part + CONTINUED_MARKER))
+            return lines, 0, offset + cut
+        break
+    return lines, len(lines), None
+
+def _compact_patient_info(patient_info, max_tokens):
+    """
+    Diagnosis, advice and medication lines cut to a third of max_tokens each,
+    so a long patient record cannot crowd the notes out of the prompt
+
+    Returns:
+        tuple: (patient_info with shortened text fields, medication lines)
+    """
+    share = max_tokens // 3
+    compact = dict(patient_info)
+    for field in ('diagnosis', 'doctor_advice'):
+        if isinstance(compact[field], str):
+            compact[field] = _truncate(compact[field], share)
+
+    lines = []
+    medicines = patient_info['medicines']
+    for index, med in enumerate(medicines):
+        line = SUMMARY_PROMPT_MEDICINE.format(**med)
+        if estimate_tokens(line) > share:
+            lines.append(SUMMARY_PROMPT_MORE_MEDICINES.format(count=len(medicines) - index))
+            break
+        lines.append(line)
+        share -= estimate_tokens(line)
+    return compact, ''.join(lines)
+
+def _build_incremental_prompt(patient_info, previous_summary, notes, offset=0):
+    """
+    Prompt that folds notes into the previous summary within SUMMARY_TOKEN_BUDGET.
+
+    The previous summary and the patient record may each use up to a
+    quarter of the budget and are cut beyond that; notes fill what is left,
+    oldest first, see _select_notes.
+
+    Returns:
+        tuple: (prompt, notes sent whole, offset into the next note or None)
+    """
+    if previous_summary:
+        header = SUMMARY_PROMPT_UPDATE_HEADER.format(
+            previous_summary=_truncate(previous_summary, SUMMARY_TOKEN_BUDGET // 4))
+        footer = SUMMARY_PROMPT_UPDATE_FOOTER
+    else:
+        header, footer = '', SUMMARY_PROMPT_FOOTER
+    compact, medicines = _compact_patient_info(patient_info, SUMMARY_TOKEN_BUDGET // 4)
+    prompt = header + SUMMARY_PROMPT_HEADER.format(**compact) + medicines
+
+    budget = SUMMARY_TOKEN_BUDGET - estimate_tokens(prompt + SUMMARY_PROMPT_NOTES_HEADER + footer)
+    lines, included, partial = _select_notes(notes, budget, offset)
+    if lines:
+        prompt += SUMMARY_PROMPT_NOTES_HEADER + ''.join(lines)
+    return prompt + footer, included, partial
+
+def _notes_after(patient_id, watermark, watermark_id=None):
+    """Notes after the (created_at, id) watermark; watermarks stored without an id compare by created_at only"""
+    query = Note.query.filter(Note.patient_id == patient_id)
+    if watermark is None:
+        return query
+    if watermark_id is None:
+        return query.filter(Note.created_at > watermark)
+    return query.filter(or_(Note.created_at > watermark,
+                            and_(Note.created_at == watermark, Note.id > watermark_id)))
+
+def summary_fingerprint(patient_info, incremental=False):
+    """
+    Hash the summary inputs together with the prompt wording and mode, so a
+    stored summary is reused only while all of them are unchanged. Incremental
+    summaries also depend on the update, note and marker templates.
+    """
+    prompt = [SUMMARY_PROMPT_HEADER, SUMMARY_PROMPT_MEDICINE, SUMMARY_PROMPT_FOOTER]
+    if incremental:
+        prompt += [SUMMARY_PROMPT_UPDATE_HEADER, SUMMARY_PROMPT_NOTES_HEADER, SUMMARY_PROMPT_NOTE,
+                   SUMMARY_PROMPT_MORE_MEDICINES, SUMMARY_PROMPT_UPDATE_FOOTER,
+                   TRUNCATED_MARKER, CONTINUED_MARKER]
+    payload = json.dumps({
+        'inputs': patient_info,
+        'incremental': incremental,
+        'prompt': prompt
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _prepare_summary(patient_id, force, incremental=None):
+    """
+    Load the patient and decide whether the model needs to be called.
+
+    In incremental mode (SUMMARY_INCREMENTAL) the prompt holds the previous
+    summary plus only the notes after its (notes_through, notes_through_id)
+    watermark, so its size does not grow with the patient's history. force
+    rebuilds from the patient record, folding notes in again from the first
+    one. A summary built in the other mode is never reported unchanged.
+
+    Returns:
+        tuple: (context, response) where response is set when no model call
+            is needed (patient missing or stored summary still current)
     """
+    incremental = SUMMARY_INCREMENTAL if incremental is None else incremental
+    patient = Patient.query.get(patient_id)
+    if not patient:
+        return None, ({'error': 'Patient not found'}, 404)
     
-    for med in patient_info['medicines']:
-        prompt += f"- {med['medicine_name']}: {med['dosage']}, {med['frequency']}\n"
+    # Prepare patient data for AI summary
+    patient_info = _build_patient_info(patient)
+    fingerprint = summary_fingerprint(patient_info, incremental)
     
-    prompt += "\nProvide a brief summary of the patient's condition, treatment plan, and key observations in a professional medical tone."
+    # Check if a summary already exists for this patient
+    existing_summary = Summary.query.filter_by(patient_id=patient_id).first()
+    current = existing_summary and not force and existing_summary.summary
+
+    notes = []
+    if current:
+        watermark = (existing_summary.notes_through, existing_summary.notes_through_id)
+        offset = existing_summary.notes_partial_offset or 0
+    else:
+        watermark, offset = (None, None), 0
+    if incremental:
+        notes = _notes_after(patient_id, *watermark).order_by(Note.created_at, Note.id) \
+            .limit(SUMMARY_MAX_NOTES_PER_UPDATE).all()
     
-    try:
-        # Generate summary with Gemini using the centralized configuration
-        response = model.generate_content(prompt)
-        ai_summary = response.text
+    if current and existing_summary.input_fingerprint == fingerprint and not notes:
+        return None, ({
+            'summary': existing_summary.summary,
+            'summary_id': str(existing_summary.id),
+            'updated': False,
+            'unchanged': True
+        }, 200)
+
+    if not incremental:
+        # Notes are not part of this summary, a later incremental update folds them all in
+        return {
+            'prompt': _build_summary_prompt(patient_info),
+            'fingerprint': fingerprint,
+            'existing_summary': existing_summary,
+            'notes_through': (None, None, None)
+        }, None
+
+    prompt, included, partial = _build_incremental_prompt(
+        patient_info, existing_summary.summary if current else None, notes, offset)
+    if partial is not None:
+        # Part of the next note was sent, the watermark stays in front of it
+        notes_through = (*watermark, partial)
+    elif included:
+        notes_through = (notes[included - 1].created_at, notes[included - 1].id, None)
+    else:
+        notes_through = (*watermark, offset or None)
+    return {
+        'prompt': prompt,
+        'fingerprint': fingerprint,
+        'existing_summary': existing_summary,
+        'notes_through': notes_through,
+        'notes_included': included + (partial is not None),
+        'pending_notes': _notes_after(patient_id, *notes_through[:2]).count() if notes else 0
+    }, None
+
+def _note_progress(context):
+    if 'notes_included' not in context:
+        return {}
+    return {'notes_included': context['notes_included'], 'pending_notes': context['pending_notes']}
+
+def _save_summary(patient_id, context, ai_summary, commit=True):
+    """Store a generated summary; commit=False leaves the commit to a batching caller"""
+    existing_summary = context['existing_summary']
+    if existing_summary:
+        # Update existing summary
+        existing_summary.summary = ai_summary
+        existing_summary.input_fingerprint = context['fingerprint']
+        existing_summary.notes_through, existing_summary.notes_through_id, \
+            existing_summary.notes_partial_offset = context['notes_through']
+        existing_summary.updated_at = datetime.utcnow()
+        touch_patient(patient_id)
+        index_patient(patient_id)
+        if commit:
+            db.session.commit()
         
-        # Check if a summary already exists for this patient
-        existing_summary = Summary.query.filter_by(patient_id=patient_id).first()
+        return {
+            'summary': ai_summary,
+            'summary_id': str(existing_summary.id),
+            'updated': True,
+            **_note_progress(context)
+        }, 200
+    else:
+        # Create new summary
+        new_summary = Summary(
+            summary=ai_summary,
+            patient_id=patient_id,
+            input_fingerprint=context['fingerprint'],
+            notes_through=context['notes_through'][0],
+            notes_through_id=context['notes_through'][1],
+            notes_partial_offset=context['notes_through'][2]
+        )
         
-        if existing_summary:
-            # Update existing summary
-            existing_summary.summary = ai_summary
-            existing_summary.updated_at = datetime.utcnow()
-            db.session.commit()
-            
-            return {
-                'summary': ai_summary,
-                'summary_id': str(existing_summary.id),
-                'updated': True
-            }, 200
-        else:
-            # Create new summary
-            new_summary = Summary(
-                summary=ai_summary,
-                patient_id=patient_id
-            )
-            
-            db.session.add(new_summary)
+        db.session.add(new_summary)
+        touch_patient(patient_id)
+        index_patient(patient_id)
+        if commit:
             db.session.commit()
-            
-            return {
-                'summary': ai_summary,
-                'summary_id': str(new_summary.id),
-                'created': True
-            }, 201
+        
+        return {
+            'summary': ai_summary,
+            'summary_id': str(new_summary.id),
+            'created': True,
+            **_note_progress(context)
+        }, 201
+
+def generate_patient_summary(patient_id, force=False, incremental=None):
+    """
+    Generates (or refreshes) the AI summary for a patient.
+
+    When the stored summary was built from the same inputs, and no notes
+    were added since, it is returned without calling the model, unless
+    force is set. incremental overrides SUMMARY_INCREMENTAL; notes that did
+    not fit the token budget are reported as pending_notes and folded in by
+    the next call.
+    """
+    context, response = _prepare_summary(patient_id, force, incremental)
+    if response:
+        return response
+    
+    # Do not hold a pooled connection while waiting on the model
+    release_connection()
+    try:
+        # Generate summary with Gemini using the centralized configuration
+        response = model.generate_content(context['prompt'])
+        return _save_summary(patient_id, context, response.text)
         
     except Exception as e:
         db.session.rollback()
         return {'error': str(e)}, 500
 
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_patient_summary(patient_id, force=False, incremental=None):
+    """
+    Streaming variant of generate_patient_summary.
+
+    Returns a generator of Server-Sent Events: one "token" event per model
+    chunk, then "done" with the saved summary id, or "error". The summary is
+    written only after the model stream completes; if the client disconnects
+    first nothing is saved. A current stored summary is sent as a single
+    token without calling the model.
+
+    Returns:
+        tuple: (event generator, 200), or an error body and status code
+    """
+    context, response = _prepare_summary(patient_id, force, incremental)
+    if response and response[1] != 200:
+        return response
+    release_connection()
+
+    def events():
+        if response:
+            stored, _ = response
+            yield _sse_event('token', {'text': stored['summary']})
+            yield _sse_event('done', {k: v for k, v in stored.items() if k != 'summary'})
+            return
+
+        chunks = []
+        try:
+            for chunk in model.generate_content(context['prompt'], stream=True):
+                text = chunk.text
+                if text:
+                    chunks.append(text)
+                    yield _sse_event('token', {'text': text})
+            result, status_code = _save_summary(patient_id, context, ''.join(chunks))
+            yield _sse_event('done', {k: v for k, v in result.items() if k != 'summary'})
+        except GeneratorExit:
+            # Client went away mid-stream: drop the partial text
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            yield _sse_event('error', {'error': str(e)})
+
+    return events(), 200
+
 def get_patient_summaries(patient_id):
     """
     Gets all summaries for a specific patient
     """
-    summaries = Summary.query.filter_by(patient_id=patient_id).all()
-    return {
-        'summaries': [summary.to_dict() for summary in summaries]
-    }, 200
+    rows = read_session().query(*columns(Summary, SUMMARY_FIELDS)).filter_by(patient_id=patient_id) \
+        .order_by(Summary.created_at).all()
+    with timed_phase('serialize'):
+        return {
+            'summaries': rows_to_dicts(rows, SUMMARY_FIELDS)
+        }, 200
 
 def delete_summary(summary_id):
     """
@@ -98,6 +442,8 @@ def delete_summary(summary_id):
         return {'error': 'Summary not found'}, 404
     
     db.session.delete(summary)
+    touch_patient(summary.patient_id)
+    index_patient(summary.patient_id)
     db.session.commit()
     
     return {'message': 'Summary deleted successfully'}, 200
@@ -0,0 +1,65 @@
+"""
+Shared fixtures: the app built by create_app on a throwaway SQLite database,
+with the deterministic stub model instead of Gemini.
+
+The environment is set before anything from the app is imported, since
+the config modules read it at import time.
+"""
+import io
+import os
+import tempfile
+import time
+
+_database_dir = tempfile.mkdtemp(prefix='thynkpro-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_database_dir, 'import.db')}"
+os.environ['AI_BACKEND'] = 'stub'
+os.environ['SCHEMA_CHECK_ON_STARTUP'] = 'false'
+os.environ['LLM_STUB_LATENCY_MS'] = '0'
+
+import pytest
+from PIL import Image
+from app import create_app
+from config.db_config import db
+from service.extraction_cache import extraction_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}"
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    extraction_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def png_bytes():
+    def make(color='white'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), color).save(buffer, format='PNG')
+        return buffer.getvalue()
+    return make
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Poll an extraction job until it is done or failed"""
+    def wait(response):
+        job_id = response.get_json()['Data']['job_id']
+        for _ in range(100):
+            job = client.get(f'/patient/extract_jobs/{job_id}').get_json()['Data']
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"Job {job_id} did not finish")
+    return wait
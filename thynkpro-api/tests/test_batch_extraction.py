@@ -0,0 +1,97 @@
+import io
+import zipfile
+import pytest
+from model.patient import Patient
+from service import batch_extraction_service
+
+
+def _zip(members):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in members.items():
+            zip_file.writestr(name, data)
+    return archive.getvalue()
+
+
+def test_uploads_and_archive_members_are_extracted_together(client, png_bytes):
+    archive = _zip({'scans/a.png': png_bytes('red'), 'scans/readme.txt': b'skipped', '.hidden.png': b'skipped'})
+
+    response = client.post('/patient/extract_batch?concurrency=2', data={
+        'images': [(io.BytesIO(png_bytes('blue')), 'b.png', 'image/png')],
+        'archive': (io.BytesIO(archive), 'scans.zip')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    data = response.get_json()['Data']
+    assert (data['total'], data['succeeded']) == (2, 2)
+    assert [item['filename'] for item in data['items']] == ['b.png', 'scans/a.png']
+
+
+def test_invalid_archive_is_a_bad_request(client):
+    response = client.post('/patient/extract_batch', data={'archive': (io.BytesIO(b'not a zip'), 'scans.zip')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 400
+
+
+def test_archive_member_over_the_size_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(batch_extraction_service, 'EXTRACTION_BATCH_MAX_MEMBER_MB', 1)
+    archive = _zip({'page.png': b'\0' * (2 * 1024 * 1024)})
+
+    response = client.post('/patient/extract_batch', data={'archive': (io.BytesIO(archive), 'scans.zip')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert Patient.query.count() == 0
+
+
+def test_archive_over_the_total_size_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(batch_extraction_service, 'EXTRACTION_BATCH_MAX_ARCHIVE_MB', 1)
+    archive = _zip({f'page{index}.png': b'\0' * (600 * 1024) for index in range(2)})
+
+    response = client.post('/patient/extract_batch', data={'archive': (io.BytesIO(archive), 'scans.zip')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 413
+
+
+def test_item_that_fails_to_save_does_not_roll_back_the_rest(app, monkeypatch):
+    outcomes = iter([
+        ({'patient_name': 'Saved Patient', 'medicines': []}, None),
+        ({'patient_name': 'Broken Patient', 'patient_age': 'not a number', 'medicines': []}, None)
+    ])
+    monkeypatch.setattr(batch_extraction_service, '_extract_item', lambda item, *args: next(outcomes))
+
+    body, status_code = batch_extraction_service.extract_batch(
+        [('a.png', 'image/png', b'a'), ('b.png', 'image/png', b'b')], {}, concurrency=1)
+
+    assert status_code == 200
+    assert [item['success'] for item in body['Data']['items']] == [True, False]
+    assert [patient.patient_name for patient in Patient.query.all()] == ['Saved Patient']
+
+
+def test_item_count_is_checked_before_any_image_is_read(client, png_bytes, monkeypatch):
+    monkeypatch.setattr(batch_extraction_service, 'EXTRACTION_BATCH_MAX_ITEMS', 2)
+    monkeypatch.setattr(zipfile.ZipFile, 'read', lambda *args: pytest.fail('archive member was read'))
+    archive = _zip({'a.png': png_bytes('red'), 'b.png': png_bytes('green')})
+
+    response = client.post('/patient/extract_batch', data={
+        'images': [(io.BytesIO(png_bytes('blue')), 'c.png', 'image/png')],
+        'archive': (io.BytesIO(archive), 'scans.zip')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert 'Too many images' in response.get_json()['Message']
+
+
+def test_upload_over_the_size_limit_is_refused(client, png_bytes, monkeypatch):
+    monkeypatch.setattr(batch_extraction_service, 'EXTRACTION_BATCH_MAX_MEMBER_MB', 1)
+
+    response = client.post('/patient/extract_batch', data={
+        'images': [(io.BytesIO(png_bytes()), 'small.png', 'image/png'),
+                   (io.BytesIO(b'\0' * (2 * 1024 * 1024)), 'large.png', 'image/png')]
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert 'large.png' in response.get_json()['Message']
+    assert Patient.query.count() == 0
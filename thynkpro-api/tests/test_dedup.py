@@ -0,0 +1,161 @@
+from datetime import datetime
+from sqlalchemy import inspect
+from config.db_config import db
+from model.dedup import PatientDuplicateCandidate
+from model.patient import Patient, Note
+from service import patient_dedup_service
+from service.patient_dedup_service import find_duplicate, match_score, save_extracted_patient
+from service.patient_service import delete_patient
+
+RECORD = {
+    'patient_name': 'Ravi Kumar',
+    'patient_age': 40,
+    'patient_gender': 'Male',
+    'hospital_name': 'City Hospital',
+    'diagnosis': 'Influenza',
+    'doctor_advice': 'Rest and fluids',
+    'medicines': [{'medicine_name': 'Paracetamol', 'dosage': '500 mg', 'frequency': 'Twice a day'}]
+}
+
+
+def _save(data):
+    patient, match = save_extracted_patient(dict(data))
+    db.session.commit()
+    return patient, match
+
+
+def test_unknown_fields_add_nothing_to_the_score():
+    existing = Patient(patient_name='Ravi Kumar', patient_age=40, patient_gender='Male', hospital_name='City Hospital')
+
+    score, corroborated = match_score({'patient_name': 'Ravi Kumar'}, existing)
+
+    assert score == 0.7
+    assert not corroborated
+
+
+def test_matching_age_and_hospital_corroborate():
+    existing = Patient(patient_name='Ravi Kumar', patient_age=40, patient_gender='Male', hospital_name='City Hospital')
+
+    score, corroborated = match_score(RECORD, existing)
+
+    assert score == 1.0
+    assert corroborated
+
+
+def test_age_without_hospital_does_not_corroborate():
+    existing = Patient(patient_name='Ravi Kumar', patient_age=40, patient_gender='Male')
+
+    score, corroborated = match_score(RECORD, existing)
+
+    assert score == 0.9
+    assert not corroborated
+
+
+def test_different_known_hospital_does_not_corroborate():
+    existing = Patient(patient_name='Ravi Kumar', patient_age=45, patient_gender='Male', hospital_name='Apollo Chennai')
+
+    score, corroborated = match_score(
+        {'patient_name': 'Ravi Kumar', 'patient_age': 46, 'patient_gender': 'Male', 'hospital_name': 'AIIMS Delhi'},
+        existing)
+
+    assert score == 0.85
+    assert not corroborated
+
+
+def test_conflicting_gender_or_distant_age_rule_a_candidate_out():
+    existing = Patient(patient_name='Ravi Kumar', patient_age=40, patient_gender='Male')
+
+    assert match_score(dict(RECORD, patient_gender='Female'), existing) == (0.0, False)
+    assert match_score(dict(RECORD, patient_age=55), existing) == (0.0, False)
+
+
+def test_name_only_match_is_recorded_as_a_possible_duplicate(app):
+    original, _ = _save(RECORD)
+
+    patient, match = _save({'patient_name': 'Ravi Kumar', 'medicines': []})
+
+    assert patient.id != original.id
+    assert match['status'] == 'possible_duplicate'
+    assert match['patient_id'] == original.id
+    assert Patient.query.count() == 2
+    link = PatientDuplicateCandidate.query.one()
+    assert (link.patient_id, link.candidate_id) == (patient.id, original.id)
+
+
+def test_same_name_and_age_at_another_hospital_is_only_flagged(app):
+    original, _ = _save(dict(RECORD, patient_age=45, hospital_name='Apollo Chennai', medicines=[]))
+
+    patient, match = _save(dict(RECORD, patient_age=46, hospital_name='AIIMS Delhi', medicines=[
+        {'medicine_name': 'Ibuprofen', 'dosage': '400 mg', 'frequency': 'As needed'}
+    ]))
+
+    assert patient.id != original.id
+    assert match['status'] == 'possible_duplicate'
+    assert match['patient_id'] == original.id
+    db.session.refresh(original)
+    assert original.medicines == []
+    assert [medicine.medicine_name for medicine in patient.medicines] == ['Ibuprofen']
+
+
+def test_corroborated_match_is_merged_without_overwriting_clinical_text(app):
+    original, _ = _save(RECORD)
+
+    patient, match = _save(dict(RECORD, patient_age=41, diagnosis='Bronchitis', medicines=[
+        {'medicine_name': 'Paracetamol', 'dosage': '500 mg', 'frequency': 'Twice a day'},
+        {'medicine_name': 'Azithromycin', 'dosage': '250 mg', 'frequency': 'Once a day'}
+    ]))
+
+    assert patient.id == original.id
+    assert match['status'] == 'merged'
+    assert match['medicines_added'] == 1
+    assert match['note_added']
+    db.session.refresh(original)
+    assert original.diagnosis == 'Influenza'
+    assert original.doctor_advice == 'Rest and fluids'
+    assert 'Diagnosis: Bronchitis' in original.notes[0].content
+    assert Patient.query.count() == 1
+
+
+def test_merge_fills_empty_fields(app):
+    original, _ = _save(dict(RECORD, doctor_name=None))
+
+    _save(dict(RECORD, doctor_name='Dr. Rao'))
+
+    db.session.refresh(original)
+    assert original.doctor_name == 'Dr. Rao'
+    assert original.notes == []
+
+
+def test_deleting_a_patient_removes_its_duplicate_links(app):
+    original, _ = _save(RECORD)
+    _save({'patient_name': 'Ravi Kumar', 'medicines': []})
+
+    _, status_code = delete_patient(str(original.id))
+
+    assert status_code == 200
+    assert PatientDuplicateCandidate.query.count() == 0
+
+
+def test_candidates_beyond_the_cap_are_the_least_recently_updated(app, monkeypatch):
+    older, _ = save_extracted_patient(dict(RECORD), dedup=False)
+    newer, _ = save_extracted_patient(dict(RECORD), dedup=False)
+    older.updated_at = datetime(2020, 1, 1)
+    db.session.commit()
+    monkeypatch.setattr(patient_dedup_service, 'PATIENT_DEDUP_MAX_CANDIDATES', 1)
+
+    candidate, _, _ = find_duplicate(dict(RECORD))
+
+    assert candidate.id == newer.id
+
+
+def test_merge_note_does_not_load_the_note_history(app):
+    original, _ = _save(RECORD)
+    db.session.add(Note(patient_id=original.id, content='Earlier visit'))
+    db.session.commit()
+
+    patient, match = save_extracted_patient(dict(RECORD, diagnosis='Bronchitis'))
+
+    assert match['note_added']
+    assert 'notes' not in inspect(patient).dict
+    db.session.commit()
+    assert Note.query.filter_by(patient_id=original.id).count() == 2
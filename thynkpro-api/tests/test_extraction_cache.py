@@ -0,0 +1,69 @@
+import io
+from config.ai_config import model
+from model.patient import Patient
+from service.extraction_cache import ExtractionCache, make_cache_key
+
+
+def _upload(client, data, query=''):
+    return client.post(f'/patient/extract_text{query}', data={'image': (io.BytesIO(data), 'chart.png', 'image/png')},
+                       content_type='multipart/form-data')
+
+
+def test_extract_saves_patient(client, png_bytes):
+    response = _upload(client, png_bytes())
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['Message'] == "Patient Data Extracted and Saved Successfully"
+    assert body['Data']['patient_name'] == 'Test Patient'
+    assert Patient.query.count() == 1
+
+
+def test_identical_upload_is_served_from_the_cache(client, png_bytes):
+    image = png_bytes()
+    first = _upload(client, image).get_json()
+    calls = model.stats()['calls']
+
+    second = _upload(client, image).get_json()
+
+    assert second['Message'] == "Patient Data Already Extracted"
+    assert second['Data']['id'] == first['Data']['id']
+    assert model.stats()['calls'] == calls
+    assert Patient.query.count() == 1
+
+
+def test_refresh_bypasses_the_cache(client, png_bytes):
+    image = png_bytes()
+    _upload(client, image)
+    calls = model.stats()['calls']
+
+    _upload(client, image, query='?refresh=true')
+
+    assert model.stats()['calls'] == calls + 1
+
+
+def test_cache_key_covers_image_prompt_and_schema():
+    key = make_cache_key(b'image', 'prompt', {'type': 'object'})
+
+    assert key == make_cache_key(b'image', 'prompt', {'type': 'object'})
+    assert key != make_cache_key(b'other', 'prompt', {'type': 'object'})
+    assert key != make_cache_key(b'image', 'other', {'type': 'object'})
+    assert key != make_cache_key(b'image', 'prompt', {'type': 'array'})
+
+
+def test_cache_evicts_least_recently_used_and_copies_values():
+    cache = ExtractionCache(max_size=2, ttl=60)
+    cache.set('a', {'name': 'A'})
+    cache.set('b', {'name': 'B'})
+    cache.get('a')['data']['name'] = 'changed'
+    cache.set('c', {'name': 'C'})
+
+    assert cache.get('a')['data'] == {'name': 'A'}
+    assert cache.get('b') is None
+
+
+def test_expired_entries_are_dropped():
+    cache = ExtractionCache(max_size=2, ttl=-1)
+    cache.set('a', {'name': 'A'})
+
+    assert cache.get('a') is None
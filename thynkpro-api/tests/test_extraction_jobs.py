@@ -0,0 +1,76 @@
+import io
+import os
+import time
+from PIL import Image
+from model.patient import Patient
+from service import extraction_job_service
+
+
+def _submit(client, data, filename='chart.png', content_type='image/png'):
+    return client.post('/patient/extract_text?mode=async',
+                       data={'image': (io.BytesIO(data), filename, content_type)},
+                       content_type='multipart/form-data')
+
+
+def test_async_upload_returns_a_job_that_saves_the_patient(client, png_bytes, wait_for_job):
+    response = _submit(client, png_bytes())
+
+    assert response.status_code == 202
+    job = wait_for_job(response)
+    assert job['status'] == 'done'
+    assert job['result']['patient_name'] == 'Test Patient'
+    assert Patient.query.count() == 1
+
+
+def test_unknown_job_is_not_found(client):
+    assert client.get('/patient/extract_jobs/missing').status_code == 404
+
+
+def test_full_queue_is_refused(client, png_bytes, monkeypatch):
+    class Exhausted:
+        def acquire(self, blocking=True):
+            return False
+
+    monkeypatch.setattr(extraction_job_service, '_capacity', Exhausted())
+
+    assert _submit(client, png_bytes()).status_code == 503
+
+
+def test_async_document_is_split_into_pages(client, wait_for_job):
+    buffer = io.BytesIO()
+    frames = [Image.new('RGB', (32, 32), color) for color in ('red', 'green', 'blue')]
+    frames[0].save(buffer, format='TIFF', save_all=True, append_images=frames[1:])
+
+    response = _submit(client, buffer.getvalue(), 'scan.tiff', 'image/tiff')
+
+    assert response.status_code == 202
+    job = wait_for_job(response)
+    assert job['status'] == 'done'
+    assert job['result']['pages']['total'] == 3
+
+
+def test_queued_upload_is_spooled_to_disk_and_removed(client, png_bytes, wait_for_job, tmp_path, monkeypatch):
+    spool_dir = tmp_path / 'spool'
+    spool_dir.mkdir()
+    monkeypatch.setattr(extraction_job_service, 'EXTRACTION_SPOOL_DIR', str(spool_dir))
+    spooled = []
+    run_job = extraction_job_service._run_job
+
+    def recording_run_job(app, job_id, spool_path, *args):
+        spooled.append((spool_path, os.path.getsize(spool_path)))
+        return run_job(app, job_id, spool_path, *args)
+
+    monkeypatch.setattr(extraction_job_service, '_run_job', recording_run_job)
+    data = png_bytes('green')
+
+    job = wait_for_job(_submit(client, data))
+
+    assert job['status'] == 'done'
+    [(spool_path, size)] = spooled
+    assert os.path.dirname(spool_path) == str(spool_dir)
+    assert size == len(data)
+    # The job is marked done just before its finally block removes the file
+    deadline = time.monotonic() + 5
+    while os.listdir(spool_dir) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.listdir(spool_dir) == []
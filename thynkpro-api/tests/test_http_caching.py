@@ -0,0 +1,90 @@
+from datetime import datetime
+import pytest
+from config.db_config import db
+from model.patient import Patient, Note
+
+
+@pytest.fixture
+def patient(app):
+    patient = Patient(patient_name='Asha Rao', patient_age=52)
+    patient.notes.append(Note(content='First visit'))
+    db.session.add(patient)
+    db.session.commit()
+    return patient
+
+
+def _set_updated_at(patient, value):
+    patient.updated_at = value
+    db.session.commit()
+
+
+def test_etag_match_returns_not_modified(client, patient):
+    first = client.get(f'/patient/{patient.id}')
+
+    second = client.get(f'/patient/{patient.id}', headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+
+
+def test_if_modified_since_after_the_last_change_returns_not_modified(client, patient):
+    _set_updated_at(patient, datetime(2020, 1, 1, 12, 0, 0, 500000))
+
+    response = client.get(f'/patient/{patient.id}', headers={'If-Modified-Since': 'Wed, 01 Jan 2020 12:00:01 GMT'})
+
+    assert response.status_code == 304
+
+
+def test_edit_in_the_same_second_as_if_modified_since_is_not_hidden(client, patient):
+    _set_updated_at(patient, datetime(2020, 1, 1, 12, 0, 0, 100000))
+    first = client.get(f'/patient/{patient.id}')
+    assert first.headers['Last-Modified'] == 'Wed, 01 Jan 2020 12:00:00 GMT'
+
+    # Changed later within the same second as the date the client holds
+    patient.patient_name = 'Asha R. Rao'
+    _set_updated_at(patient, datetime(2020, 1, 1, 12, 0, 0, 900000))
+
+    second = client.get(f'/patient/{patient.id}', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert second.status_code == 200
+    assert second.get_json()['Data']['patient_name'] == 'Asha R. Rao'
+
+
+def test_if_none_match_decides_over_if_modified_since(client, patient):
+    _set_updated_at(patient, datetime(2020, 1, 1))
+    etag = client.get(f'/patient/{patient.id}').headers['ETag']
+
+    stale_etag = client.get(f'/patient/{patient.id}', headers={
+        'If-None-Match': '"stale"', 'If-Modified-Since': 'Fri, 01 Jan 2021 00:00:00 GMT'})
+    matching_etag = client.get(f'/patient/{patient.id}', headers={
+        'If-None-Match': etag, 'If-Modified-Since': 'Sun, 01 Jan 2017 00:00:00 GMT'})
+
+    assert stale_etag.status_code == 200
+    assert matching_etag.status_code == 304
+
+
+@pytest.mark.parametrize('change', ['add', 'edit', 'delete'])
+def test_note_changes_invalidate_both_validators(client, patient, change):
+    first = client.get(f'/patient/{patient.id}')
+    note_id = str(patient.notes[0].id)
+
+    if change == 'add':
+        client.post(f'/patients/{patient.id}/notes', json={'content': 'Second visit'})
+    elif change == 'edit':
+        client.put(f'/notes/{note_id}', json={'content': 'First visit, revised'})
+    else:
+        client.delete(f'/notes/{note_id}')
+
+    by_date = client.get(f'/patient/{patient.id}', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    by_etag = client.get(f'/patient/{patient.id}', headers={'If-None-Match': first.headers['ETag']})
+    assert by_date.status_code == 200
+    assert by_etag.status_code == 200
+
+
+def test_summary_changes_invalidate_the_summary_list(client, patient):
+    first = client.get(f'/summary/{patient.id}')
+
+    client.post(f'/summary/{patient.id}')
+
+    second = client.get(f'/summary/{patient.id}', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert second.status_code == 200
+    assert len(second.get_json()['summaries']) == 1
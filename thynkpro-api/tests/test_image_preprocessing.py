@@ -0,0 +1,81 @@
+import io
+import os
+import pytest
+from PIL import Image
+from service import image_preprocessing
+from service.image_preprocessing import preprocess_image, EXIF_ORIENTATION
+
+
+def _encode(image, format='PNG', exif=None):
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **({'exif': exif} if exif is not None else {}))
+    return buffer.getvalue()
+
+
+def _noise(size):
+    # Noise does not compress, so the PNG is larger than its JPEG re-encode
+    return Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+
+
+def test_large_images_are_downscaled_and_reencoded():
+    data = _encode(_noise((1200, 600)))
+
+    output, mime_type, stats = preprocess_image(data, 'image/png', max_dimension=500)
+
+    assert mime_type == 'image/jpeg'
+    assert stats['outcome'] == 'processed'
+    assert stats['size'] == [500, 250]
+    assert stats['saved_bytes'] == len(data) - len(output) > 0
+    assert Image.open(io.BytesIO(output)).size == (500, 250)
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    data = _encode(Image.new('RGB', (40, 20), 'white'), 'JPEG', exif)
+
+    output, _, stats = preprocess_image(data, 'image/jpeg')
+
+    assert stats['outcome'] == 'processed'
+    assert Image.open(io.BytesIO(output)).size == (20, 40)
+
+
+def test_small_images_that_would_grow_are_kept():
+    data = _encode(Image.new('RGB', (64, 64), 'white'))
+
+    output, mime_type, stats = preprocess_image(data, 'image/png')
+
+    assert (output, mime_type, stats['outcome']) == (data, 'image/png', 'unchanged')
+
+
+def test_grayscale_output():
+    data = _encode(_noise((200, 100)))
+
+    output, mime_type, _ = preprocess_image(data, 'image/png', grayscale=True)
+
+    assert mime_type == 'image/jpeg'
+    assert Image.open(io.BytesIO(output)).mode == 'L'
+
+
+def test_webp_output():
+    output, mime_type, _ = preprocess_image(_encode(_noise((200, 100))), 'image/png', output_format='webp')
+
+    assert mime_type == 'image/webp'
+    assert Image.open(io.BytesIO(output)).format == 'WEBP'
+
+
+@pytest.mark.parametrize('data, mime_type, outcome', [
+    (b'not an image', 'image/png', 'error'),
+    (b'%PDF-1.7', 'application/pdf', 'skipped'),
+])
+def test_undecodable_or_non_image_uploads_pass_through(data, mime_type, outcome):
+    output, output_mime, stats = preprocess_image(data, mime_type)
+
+    assert (output, output_mime, stats['outcome']) == (data, mime_type, outcome)
+
+
+def test_disabled_preprocessing_skips_every_image(monkeypatch):
+    monkeypatch.setattr(image_preprocessing, 'IMAGE_PREPROCESS_ENABLED', False)
+    data = _encode(_noise((1200, 600)))
+
+    assert preprocess_image(data, 'image/png')[2]['outcome'] == 'skipped'
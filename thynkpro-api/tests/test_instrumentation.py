@@ -0,0 +1,61 @@
+import re
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from config.db_config import db
+from config.instrumentation import TIMING_PHASES
+from model.patient import Patient
+
+
+def _server_timing(response):
+    return dict(re.findall(r'(\w+);dur=([\d.]+)', response.headers['Server-Timing']))
+
+
+def test_server_timing_reports_every_phase(client):
+    response = client.get('/patient')
+
+    timings = _server_timing(response)
+    assert list(timings) == [*TIMING_PHASES, 'app', 'total']
+    assert float(timings['db']) > 0
+    assert re.search(r'db;dur=[\d.]+;desc="\d+ queries"', response.headers['Server-Timing'])
+
+
+def test_model_time_is_reported_for_summaries(app, client):
+    patient = Patient(patient_name='Asha Rao', patient_age=52, diagnosis='Type 2 diabetes')
+    db.session.add(patient)
+    db.session.commit()
+
+    response = client.post(f'/summary/{patient.id}?force=true')
+
+    assert response.status_code in (200, 201)
+    assert float(_server_timing(response)['llm']) > 0
+
+
+def test_compression_is_not_counted_as_serialization(app, client):
+    db.session.add_all(Patient(patient_name=f'Patient {index}', diagnosis='x' * 200) for index in range(20))
+    db.session.commit()
+
+    response = client.get('/patient?limit=20', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert float(_server_timing(response)['compress']) > 0
+
+
+def test_metrics_exposes_request_and_query_counters(client):
+    client.get('/patient')
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert '# TYPE http_requests_total counter' in body
+    assert 'http_requests_total{method="GET",route="/patient",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/patient",le="+Inf"}' in body
+    assert re.search(r'^db_queries_total [1-9]', body, re.MULTILINE)
+
+
+def test_failed_statement_does_not_leave_a_pending_start_time(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        assert connection.info.get('query_started') == []
+        connection.execute(text('SELECT 1'))
+        assert connection.info['query_started'] == []
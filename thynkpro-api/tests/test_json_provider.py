@@ -0,0 +1,70 @@
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from config import json_provider
+from config.json_provider import OrjsonProvider, json_provider_class
+from model.serializers import NOTE_FIELDS, rows_to_dicts
+
+pytest.importorskip('orjson')
+
+NOTE_ID = uuid.UUID('00000000-0000-4000-8000-000000000001')
+PATIENT_ID = uuid.UUID('00000000-0000-4000-8000-000000000002')
+CREATED = datetime(2026, 1, 2, 3, 4, 5, 600000)
+ROW = (NOTE_ID, 'First visit', PATIENT_ID, CREATED, None)
+
+
+def _app(provider_class):
+    app = Flask(__name__)
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+    return app
+
+
+def test_orjson_is_used_when_configured_and_installed(monkeypatch):
+    assert json_provider_class() is OrjsonProvider
+
+    monkeypatch.setattr(json_provider, 'JSON_PROVIDER', 'default')
+    assert json_provider_class() is DefaultJSONProvider
+
+
+def test_raw_rows_encode_like_to_dict():
+    expected = {'id': str(NOTE_ID), 'content': 'First visit', 'patient_id': str(PATIENT_ID),
+                'created_at': CREATED.isoformat(), 'updated_at': None}
+
+    for provider_class in (OrjsonProvider, DefaultJSONProvider):
+        app = _app(provider_class)
+        with app.app_context():
+            rows = rows_to_dicts([ROW], NOTE_FIELDS)
+            assert json.loads(app.json.dumps(rows)) == [expected]
+
+
+def test_rows_are_passed_through_only_for_a_native_provider():
+    with _app(OrjsonProvider).app_context():
+        assert rows_to_dicts([ROW + ('cursor',)], NOTE_FIELDS)[0]['id'] is NOTE_ID
+    with _app(DefaultJSONProvider).app_context():
+        [row] = rows_to_dicts([ROW + ('cursor',)], NOTE_FIELDS)
+        assert row['id'] == str(NOTE_ID)
+        assert set(row) == set(NOTE_FIELDS)
+
+
+def test_response_body_matches_the_default_provider():
+    payload = {'b': [1, 2.5, None, True], 'a': {'nested': 'é'}, 'amount': Decimal('1.50')}
+
+    fast_app, default_app = _app(OrjsonProvider), _app(DefaultJSONProvider)
+    with fast_app.test_request_context():
+        fast = fast_app.json.response(payload)
+    with default_app.test_request_context():
+        default = default_app.json.response(payload)
+
+    assert fast.mimetype == default.mimetype == 'application/json'
+    assert json.loads(fast.get_data()) == json.loads(default.get_data())
+    assert list(json.loads(fast.get_data())) == ['a', 'amount', 'b']
+
+
+def test_app_responses_use_the_configured_provider(app, client):
+    assert app.json_provider_class.__name__ == 'TimedOrjsonProvider'
+    assert client.get('/patient').get_json()['success'] == 'true'
@@ -0,0 +1,75 @@
+import pytest
+from config.llm_client import LLMClient, LLMQueueTimeout
+from config.stub_model import StubModel
+
+
+@pytest.fixture
+def client():
+    return LLMClient(StubModel(), max_concurrency=1, queue_timeout=0.1, pass_timeout=False)
+
+
+def test_unread_streams_do_not_hold_a_slot(client):
+    for _ in range(3):
+        client.generate_content('summary', stream=True)
+
+    assert client.generate_content('summary').text
+    assert client.stats()['in_flight'] == 0
+
+
+def test_stream_holds_its_slot_until_closed(client):
+    stream = client.generate_content('summary', stream=True)
+    next(stream)
+
+    with pytest.raises(LLMQueueTimeout):
+        client.generate_content('summary')
+
+    stream.close()
+    assert client.generate_content('summary').text
+
+
+class _FlakyBackend:
+    """Fails with the given errors in turn, then answers"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+class _StatusError(Exception):
+    def __init__(self, code):
+        super().__init__(f'status {code}')
+        self.code = code
+
+
+def test_retryable_errors_are_retried():
+    backend = _FlakyBackend(_StatusError(429), _StatusError(503))
+    client = LLMClient(backend, retry_base=0, pass_timeout=False)
+
+    assert client.generate_content('summary') == 'ok'
+    stats = client.stats()
+    assert (backend.calls, stats['retries'], stats['rate_limited'], stats['errors']) == (3, 2, 1, 2)
+
+
+def test_other_errors_fail_without_retry():
+    backend = _FlakyBackend(_StatusError(400))
+    client = LLMClient(backend, retry_base=0, pass_timeout=False)
+
+    with pytest.raises(_StatusError):
+        client.generate_content('summary')
+    assert backend.calls == 1
+    assert client.stats()['in_flight'] == 0
+
+
+def test_rate_limit_times_out_when_the_bucket_is_empty():
+    client = LLMClient(StubModel(), rate_per_second=0.01, burst=1, queue_timeout=0.05, pass_timeout=False)
+
+    client.generate_content('summary')
+    with pytest.raises(LLMQueueTimeout):
+        client.generate_content('summary')
+    assert client.stats()['queue_timeouts'] == 1
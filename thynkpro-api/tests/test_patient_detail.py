@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from config.db_config import db
+from model.patient import Patient, Medicine, Note, Summary
+from service import patient_service
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def patient(app):
+    patient = Patient(patient_name='Meera Iyer', patient_age=61, patient_gender='Female', diagnosis='Hypertension')
+    db.session.add(patient)
+    db.session.flush()
+    db.session.add(Medicine(patient_id=patient.id, medicine_name='Amlodipine', dosage='5 mg', frequency='Daily'))
+    db.session.add_all(
+        Note(patient_id=patient.id, content=f'Note {index}', created_at=START + timedelta(days=index))
+        for index in range(7)
+    )
+    db.session.add_all(
+        Summary(patient_id=patient.id, summary=f'Summary {index}', created_at=START + timedelta(days=index))
+        for index in range(3)
+    )
+    db.session.commit()
+    return patient
+
+
+def _detail(client, patient, **params):
+    response = client.get(f'/patient/{patient.id}', query_string=params)
+    return response.status_code, response.get_json()
+
+
+def test_default_includes_every_collection(client, patient):
+    status_code, body = _detail(client, patient)
+
+    assert status_code == 200
+    assert body['Data']['medicines'][0]['medicine_name'] == 'Amlodipine'
+    assert [note['content'] for note in body['Data']['notes']][:2] == ['Note 6', 'Note 5']
+    assert len(body['Data']['summaries']) == 3
+    assert body['Pagination']['notes'] == {'limit': 20, 'offset': 0, 'has_more': False}
+
+
+def test_include_limits_the_collections(client, patient):
+    _, body = _detail(client, patient, include='notes')
+
+    assert 'notes' in body['Data']
+    assert 'medicines' not in body['Data'] and 'summaries' not in body['Data']
+    assert set(body['Pagination']) == {'notes'}
+
+    _, bare = _detail(client, patient, include='')
+    assert not {'medicines', 'notes', 'summaries'} & set(bare['Data'])
+    assert bare['Data']['patient_name'] == 'Meera Iyer'
+
+
+def test_collections_are_paged_newest_first(client, patient):
+    _, first = _detail(client, patient, notes_limit=3)
+    _, last = _detail(client, patient, notes_limit=3, notes_offset=6)
+
+    assert [note['content'] for note in first['Data']['notes']] == ['Note 6', 'Note 5', 'Note 4']
+    assert first['Pagination']['notes'] == {'limit': 3, 'offset': 0, 'has_more': True}
+    assert [note['content'] for note in last['Data']['notes']] == ['Note 0']
+    assert last['Pagination']['notes']['has_more'] is False
+
+
+def test_collection_limit_is_capped(client, patient, monkeypatch):
+    monkeypatch.setattr(patient_service, 'PATIENT_COLLECTION_MAX_PAGE_SIZE', 4)
+
+    _, body = _detail(client, patient, notes_limit=1000)
+
+    assert len(body['Data']['notes']) == 4
+    assert body['Pagination']['notes']['limit'] == 4
+
+
+def test_query_count_does_not_grow_with_collections(app, client, patient):
+    statements = []
+    url = f'/patient/{patient.id}'
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    # Validator lookup, patient, medicines, one notes page and one summaries page
+    assert len(statements) == 5
+
+
+@pytest.mark.parametrize('params', [
+    {'include': 'notes,visits'},
+    {'notes_limit': 0},
+    {'summaries_offset': -1},
+    {'notes_limit': 'many'},
+])
+def test_invalid_params_are_rejected(client, patient, params):
+    status_code, body = _detail(client, patient, **params)
+
+    assert status_code == 400
+    assert body['success'] == 'false'
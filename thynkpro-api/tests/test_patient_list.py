@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+import pytest
+from config.db_config import db
+from model.patient import Patient
+from service import patient_service
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def patients(app):
+    rows = [
+        Patient(patient_name=f'Patient {index:02d}', patient_age=20 + index, diagnosis=f'Condition {index}',
+                patient_gender='Female' if index % 2 else 'Male',
+                # Pairs share a created_at, so the cursor has to break ties by id
+                created_at=START + timedelta(days=index // 2))
+        for index in range(11)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def _list(client, **params):
+    response = client.get('/patient', query_string=params)
+    return response.status_code, response.get_json()
+
+
+def test_pages_cover_every_patient_once_newest_first(client, patients):
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+        status_code, body = _list(client, **params)
+        assert status_code == 200
+        seen.extend(body['Data'])
+        if not body['Pagination']['has_more']:
+            assert body['Pagination']['next_cursor'] is None
+            break
+        cursor = body['Pagination']['next_cursor']
+
+    assert sorted(row['id'] for row in seen) == sorted(str(patient.id) for patient in patients)
+    assert len(seen) == len(patients)
+    created = [row['created_at'] for row in seen]
+    assert created == sorted(created, reverse=True)
+
+
+def test_default_page_size_and_cap(client, patients, monkeypatch):
+    monkeypatch.setattr(patient_service, 'PATIENT_MAX_PAGE_SIZE', 5)
+
+    _, body = _list(client, limit=1000)
+
+    assert body['Pagination']['limit'] == 5
+    assert len(body['Data']) == 5
+
+
+def test_filters(client, patients):
+    _, by_gender = _list(client, gender='female')
+    _, by_age = _list(client, min_age=25, max_age=27)
+    _, by_name = _list(client, name='Patient 1')
+    _, by_diagnosis = _list(client, diagnosis='ition 3')
+    _, by_date = _list(client, created_from='2026-01-05')
+
+    assert {row['patient_gender'] for row in by_gender['Data']} == {'Female'}
+    assert sorted(row['patient_age'] for row in by_age['Data']) == [25, 26, 27]
+    assert sorted(row['patient_name'] for row in by_name['Data']) == ['Patient 10']
+    assert [row['diagnosis'] for row in by_diagnosis['Data']] == ['Condition 3']
+    assert sorted(row['patient_name'] for row in by_date['Data']) == ['Patient 08', 'Patient 09', 'Patient 10']
+
+
+def test_name_filter_treats_wildcards_literally(client, patients):
+    _, body = _list(client, name='%')
+
+    assert body['Data'] == []
+
+
+def test_fields_select_only_the_requested_columns(client, patients):
+    _, body = _list(client, fields='patient_name', limit=1)
+
+    assert set(body['Data'][0]) == {'id', 'patient_name'}
+
+
+@pytest.mark.parametrize('params', [{'limit': 0}, {'limit': 'many'}, {'fields': 'password'},
+                                    {'cursor': 'not-a-cursor'}, {'min_age': 'old'}])
+def test_invalid_parameters_are_rejected(client, patients, params):
+    status_code, _ = _list(client, **params)
+
+    assert status_code == 400
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from config.db_config import db
+from model.patient import Patient, Medicine, Note, Summary
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def patients(app):
+    for index in range(5):
+        patient = Patient(patient_name=f'Patient {index}', patient_age=30 + index, patient_gender='Female',
+                          diagnosis='Asthma', created_at=START + timedelta(days=index))
+        db.session.add(patient)
+        db.session.flush()
+        db.session.add(Medicine(patient_id=patient.id, medicine_name='Salbutamol', dosage='100 mcg', frequency='As needed'))
+        db.session.add(Note(patient_id=patient.id, content=f'Visit {index}', created_at=START + timedelta(days=index)))
+        db.session.add(Summary(patient_id=patient.id, summary=f'Summary {index}', input_fingerprint='f' * 64,
+                               notes_partial_offset=12, created_at=START + timedelta(days=index)))
+    db.session.commit()
+
+
+def _export(client, batch_size=2):
+    response = client.get('/patient/export', query_string={'batch_size': batch_size})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return response.get_data(as_text=True)
+
+
+def _import(client, body, **params):
+    response = client.post('/patient/import', data=body, query_string=params,
+                           content_type='application/x-ndjson')
+    return response.status_code, response.get_json()
+
+
+def test_export_import_round_trip(app, client, patients):
+    exported = _export(client)
+    assert len(exported.splitlines()) == 5
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    status_code, body = _import(client, exported, batch_size=2)
+
+    assert status_code == 200
+    assert body['Data']['imported'] == 5
+    assert body['Data']['failed'] == 0
+    assert _export(client) == exported
+
+
+def test_reimport_skips_existing_patients(client, patients):
+    exported = _export(client)
+
+    _, body = _import(client, exported)
+
+    assert (body['Data']['imported'], body['Data']['skipped']) == (0, 5)
+
+
+@pytest.mark.parametrize('line, error', [
+    ('{not json', 'Expecting property name'),
+    ('["a list"]', 'record must be a JSON object'),
+    ('{"patient_name": "A", "patient_age": 1e999}', 'patient_age must be a number'),
+    ('{"patient_name": "A", "patient_age": "inf"}', 'patient_age must be a number'),
+    ('{"patient_name": "A", "patient_age": "forty"}', 'patient_age must be a number'),
+    ('{"patient_name": "A", "patient_age": 1e12}', 'patient_age must be between 0 and 150'),
+    ('{"patient_name": "A", "patient_age": -1}', 'patient_age must be between 0 and 150'),
+    ('{"patient_name": "%s"}' % ('x' * 300), 'patient_name'),
+    ('{"patient_name": "A", "id": "not-a-uuid"}', 'id'),
+])
+def test_bad_rows_fail_alone(app, client, line, error):
+    good = json.dumps({'patient_name': 'Good', 'patient_age': 40})
+
+    status_code, body = _import(client, '\n'.join([good, line, good.replace('Good', 'Also good')]))
+
+    assert status_code == 200
+    report = body['Data']
+    assert (report['total'], report['imported'], report['failed']) == (3, 2, 1)
+    assert report['errors'][0]['line'] == 2
+    assert error in report['errors'][0]['error']
+    assert db.session.query(Patient).count() == 2
+
+
+def test_only_bad_rows_is_a_client_error(client):
+    status_code, body = _import(client, '{"patient_age": "inf"}\n')
+
+    assert status_code == 400
+    assert body['Data']['failed'] == 1
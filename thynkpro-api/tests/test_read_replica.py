@@ -0,0 +1,68 @@
+import uuid
+import pytest
+from app import create_app
+from config.db_config import db, read_session
+from model.patient import Patient
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{tmp_path / 'replica.db'}"}
+    })
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        yield app
+        db.session.remove()
+    # init_app registers a metadata per bind on the shared db; later apps have no replica
+    db.metadatas.pop('replica', None)
+
+
+def _add(session, name):
+    patient = Patient(id=uuid.uuid4(), patient_name=name, patient_age=40)
+    session.add(patient)
+    session.commit()
+    return str(patient.id)
+
+
+def test_without_a_replica_reads_use_the_primary_session(app):
+    assert read_session() is db.session
+
+
+def test_list_and_detail_read_from_the_replica(replica_app):
+    _add(db.session, 'Primary only')
+    replica_id = _add(read_session(), 'Replica only')
+    client = replica_app.test_client()
+
+    listed = client.get('/patient').get_json()['Data']
+    detail = client.get(f'/patient/{replica_id}')
+
+    assert [row['patient_name'] for row in listed] == ['Replica only']
+    assert detail.status_code == 200
+    assert detail.get_json()['Data']['patient_name'] == 'Replica only'
+
+
+def test_update_response_reads_its_own_write_from_the_primary(replica_app):
+    patient_id = _add(db.session, 'Before')
+    client = replica_app.test_client()
+
+    response = client.put(f'/patient/{patient_id}', json={'patient_name': 'After'})
+
+    assert response.status_code == 200
+    assert response.get_json()['Data']['patient_name'] == 'After'
+    # The stale replica has never seen the patient
+    assert client.get(f'/patient/{patient_id}').status_code == 404
+
+
+def test_replica_session_is_scoped_to_the_app_context(replica_app):
+    session = read_session()
+
+    assert session is not db.session
+    assert read_session() is session
+    outer = session()
+    with replica_app.app_context():
+        assert read_session()() is not outer
+    assert session() is outer
@@ -0,0 +1,53 @@
+from config.db_config import db
+from model.patient import Patient
+from service.search_index import index_patient
+from service.search_service import _HEADLINE_START, _HEADLINE_STOP, _escape_headline, search_patients
+
+
+def test_local_snippets_escape_stored_markup(app):
+    patient = Patient(patient_name='Asha Rao', diagnosis='<script>alert(1)</script> chronic asthma')
+    db.session.add(patient)
+    db.session.flush()
+    index_patient(patient.id)
+    db.session.commit()
+
+    body, status_code = search_patients('asthma')
+
+    assert status_code == 200
+    snippet = body['Data']['results'][0]['snippet']
+    assert '<script>' not in snippet
+    assert '&lt;script&gt;' in snippet
+    assert '<mark>asthma</mark>' in snippet
+
+
+def test_postgres_headlines_are_escaped_before_highlighting():
+    headline = f'<img src=x onerror=alert(1)> {_HEADLINE_START}asthma{_HEADLINE_STOP} & wheeze'
+
+    assert _escape_headline(headline) == '&lt;img src=x onerror=alert(1)&gt; <mark>asthma</mark> &amp; wheeze'
+
+
+def test_results_are_ranked_and_paged(app, client):
+    patients = [
+        Patient(patient_name='Frequent', diagnosis='asthma, asthma attacks, asthma review'),
+        Patient(patient_name='Single', diagnosis='asthma noted once in a much longer diagnosis text about other things'),
+        Patient(patient_name='Unrelated', diagnosis='fractured wrist'),
+    ]
+    db.session.add_all(patients)
+    db.session.flush()
+    for patient in patients:
+        index_patient(patient.id)
+    db.session.commit()
+
+    first = client.get('/patient/search', query_string={'q': 'asthma', 'limit': 1}).get_json()
+    second = client.get('/patient/search', query_string={'q': 'asthma', 'limit': 1, 'offset': 1}).get_json()
+
+    assert [hit['patient_name'] for hit in first['Data']['results']] == ['Frequent']
+    assert first['Data']['has_more'] is True
+    assert [hit['patient_name'] for hit in second['Data']['results']] == ['Single']
+    assert second['Data']['has_more'] is False
+
+
+def test_empty_query_is_rejected(client):
+    response = client.get('/patient/search', query_string={'q': '  '})
+
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from config.db_config import db, release_connection
+from model.patient import Patient
+
+pytest.importorskip('gevent')
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_LATENCY = 0.5
+CONCURRENT_REQUESTS = 8
+
+SEED = f"""
+import json
+from app import app
+from config.db_config import db
+from model.patient import Patient
+with app.app_context():
+    db.create_all()
+    patients = [Patient(patient_name=f'Patient {{index}}', diagnosis='Asthma') for index in range({CONCURRENT_REQUESTS})]
+    db.session.add_all(patients)
+    db.session.commit()
+    print(json.dumps([str(patient.id) for patient in patients]))
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _request(url, method='GET'):
+    with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=30) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.fixture
+def server(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'serve.db'}?timeout=30", AI_BACKEND='stub',
+               LLM_STUB_LATENCY_MS=str(MODEL_LATENCY * 1000), SCHEMA_CHECK_ON_STARTUP='false')
+    setup = subprocess.run([sys.executable, '-c', SEED], cwd=API_ROOT, env=env, check=True, timeout=60,
+                           capture_output=True, text=True)
+    patient_ids = json.loads(setup.stdout.strip().splitlines()[-1])
+
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port)],
+                               cwd=API_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            urllib.request.urlopen(f'{base_url}/metrics', timeout=5).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.fail('server did not start')
+            time.sleep(0.1)
+    yield base_url, patient_ids
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def test_model_waits_do_not_block_other_requests(server):
+    base_url, patient_ids = server
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as executor:
+        started = time.monotonic()
+        statuses = list(executor.map(
+            lambda patient_id: _request(f'{base_url}/summary/{patient_id}?force=true', 'POST')[0], patient_ids))
+        elapsed = time.monotonic() - started
+
+    assert all(status < 300 for status in statuses)
+    # One after another these would take CONCURRENT_REQUESTS model latencies
+    assert elapsed < 3 * MODEL_LATENCY
+
+
+def test_release_connection_returns_the_connection_to_the_pool(app):
+    patient = Patient(patient_name='Asha Rao')
+    db.session.add(patient)
+    db.session.flush()
+    assert db.engine.pool.checkedout() == 1
+
+    release_connection()
+
+    assert db.engine.pool.checkedout() == 0
+    assert patient.patient_name == 'Asha Rao'
+    assert db.session.get(Patient, patient.id) is patient
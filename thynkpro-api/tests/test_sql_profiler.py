@@ -0,0 +1,76 @@
+import json
+import logging
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from config import sql_profiler
+from config.db_config import db
+from config.sql_profiler import build_report, statement_shape
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql_profiler, 'SQL_PROFILER_ENABLED', True)
+    monkeypatch.setattr(sql_profiler, 'SQL_PROFILER_SAMPLE_RATE', 1.0)
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'profiled.db'}"})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _reports(caplog):
+    return [json.loads(record.getMessage()) for record in caplog.records if record.name == 'sql_profiler']
+
+
+def test_statement_shape_ignores_values():
+    first = statement_shape("SELECT * FROM notes WHERE patient_id = 'a1'  AND id IN (1, 2, 3) LIMIT 20")
+    second = statement_shape("SELECT * FROM notes\nWHERE patient_id = 'b2' AND id IN (4) LIMIT 5")
+
+    assert first == second == 'SELECT * FROM notes WHERE patient_id = ? AND id IN (...) LIMIT ?'
+
+
+def test_report_flags_repeated_and_slow_statements(monkeypatch):
+    monkeypatch.setattr(sql_profiler, 'SQL_PROFILER_SLOW_MS', 50)
+    monkeypatch.setattr(sql_profiler, 'SQL_PROFILER_TOP', 2)
+    queries = [('SELECT notes', 1.0)] * 3 + [('SELECT patients', 80.0), ('SELECT summaries', 2.0)]
+
+    report = build_report(queries)
+
+    assert report['query_count'] == 5
+    assert report['db_time_ms'] == 85.0
+    assert [item['statement'] for item in report['slowest']] == ['SELECT patients', 'SELECT summaries']
+    assert report['slow_count'] == 1
+    assert report['repeated'] == [{'statement': 'SELECT notes', 'count': 3}]
+
+
+def test_each_profiled_request_logs_one_report(profiled_app, caplog):
+    caplog.set_level(logging.INFO, logger='sql_profiler')
+
+    response = profiled_app.test_client().get('/patient')
+
+    assert response.status_code == 200
+    [report] = _reports(caplog)
+    assert report['event'] == 'sql_profile'
+    assert report['route'] == '/patient'
+    assert report['query_count'] >= 1
+    assert report['possible_n_plus_one'] is False
+
+
+def test_requests_outside_the_sample_are_not_profiled(profiled_app, caplog, monkeypatch):
+    monkeypatch.setattr(sql_profiler, 'SQL_PROFILER_SAMPLE_RATE', 0.0)
+    caplog.set_level(logging.INFO, logger='sql_profiler')
+
+    profiled_app.test_client().get('/patient')
+
+    assert _reports(caplog) == []
+
+
+def test_failed_statement_does_not_leave_a_pending_start_time(profiled_app):
+    with profiled_app.test_request_context('/patient'):
+        profiled_app.preprocess_request()
+        with db.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM no_such_table'))
+            assert connection.info.get('profiler_started') == []
@@ -0,0 +1,84 @@
+import logging
+import os
+import subprocess
+import sys
+from sqlalchemy import text
+from app import create_app
+from config import schema_check
+from config.ai_config import LazyBackend
+from config.db_config import db
+from config.schema_check import check_schema, schema_drift
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_create_app_does_not_connect_to_the_database(tmp_path, caplog):
+    database = tmp_path / 'untouched.db'
+
+    create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+
+    assert not database.exists()
+    assert not [record for record in caplog.records if record.name == schema_check.logger.name]
+
+
+def test_model_backend_is_built_on_first_call():
+    built = []
+
+    class Backend:
+        def generate_content(self, prompt, stream=False, **kwargs):
+            return prompt
+
+    def factory():
+        built.append(True)
+        return Backend()
+
+    backend = LazyBackend(factory)
+    assert not backend.loaded
+    assert backend.generate_content('a') == 'a'
+    assert backend.generate_content('b') == 'b'
+    assert backend.loaded and len(built) == 1
+
+
+def test_schema_matching_the_models_has_no_drift(app):
+    assert schema_drift() == []
+
+
+def test_missing_index_is_reported(app, monkeypatch, caplog):
+    db.session.execute(text('DROP INDEX ix_notes_patient_id_created_at'))
+    db.session.commit()
+    monkeypatch.setattr(schema_check, 'SCHEMA_CHECK_ON_STARTUP', True)
+
+    assert any('ix_notes_patient_id_created_at' in diff for diff in schema_drift())
+    with caplog.at_level(logging.WARNING, logger=schema_check.logger.name):
+        check_schema(app)
+    assert 'ix_notes_patient_id_created_at' in caplog.text
+
+
+def test_disabled_check_does_not_query(app, monkeypatch):
+    monkeypatch.setattr(schema_check, 'SCHEMA_CHECK_ON_STARTUP', False)
+    monkeypatch.setattr(schema_check, 'schema_drift', lambda: (_ for _ in ()).throw(AssertionError('queried')))
+
+    check_schema(app)
+
+
+def test_server_entry_point_checks_the_schema(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'empty.db'}", SCHEMA_CHECK_ON_STARTUP='true',
+               AI_BACKEND='stub')
+
+    result = subprocess.run([sys.executable, '-c', 'import serve'], cwd=API_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert 'Schema differs from the models' in result.stderr
+
+
+def test_flask_cli_commands_skip_the_schema_check(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'empty.db'}", SCHEMA_CHECK_ON_STARTUP='true',
+               AI_BACKEND='stub')
+
+    result = subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'routes'], cwd=API_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert 'Schema differs' not in result.stderr
+    assert not (tmp_path / 'empty.db').exists()
@@ -0,0 +1,180 @@
+import re
+from datetime import datetime
+import pytest
+from config.ai_config import model
+from config.db_config import db
+from model.patient import Patient, Medicine, Note, Summary
+from service import summary_service
+from service.summary_service import estimate_tokens, generate_patient_summary
+
+
+@pytest.fixture
+def patient(app):
+    patient = Patient(patient_name='Asha Rao', patient_age=52, patient_gender='Female',
+                      diagnosis='Type 2 diabetes', doctor_advice='Diet control')
+    db.session.add(patient)
+    db.session.commit()
+    return patient
+
+
+def _add_notes(patient, *notes):
+    for content, created_at in notes:
+        db.session.add(Note(patient_id=patient.id, content=content, created_at=created_at))
+    db.session.commit()
+
+
+def _summary(patient):
+    db.session.expire_all()
+    return Summary.query.filter_by(patient_id=patient.id).one()
+
+
+def _send_all(patient):
+    """Prompts sent while folding in every pending note"""
+    sent = []
+    for _ in range(50):
+        context, response = summary_service._prepare_summary(patient.id, False)
+        if response:
+            break
+        sent.append(context['prompt'])
+        summary_service._save_summary(patient.id, context, 'summary')
+    return sent
+
+
+def test_unchanged_inputs_do_not_call_the_model_again(patient):
+    _, status_code = generate_patient_summary(patient.id)
+    assert status_code == 201
+    calls = model.stats()['calls']
+
+    body, status_code = generate_patient_summary(patient.id)
+
+    assert status_code == 200
+    assert body['unchanged']
+    assert model.stats()['calls'] == calls
+
+
+def test_changed_inputs_regenerate(patient):
+    generate_patient_summary(patient.id)
+    db.session.add(Medicine(patient_id=patient.id, medicine_name='Metformin', dosage='500 mg', frequency='Daily'))
+    db.session.commit()
+
+    body, status_code = generate_patient_summary(patient.id)
+
+    assert status_code == 200
+    assert body['updated']
+
+
+def test_force_regenerates(patient):
+    generate_patient_summary(patient.id)
+
+    body, _ = generate_patient_summary(patient.id, force=True)
+
+    assert body['updated']
+
+
+def test_prompt_change_invalidates_the_fingerprint(patient, monkeypatch):
+    info = summary_service._build_patient_info(patient)
+    before = summary_service.summary_fingerprint(info)
+
+    monkeypatch.setattr(summary_service, 'SUMMARY_PROMPT_FOOTER', 'Summarize.')
+
+    assert summary_service.summary_fingerprint(info) != before
+
+
+@pytest.mark.parametrize('template', ['SUMMARY_PROMPT_UPDATE_HEADER', 'SUMMARY_PROMPT_UPDATE_FOOTER',
+                                      'SUMMARY_PROMPT_NOTE', 'SUMMARY_PROMPT_NOTES_HEADER'])
+def test_incremental_template_change_invalidates_the_fingerprint(patient, monkeypatch, template):
+    info = summary_service._build_patient_info(patient)
+    before = summary_service.summary_fingerprint(info, incremental=True)
+    plain = summary_service.summary_fingerprint(info)
+
+    monkeypatch.setattr(summary_service, template, 'changed {content}')
+
+    assert summary_service.summary_fingerprint(info, incremental=True) != before
+    assert summary_service.summary_fingerprint(info) == plain
+
+
+def test_new_notes_are_folded_in_and_the_watermark_moves(patient):
+    generate_patient_summary(patient.id)
+    _add_notes(patient, ('HbA1c down to 7.1', datetime(2026, 3, 1)))
+
+    body, status_code = generate_patient_summary(patient.id)
+
+    assert status_code == 200
+    assert body['notes_included'] == 1
+    assert body['pending_notes'] == 0
+    summary = _summary(patient)
+    assert summary.notes_through == datetime(2026, 3, 1)
+    assert generate_patient_summary(patient.id)[0]['unchanged']
+
+
+def test_notes_with_the_same_timestamp_beyond_the_limit_are_not_skipped(patient, monkeypatch):
+    monkeypatch.setattr(summary_service, 'SUMMARY_MAX_NOTES_PER_UPDATE', 2)
+    same_time = datetime(2026, 3, 1)
+    _add_notes(patient, *((f'note {index}', same_time) for index in range(5)))
+
+    included = []
+    for _ in range(5):
+        body, _ = generate_patient_summary(patient.id)
+        if body.get('unchanged'):
+            break
+        included.append(body['notes_included'])
+
+    assert included == [2, 2, 1]
+
+
+def test_long_patient_fields_leave_room_for_notes(patient, monkeypatch):
+    monkeypatch.setattr(summary_service, 'SUMMARY_TOKEN_BUDGET', 600)
+    patient.diagnosis = 'x' * 50000
+    patient.doctor_advice = 'y' * 50000
+    db.session.commit()
+    _add_notes(patient, ('Short follow-up note', datetime(2026, 3, 1)))
+
+    context, _ = summary_service._prepare_summary(patient.id, False)
+
+    assert context['notes_included'] == 1
+    assert estimate_tokens(context['prompt']) <= 600
+
+
+def test_note_larger_than_the_budget_is_sent_in_parts(patient, monkeypatch):
+    monkeypatch.setattr(summary_service, 'SUMMARY_TOKEN_BUDGET', 600)
+    long_note = '\n\n'.join(f'word{index}  ' for index in range(1500))
+    _add_notes(patient, (long_note, datetime(2026, 3, 1)), ('Later note', datetime(2026, 3, 2)))
+
+    sent = _send_all(patient)
+
+    assert len(sent) > 2
+    assert all(estimate_tokens(prompt) <= 600 for prompt in sent)
+    # The parts put together are the whole note: cut between words, nothing skipped or repeated
+    parts = [re.search(r'- \[2026-03-01\] (.*?)(?: \[continues\])?\n', prompt).group(1) for prompt in sent]
+    assert ' '.join(parts).split() == long_note.split()
+    assert 'Later note' in sent[-1]
+    assert _summary(patient).notes_partial_offset is None
+
+
+def test_partial_offset_indexes_the_raw_note(patient, monkeypatch):
+    monkeypatch.setattr(summary_service, 'SUMMARY_TOKEN_BUDGET', 600)
+    words = [f'word{index}' for index in range(1500)]
+    _add_notes(patient, ('   '.join(words), datetime(2026, 3, 1)))
+
+    context, _ = summary_service._prepare_summary(patient.id, False)
+    first = context['prompt']
+    summary_service._save_summary(patient.id, context, 'summary')
+    offset = _summary(patient).notes_partial_offset
+    note = Note.query.filter_by(patient_id=patient.id).one()
+    sent_words = re.search(r'- \[2026-03-01\] (.*?) \[continues\]\n', first).group(1).split()
+
+    assert note.content[:offset].split() == sent_words
+    # The rest of the raw content is what the next part starts with
+    second = summary_service._prepare_summary(patient.id, False)[0]['prompt']
+    assert f'- [2026-03-01] {words[len(sent_words)]} ' in second
+
+
+def test_summary_built_without_notes_is_not_unchanged_for_an_incremental_request(patient):
+    _add_notes(patient, ('Foot exam normal', datetime(2026, 3, 1)))
+    generate_patient_summary(patient.id, incremental=False)
+
+    body, status_code = generate_patient_summary(patient.id, incremental=True)
+
+    assert status_code == 200
+    assert not body.get('unchanged')
+    assert body['notes_included'] == 1
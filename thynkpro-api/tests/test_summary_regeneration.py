@@ -0,0 +1,85 @@
+import pytest
+from config.ai_config import model
+from config.db_config import db
+from model.patient import Patient, Summary
+from service import summary_regeneration_service
+from service.summary_regeneration_service import load_checkpoint, regenerate_summaries
+
+
+@pytest.fixture
+def patients(app):
+    rows = [Patient(patient_name=f'Patient {index}', patient_age=30 + index, diagnosis='Asthma') for index in range(5)]
+    db.session.add_all(rows)
+    db.session.commit()
+    return sorted(str(patient.id) for patient in rows)
+
+
+def _run(checkpoint, **options):
+    return regenerate_summaries(concurrency=2, rate_per_second=0, batch_size=2, checkpoint_path=str(checkpoint),
+                                **options)
+
+
+def test_stopped_run_resumes_from_the_checkpoint(app, patients, tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    batches = []
+
+    first = _run(checkpoint, should_stop=lambda: len(batches) >= 1, progress=batches.append)
+
+    assert first['status'] == 'stopped'
+    assert first['processed'] == 2
+    saved = load_checkpoint(str(checkpoint))
+    assert saved['last_patient_id'] == patients[1]
+    assert db.session.query(Summary).count() == 2
+
+    calls = model.stats()['calls']
+    second = _run(checkpoint)
+
+    assert second['status'] == 'done'
+    assert second['resumed'] is True
+    assert (second['processed'], second['regenerated'], second['failed']) == (5, 5, 0)
+    assert model.stats()['calls'] - calls == 3
+    assert not checkpoint.exists()
+    assert sorted(str(row.patient_id) for row in db.session.query(Summary.patient_id)) == patients
+
+
+def test_restart_ignores_the_checkpoint(app, patients, tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    _run(checkpoint, should_stop=lambda: checkpoint.exists())
+
+    report = _run(checkpoint, resume=False, force=False)
+
+    assert report['resumed'] is False
+    assert (report['processed'], report['unchanged'], report['regenerated']) == (5, 2, 3)
+
+
+def test_failed_model_call_is_reported_and_the_run_continues(app, patients, tmp_path, monkeypatch):
+    generate = summary_regeneration_service._generate
+
+    def flaky(bucket, prompt):
+        if 'Patient 3' in prompt:
+            raise RuntimeError('model unavailable')
+        return generate(bucket, prompt)
+
+    monkeypatch.setattr(summary_regeneration_service, '_generate', flaky)
+
+    report = _run(tmp_path / 'checkpoint.json')
+
+    assert report['status'] == 'done'
+    assert (report['regenerated'], report['failed']) == (4, 1)
+    assert report['errors'][0]['error'] == 'model unavailable'
+
+
+def test_no_connection_is_held_during_model_calls(app, patients, tmp_path, monkeypatch):
+    generate = summary_regeneration_service._generate
+    pool = db.engine.pool
+    checked_out = []
+
+    def recording(bucket, prompt):
+        checked_out.append(pool.checkedout())
+        return generate(bucket, prompt)
+
+    monkeypatch.setattr(summary_regeneration_service, '_generate', recording)
+
+    _run(tmp_path / 'checkpoint.json')
+
+    assert checked_out == [0] * 5
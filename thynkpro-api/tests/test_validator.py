@@ -0,0 +1,71 @@
+import pytest
+from schema.validator import validate_patient
+from service.json_repair import parse_model_json, repair_json
+
+
+@pytest.mark.parametrize('age, expected', [
+    (42, 42), ('42', 42), ('42 years', 42), ('Age: 42 yrs', 42), ('40 years old', 40)
+])
+def test_ages_in_years_are_coerced(age, expected):
+    data, errors = validate_patient({'patient_name': 'A', 'patient_age': age})
+
+    assert data['patient_age'] == expected
+    assert not [error for error in errors if error.startswith('patient_age')]
+
+
+@pytest.mark.parametrize('age', ['6 months', '3 weeks', '42 kg', 'about 40'])
+def test_ages_in_other_units_are_rejected(age):
+    data, errors = validate_patient({'patient_name': 'A', 'patient_age': age})
+
+    assert data['patient_age'] is None
+    assert [error for error in errors if error.startswith('patient_age')]
+
+
+def test_repair_leaves_string_contents_alone():
+    repaired = repair_json('{"diagnosis": "None found, True negative,]", "age": None, "flags": [True, False,],}')
+
+    assert parse_model_json(repaired) == {
+        'diagnosis': 'None found, True negative,]', 'age': None, 'flags': [True, False]
+    }
+
+
+def test_truncated_reply_is_closed():
+    assert parse_model_json('```json\n{"patient_name": "Asha", "medicines": [{"medicine_name": "Metfor') == {
+        'patient_name': 'Asha', 'medicines': [{'medicine_name': 'Metfor'}]
+    }
+
+
+def test_infinite_age_is_an_error_not_a_crash():
+    data, errors = validate_patient({'patient_name': 'A', 'patient_age': float('inf')})
+
+    assert data['patient_age'] is None
+    assert [error for error in errors if error.startswith('patient_age')]
+
+
+def test_values_are_coerced_to_the_schema():
+    data, errors = validate_patient({
+        'patient_name': '  Asha Rao ',
+        'patient_age': 52,
+        'patient_gender': 'f',
+        'diagnosis': 'Asthma',
+        'doctor_advice': 'Review',
+        'medicines': {'medicine_name': 'Salbutamol', 'dosage': '100 mcg'},
+        'unknown_field': 'dropped'
+    })
+
+    assert errors == []
+    assert data['patient_name'] == 'Asha Rao'
+    assert data['patient_gender'] == 'Female'
+    assert data['medicines'] == [{'medicine_name': 'Salbutamol', 'dosage': '100 mcg', 'frequency': None}]
+    assert 'unknown_field' not in data
+
+
+def test_empty_medicines_are_dropped():
+    data, _ = validate_patient({'patient_name': 'A', 'medicines': [{}, {'medicine_name': 'Metformin'}]})
+
+    assert [medicine['medicine_name'] for medicine in data['medicines']] == ['Metformin']
+
+
+def test_top_level_value_must_be_an_object():
+    with pytest.raises(ValueError):
+        validate_patient(['not', 'an', 'object'])
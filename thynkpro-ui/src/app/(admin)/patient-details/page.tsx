@@ -3,6 +3,7 @@
 import React, { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { fetchPatients, deletePatient } from '@/services/api/patient';
+import Pagination from '@/components/tables/Pagination';
 
 interface Patient {
   patient_name: string;
@@ -17,51 +18,64 @@ interface Patient {
 const PatientDetailsPage = () => {
   const router = useRouter();
   const [searchTerm, setSearchTerm] = useState('');
-  const [filterStatus, setFilterStatus] = useState<string>('all');
   const [filterGender, setFilterGender] = useState<string>('all');
   const [patients, setPatients] = useState<Patient[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loaded, setLoaded] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [currentPage, setCurrentPage] = useState(1);
+  // cursors[n] is the cursor that fetches page n + 1; the first page has none
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
+  const [hasMore, setHasMore] = useState(false);
   const patientsPerPage = 6;
   const [deleteConfirmation, setDeleteConfirmation] = useState<string | null>(null);
 
+  // A new search or filter starts again from the first page
+  useEffect(() => {
+    setCurrentPage(1);
+    setCursors([null]);
+  }, [searchTerm, filterGender]);
+
   useEffect(() => {
     const getPatients = async () => {
       try {
         setLoading(true);
-        const data = await fetchPatients();
-        setPatients(data || {});
+        const page = await fetchPatients({
+          limit: patientsPerPage,
+          cursor: cursors[currentPage - 1],
+          name: searchTerm.trim() || undefined,
+          gender: filterGender === 'all' ? undefined : filterGender,
+        });
+        setPatients(page.patients);
+        setHasMore(page.hasMore);
+        if (page.nextCursor) {
+          const nextCursor = page.nextCursor;
+          setCursors(prev => [...prev.slice(0, currentPage), nextCursor]);
+        }
         setError(null);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'An error occurred');
         console.error('Error fetching patients:', err);
       } finally {
         setLoading(false);
+        setLoaded(true);
       }
     };
 
-    getPatients();
-  }, []);
-
-  const filteredPatients = patients.filter(patient => {
-    const matchesSearch = 
-      patient.patient_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      patient.diagnosis.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      patient.patient_gender.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesGender = filterGender === 'all' || patient.patient_gender.toLowerCase() === filterGender.toLowerCase();
-    
-    return matchesSearch && matchesGender;
-  });
+    // Wait for typing to pause before searching
+    const timer = setTimeout(getPatients, 300);
+    return () => clearTimeout(timer);
+    // cursors is read, not tracked: storing the next cursor must not refetch the page
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [currentPage, searchTerm, filterGender]);
 
-  const indexOfLastPatient = currentPage * patientsPerPage;
-  const indexOfFirstPatient = indexOfLastPatient - patientsPerPage;
-  const currentPatients = filteredPatients.slice(indexOfFirstPatient, indexOfLastPatient);
-  const totalPages = Math.ceil(filteredPatients.length / patientsPerPage);
+  // Pages are reached by cursor, so only pages already seen and the next one are known
+  const totalPages = currentPage + (hasMore ? 1 : 0);
 
   const handlePageChange = (pageNumber: number) => {
-    setCurrentPage(pageNumber);
+    if (pageNumber >= 1 && pageNumber <= totalPages && pageNumber <= cursors.length) {
+      setCurrentPage(pageNumber);
+    }
   };
 
   const navigateToPatientDetail = (patientId: string) => {
@@ -84,7 +98,8 @@ const PatientDetailsPage = () => {
     }
   };
 
-  if (loading) {
+  // Later page and filter changes keep the page on screen, so the search box keeps focus
+  if (loading && !loaded) {
     return (
       <div className="p-6 flex justify-center items-center h-screen">
         <div className="text-center">
@@ -112,7 +127,7 @@ const PatientDetailsPage = () => {
           <div className="relative">
             <input
               type="text"
-              placeholder="Search patients..."
+              placeholder="Search by patient name..."
               className="w-full px-4 py-2 text-gray-900 bg-white border border-gray-300 rounded-lg focus:border-brand-500 focus:ring-brand-500 dark:bg-gray-800 dark:border-gray-700 dark:text-white"
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
@@ -149,7 +164,7 @@ const PatientDetailsPage = () => {
           
           <div className="text-right md:col-span-2">
             <p className="text-sm text-gray-600 dark:text-gray-400">
-              Total Patients: {filteredPatients.length}
+              Page {currentPage}: {patients.length} patients
             </p>
           </div>
         </div>
@@ -178,13 +193,13 @@ const PatientDetailsPage = () => {
         </div>
       )}
 
-      {filteredPatients.length === 0 ? (
+      {patients.length === 0 ? (
         <div className="text-center p-10 bg-white dark:bg-gray-800 rounded-xl shadow-sm">
           <p className="text-gray-600 dark:text-gray-400">No Data Found</p>
         </div>
       ) : (
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-          {currentPatients.map((patient, index) => (
+          {patients.map((patient, index) => (
             <div 
               key={patient.id || index}
               className="bg-white dark:bg-gray-800 rounded-xl shadow-sm p-6 hover:shadow-md transition-shadow duration-300"
@@ -250,35 +265,12 @@ const PatientDetailsPage = () => {
       )}
 
       {totalPages > 1 && (
-        <div className="mt-6 flex justify-center space-x-2">
-          <button
-            onClick={() => handlePageChange(currentPage - 1)}
-            disabled={currentPage === 1}
-            className="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed dark:bg-gray-800 dark:border-gray-600 dark:text-gray-200 dark:hover:bg-gray-700"
-          >
-            Previous
-          </button>
-          
-          {Array.from({ length: totalPages }, (_, i) => i + 1).map((pageNumber) => (
-            <button
-              key={pageNumber}
-              onClick={() => handlePageChange(pageNumber)}
-              className={`px-4 py-2 text-sm font-medium rounded-md ${currentPage === pageNumber
-                ? 'bg-brand-500 text-white'
-                : 'text-gray-700 bg-white border border-gray-300 hover:bg-gray-50 dark:bg-gray-800 dark:border-gray-600 dark:text-gray-200 dark:hover:bg-gray-700'
-              }`}
-            >
-              {pageNumber}
-            </button>
-          ))}
-          
-          <button
-            onClick={() => handlePageChange(currentPage + 1)}
-            disabled={currentPage === totalPages}
-            className="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed dark:bg-gray-800 dark:border-gray-600 dark:text-gray-200 dark:hover:bg-gray-700"
-          >
-            Next
-          </button>
+        <div className="mt-6 flex justify-center">
+          <Pagination
+            currentPage={currentPage}
+            totalPages={totalPages}
+            onPageChange={handlePageChange}
+          />
         </div>
       )}
     </div>
@@ -10,24 +10,63 @@ interface Patient {
   id?: string;
 }
 
+interface Pagination {
+  limit: number;
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
 interface ApiResponse {
   success: string;
   Data: Patient[];
+  Pagination?: Pagination;
 }
 
-interface PatientResponse {
-  success: string;
-  Data: Patient;
+export interface PatientPage {
+  patients: Patient[];
+  nextCursor: string | null;
+  hasMore: boolean;
 }
 
-export const fetchPatients = async (): Promise<Patient[]> => {
+export interface PatientQuery {
+  limit?: number;
+  cursor?: string | null;
+  name?: string;
+  gender?: string;
+}
+
+/**
+ * Fetches one page of patients; pass nextCursor back as cursor for the next page
+ */
+export const fetchPatients = async (query: PatientQuery = {}): Promise<PatientPage> => {
   try {
-    const response = await fetch(createApiUrl('/patient'), defaultFetchOptions);
+    const params = new URLSearchParams();
+    if (query.limit) {
+      params.set('limit', String(query.limit));
+    }
+    if (query.cursor) {
+      params.set('cursor', query.cursor);
+    }
+    if (query.name) {
+      params.set('name', query.name);
+    }
+    if (query.gender) {
+      params.set('gender', query.gender);
+    }
+    const queryString = params.toString();
+    const response = await fetch(
+      createApiUrl(queryString ? `/patient?${queryString}` : '/patient'),
+      defaultFetchOptions
+    );
     
     const result = await handleApiResponse<ApiResponse>(response);
     
     if (result.success === "true" && Array.isArray(result.Data)) {
-      return result.Data;
+      return {
+        patients: result.Data,
+        nextCursor: result.Pagination?.next_cursor ?? null,
+        hasMore: result.Pagination?.has_more ?? false,
+      };
     } else {
       throw new Error("Invalid response format");
     }